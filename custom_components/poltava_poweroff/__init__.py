@@ -6,19 +6,42 @@ import logging
 
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigEntry
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 
-from .const import DOMAIN
+from . import websocket_api
+from .const import DOMAIN, SIGNAL_ENTRY_UNLOADED, PowerOffGroup
 from .coordinator import PoltavaPowerOffCoordinator
+from .profiler import async_profile_refreshes
+from .refresh import RefreshCoalescer
 
 PLATFORMS: list[Platform] = [Platform.CALENDAR, Platform.SENSOR]
 _LOGGER = logging.getLogger(__name__)
 
 # Схема для service
 SERVICE_REFRESH = "refresh"
-SERVICE_SCHEMA: vol.Schema = vol.Schema({})  # Порожня схема, service не потребує параметрів
+SERVICE_SCHEMA: vol.Schema = vol.Schema(
+    {
+        # Без цілей оновлюються всі завантажені записи; з обома - записи, що відповідають обом
+        vol.Optional("entry_id"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("group"): vol.All(cv.ensure_list, [vol.Coerce(PowerOffGroup)]),
+    }
+)
+SERVICE_PROFILE = "profile"
+PROFILE_SCHEMA: vol.Schema = vol.Schema(
+    {
+        # Без entry_id профілюється перший завантажений запис, без group - його основна група
+        vol.Optional("entry_id"): cv.string,
+        vol.Optional("group"): vol.Coerce(PowerOffGroup),
+        vol.Optional("cycles", default=10): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+        vol.Optional("offline", default=False): cv.boolean,
+        vol.Optional("top", default=20): vol.All(vol.Coerce(int), vol.Range(min=1, max=200)),
+    }
+)
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
@@ -37,15 +60,60 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         "Add it manually: Settings → Dashboards → Resources → Add Resource"
     )
 
-    # Реєструємо service для ручного оновлення
-    async def async_handle_refresh(call: ServiceCall) -> None:
+    # Реєструємо service для ручного оновлення, виклики протягом короткого вікна виконуються разом
+    refresh_coalescer = RefreshCoalescer(hass)
+
+    async def async_handle_refresh(call: ServiceCall) -> ServiceResponse:
         """Handle refresh service call."""
-        _LOGGER.info("Manual refresh requested via service")
-        for entry in hass.config_entries.async_entries(DOMAIN):
-            coordinator: PoltavaPowerOffCoordinator = entry.runtime_data
-            await coordinator.async_request_refresh()
+        entry_ids = call.data.get("entry_id")
+        groups = call.data.get("group")
+        coordinators: list[PoltavaPowerOffCoordinator] = [
+            entry.runtime_data
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.state is ConfigEntryState.LOADED
+            and (entry_ids is None or entry.entry_id in entry_ids)
+            and (groups is None or not entry.runtime_data.groups.keys().isdisjoint(groups))
+        ]
+        if not coordinators and (entry_ids or groups):
+            raise ServiceValidationError("No loaded Poltava PowerOff entry matches the refresh targets")
+        _LOGGER.info("Manual refresh of %d entries requested via service", len(coordinators))
+        return await refresh_coalescer.async_refresh(coordinators)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH,
+        async_handle_refresh,
+        schema=SERVICE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    # Service для профілювання циклів оновлення, результат - у відповіді та в каталозі конфігурації
+    async def async_handle_profile(call: ServiceCall) -> ServiceResponse:
+        """Handle profile service call."""
+        entries = [
+            entry
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.state is ConfigEntryState.LOADED and call.data.get("entry_id") in (None, entry.entry_id)
+        ]
+        if not entries:
+            raise ServiceValidationError("No loaded Poltava PowerOff entry to profile")
+        coordinator: PoltavaPowerOffCoordinator = entries[0].runtime_data
+        group = call.data.get("group", coordinator.group)
+        _LOGGER.info("Profiling %d refresh cycles of group %s", call.data["cycles"], group)
+        return await async_profile_refreshes(
+            hass, coordinator.hub.scraper(group), call.data["cycles"], call.data["offline"], call.data["top"]
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_handle_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
 
-    hass.services.async_register(DOMAIN, SERVICE_REFRESH, async_handle_refresh, schema=SERVICE_SCHEMA)
+    # Картка отримує розклад підпискою, а не з атрибутів сенсорів
+    websocket_api.async_setup(hass)
 
     return True
 
@@ -54,15 +122,34 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Poltava Power Offline from a config entry."""
 
     coordinator = PoltavaPowerOffCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
+    for group in coordinator.groups:
+        entry.async_on_unload(coordinator.hub.async_subscribe(group))
+    # Збережена сесія cloudscraper відновлюється у фоні, перше оновлення дочекається її
+    coordinator.hub.async_start_warm_up()
+    if await coordinator.async_restore_schedule():
+        # Збережений розклад піднімає сутності одразу, свіжі дані підтягуються у фоні
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} refresh after restore {entry.entry_id}"
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
 
     entry.runtime_data = coordinator
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unloaded := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        # Підписки websocket тримають розклад цього запису
+        async_dispatcher_send(hass, f"{SIGNAL_ENTRY_UNLOADED}_{entry.entry_id}")
+    return unloaded
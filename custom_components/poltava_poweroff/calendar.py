@@ -2,15 +2,17 @@
 
 import datetime
 import logging
+from typing import Any
 
 from homeassistant.components.calendar import CalendarEntity, CalendarEntityDescription, CalendarEvent
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
 from .coordinator import PoltavaPowerOffCoordinator
+from .entity import PoltavaPowerOffEntity
+from .schedule import GroupSchedule
 
 LOGGER = logging.getLogger(__name__)
 
@@ -23,33 +25,33 @@ async def async_setup_entry(
     """Set up the Poltava outages calendar platform."""
     LOGGER.debug("Setup new entry: %s", config_entry)
     coordinator: PoltavaPowerOffCoordinator = config_entry.runtime_data
-    async_add_entities([PoltavaPowerOffCalendar(coordinator)])
+    async_add_entities(PoltavaPowerOffCalendar(coordinator, schedule) for schedule in coordinator.groups.values())
 
 
-class PoltavaPowerOffCalendar(CoordinatorEntity[PoltavaPowerOffCoordinator], CalendarEntity):
+class PoltavaPowerOffCalendar(PoltavaPowerOffEntity, CalendarEntity):
     """Implementation of calendar entity."""
 
-    coordinator: PoltavaPowerOffCoordinator
-
     def __init__(
         self,
         coordinator: PoltavaPowerOffCoordinator,
+        schedule: GroupSchedule,
     ) -> None:
-        """Initialize the PoltavaPowerOffCoordinator entity."""
-        super().__init__(coordinator)
-        self.coordinator = coordinator
-        self.entity_description = CalendarEntityDescription(
-            key="calendar",
-            name="Poltava PowerOff Calendar",
+        """Initialize the calendar of one group."""
+        super().__init__(
+            coordinator,
+            schedule,
+            CalendarEntityDescription(
+                key="calendar",
+                name="Poltava PowerOff Calendar",
+            ),
         )
-        self._attr_unique_id = f"{coordinator.config_entry.entry_id}-{coordinator.group}-{self.entity_description.key}"
 
     @property
     def event(self) -> CalendarEvent | None:
         """Return the current or next upcoming event or None."""
         now = dt_util.now()
         LOGGER.debug("Getting current event for %s", now)
-        return self.coordinator.get_event_at(now)
+        return self.schedule.get_event_at(now)
 
     async def async_get_events(
         self,
@@ -59,4 +61,7 @@ class PoltavaPowerOffCalendar(CoordinatorEntity[PoltavaPowerOffCoordinator], Cal
     ) -> list[CalendarEvent]:
         """Return calendar events within a datetime range."""
         LOGGER.debug('Getting all events between "%s" -> "%s"', start_date, end_date)
-        return self.coordinator.get_events_between(start_date, end_date)
+        return self.schedule.get_events_between(start_date, end_date)
+
+    def _state_snapshot(self) -> tuple[Any, ...]:
+        return (self.event,)
@@ -8,12 +8,26 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.config_entries import ConfigFlowResult
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry, ConfigFlowResult
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
-
-from .const import DOMAIN, POWEROFF_GROUP_CONF, PowerOffGroup
-from .energyua_scrapper import EnergyUaScrapper
+import homeassistant.helpers.config_validation as cv
+
+from .const import (
+    CONF_CACHE_TTL,
+    CONF_GROUPS,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DOMAIN,
+    HUB_CACHE_TTL,
+    POWEROFF_GROUP_CONF,
+    PowerOffGroup,
+)
+from .energyua_scrapper import UnrecognizedPageError
+from .hub import async_get_hub
+from .ratelimit import FetchPriority
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,14 +39,24 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
 
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
-    """Validate the user input allows us to connect.
+    """Validate the user input allows us to connect and get the schedule of the group.
 
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
     """
-    scrapper = EnergyUaScrapper(data[POWEROFF_GROUP_CONF])
-
-    if not await scrapper.validate():
-        raise CannotConnect
+    hub = async_get_hub(hass)
+    # Перевірка теж користується збереженою сесією cloudscraper, якщо виклик уже розв'язано
+    hub.async_start_warm_up()
+    group = data[POWEROFF_GROUP_CONF]
+    try:
+        # Користувач чекає на форму, тому запит іде поперед планових опитувань
+        schedule = await hub.async_fetch_schedule(group, priority=FetchPriority.INTERACTIVE)
+    except UnrecognizedPageError as err:
+        raise InvalidPage from err
+    except Exception as err:
+        raise CannotConnect from err
+
+    # Розібраний розклад отримає перше оновлення нового запису, без повторного завантаження
+    hub.async_hand_off(group, schedule)
 
     # Return info that you want to store in the config entry.
     return {
@@ -46,14 +70,24 @@ class PoltavaPowerOffConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the config flow."""
+        # Підписки на hub, щоб він дожив до запису з перевіреним розкладом і зупинився, якщо запису не буде
+        self._hub_subscriptions: dict[PowerOffGroup, CALLBACK_TYPE] = {}
+
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
         """Handle the initial step."""
         errors: dict[str, str] = {}
         if user_input is not None:
+            group = user_input[POWEROFF_GROUP_CONF]
+            if group not in self._hub_subscriptions:
+                self._hub_subscriptions[group] = async_get_hub(self.hass).async_subscribe(group)
             try:
                 info = await validate_input(self.hass, user_input)
             except CannotConnect:
                 errors["base"] = "cannot_connect"
+            except InvalidPage:
+                errors["base"] = "invalid_page"
             except Exception:
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
@@ -62,6 +96,70 @@ class PoltavaPowerOffConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors)
 
+    @callback
+    def async_remove(self) -> None:
+        """Release the hub when the flow finishes or is aborted.
+
+        A created entry is already set up and subscribed by then, otherwise the hub shuts down
+        as soon as nothing else uses it.
+        """
+        while self._hub_subscriptions:
+            self._hub_subscriptions.popitem()[1]()
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> PoltavaPowerOffOptionsFlow:
+        """Get the options flow for this handler."""
+        return PoltavaPowerOffOptionsFlow(config_entry)
+
+
+class PoltavaPowerOffOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for Poltava Power Offline."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        """Initialize the options flow."""
+        # OptionsFlow.config_entry з'явився лише в HA 2024.11, а задавати його явно там уже застаріло
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Manage the tracked groups, the polling bounds and the shared cache TTL."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_UPDATE_INTERVAL] > user_input[CONF_MAX_UPDATE_INTERVAL]:
+                errors["base"] = "invalid_interval_bounds"
+            elif not user_input[CONF_GROUPS]:
+                errors["base"] = "no_groups"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        options = self._entry.options
+        schema = vol.Schema(
+            {
+                # Один запис може стежити за кількома чергами, кожна отримує свої сенсори та календар
+                vol.Required(
+                    CONF_GROUPS,
+                    default=options.get(CONF_GROUPS, [self._entry.data[POWEROFF_GROUP_CONF]]),
+                ): cv.multi_select({group.value: group.value for group in PowerOffGroup}),
+                vol.Required(
+                    CONF_MIN_UPDATE_INTERVAL,
+                    default=options.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=30)),
+                vol.Required(
+                    CONF_MAX_UPDATE_INTERVAL,
+                    default=options.get(CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=30)),
+                vol.Required(
+                    CONF_CACHE_TTL,
+                    default=options.get(CONF_CACHE_TTL, HUB_CACHE_TTL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
+
+
+class InvalidPage(HomeAssistantError):
+    """Error to indicate the website does not serve a schedule for the group."""
@@ -8,6 +8,47 @@ POWEROFF_GROUP_CONF = "poweroff_group"
 
 UPDATE_INTERVAL = 300  # 5 minutes - баланс між актуальністю даних та навантаженням на сайт
 
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+DEFAULT_MIN_UPDATE_INTERVAL = 60
+DEFAULT_MAX_UPDATE_INTERVAL = 1800
+CONF_CACHE_TTL = "cache_ttl"
+# Скільки секунд результат завантаження групи можна віддавати іншим записам з пам'яті
+HUB_CACHE_TTL = 30
+# Скільки секунд розклад, завантажений під час додавання запису, чекає на перше оновлення цього запису
+HANDOFF_TTL = 120
+# Скільки сторінок груп завантажувати одночасно
+MAX_CONCURRENT_FETCHES = 4
+# Скільки секунд service refresh збирає виклики, щоб виконати їх одним оновленням
+REFRESH_COALESCE_WINDOW = 1.0
+# Скільки останніх оновлень зберігати для діагностики
+REFRESH_HISTORY_SIZE = 50
+# Процеси для пакетного парсингу сторінок кількох груп
+PARSE_WORKERS = 2
+CONF_GROUPS = "groups"
+# Години (локальні), коли зазвичай публікують графік на завтра
+PUBLICATION_HOURS = (16, 24)
+
+STORAGE_VERSION = 1
+# Ключ сховища останнього розкладу, доповнюється entry_id
+SCHEDULE_STORAGE_KEY = f"{DOMAIN}.schedule"
+SCHEDULE_SAVE_DELAY = 10  # секунд
+# Ключ hass.data для обмеження частоти запитів, яке переживає перезапуск hub
+RATE_LIMITER_KEY = f"{DOMAIN}_rate_limiter"
+# Ключ сховища cookies та заголовків сесії cloudscraper
+SESSION_STORAGE_KEY = f"{DOMAIN}.session"
+SESSION_SAVE_DELAY = 10  # секунд
+# Як часто сутності дізнаються про нові запити, якщо розклад не змінюється
+FETCHED_AT_RESOLUTION = 3600  # секунд
+
+# Версія формату розкладу, який отримують підписники websocket
+SCHEDULE_PAYLOAD_VERSION = 1
+# Сигнал вивантаження запису, доповнюється entry_id
+SIGNAL_ENTRY_UNLOADED = f"{DOMAIN}_entry_unloaded"
+
+# Каталог у конфігурації Home Assistant для результатів service profile
+PROFILE_DIRECTORY = f"{DOMAIN}_profiles"
+
 STATE_ON = "Power ON"
 STATE_OFF = "Power OFF"
 
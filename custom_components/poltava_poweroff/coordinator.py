@@ -1,168 +1,254 @@
 """Provides the PoltavaPowerOffCoordinator class for polling power off periods."""
 
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import logging
+import time
+from typing import Any
 
-from homeassistant.components.calendar import CalendarEvent
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, POWEROFF_GROUP_CONF, UPDATE_INTERVAL, PowerOffGroup, STATE_ON, STATE_OFF
-from .energyua_scrapper import EnergyUaScrapper
-from .entities import PowerOffPeriod
+from .const import (
+    CONF_CACHE_TTL,
+    CONF_GROUPS,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DOMAIN,
+    HUB_CACHE_TTL,
+    POWEROFF_GROUP_CONF,
+    REFRESH_HISTORY_SIZE,
+    SCHEDULE_STORAGE_KEY,
+    UPDATE_INTERVAL,
+    PowerOffGroup,
+)
+from .energyua_scrapper import FetchRecord
+from .hub import async_get_hub
+from .polling import AdaptivePollingPolicy, PollingPolicy
+from .ratelimit import FetchPriority
+from .schedule import GroupSchedule
 
 LOGGER = logging.getLogger(__name__)
 
 TIMEFRAME_TO_CHECK = timedelta(hours=24)
 
 
+@dataclass
+class GroupRefresh:
+    """How one group was refreshed."""
+
+    fetch: FetchRecord | None = None
+    # Результат отримано з пам'яті hub або від завантаження, яке почав інший запис
+    shared: bool = False
+    changed: bool = False
+    error: str | None = None
+
+
+@dataclass
+class RefreshRecord:
+    """One refresh of the coordinator, kept for diagnostics."""
+
+    at: datetime
+    duration: float | None = None
+    error: str | None = None
+    groups: dict[PowerOffGroup, GroupRefresh] = field(default_factory=dict)
+
+
 class PoltavaPowerOffCoordinator(DataUpdateCoordinator):
-    """Coordinates the polling of power off periods."""
+    """Coordinates the polling of power off periods of one or several groups."""
 
     config_entry: ConfigEntry
 
-    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        polling_policy: PollingPolicy | None = None,
+    ) -> None:
         """Initialize the coordinator."""
         super().__init__(
             hass,
             LOGGER,
             name=DOMAIN,
             update_interval=timedelta(seconds=UPDATE_INTERVAL),
+            always_update=False,
         )
         self.hass = hass
         self.config_entry = config_entry
+        # Група, для якої створено запис; опція groups може додати до неї інші
         self.group: PowerOffGroup = config_entry.data[POWEROFF_GROUP_CONF]
-        self.api = EnergyUaScrapper(self.group)
-        self.periods: list[PowerOffPeriod] = []  # Для сумісності з calendar - всі періоди
-        self.today_periods: list[PowerOffPeriod] = []
-        self.tomorrow_periods: list[PowerOffPeriod] = []
+        # Сторінки груп завантажує спільний hub, щоб записи однієї групи не дублювали запити
+        self.hub = async_get_hub(hass)
+        self.cache_ttl: float = config_entry.options.get(CONF_CACHE_TTL, HUB_CACHE_TTL)
+        self.polling = polling_policy or AdaptivePollingPolicy(
+            min_interval=config_entry.options.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL),
+            max_interval=config_entry.options.get(CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL),
+        )
+        # Єдиний "зараз" для всіх запитів у межах одного циклу оновлення
+        self.now: datetime = dt_util.now()
+        groups = [PowerOffGroup(group) for group in config_entry.options.get(CONF_GROUPS) or [self.group]]
+        self.groups: dict[PowerOffGroup, GroupSchedule] = {
+            group: GroupSchedule(hass, group, self._storage_key(group), self.now) for group in groups
+        }
+        # Скільки тривало останнє оновлення всіх груп, секунд
+        self.last_refresh_duration: float | None = None
+        # Останні оновлення з часом кожного кроку, для діагностики без debug логів
+        self.refresh_history: deque[RefreshRecord] = deque(maxlen=REFRESH_HISTORY_SIZE)
+        # Таймери на моменти зміни стану, щоб сенсори перемикались точно в час, а не при опитуванні
+        self._transition_unsubs: dict[datetime, CALLBACK_TYPE] = {}
+        # Очікування результатів hub, які скасовуються при вивантаженні запису
+        self._fetches: set[asyncio.Task] = set()
+        # Пріоритет запитів поточного оновлення в черзі обмеження частоти запитів
+        self._priority = FetchPriority.BACKGROUND
+
+    def _storage_key(self, group: PowerOffGroup) -> str:
+        key = f"{SCHEDULE_STORAGE_KEY}.{self.config_entry.entry_id}"
+        # Основна група зберігається під старим ключем, щоб не втратити розклад, збережений до появи опції groups
+        return key if group == self.group else f"{key}.{group}"
+
+    def _set_now(self, now: datetime) -> None:
+        self.now = now
+        for schedule in self.groups.values():
+            schedule.now = now
 
     async def _async_update_data(self) -> dict:
-        """Fetch power off periods from scrapper."""
+        """Fetch power off periods of all groups through the hub.
+
+        The returned data only changes with the schedules, so listeners are not called
+        for polls that brought nothing new. A group that failed keeps its last schedule,
+        the update only fails when no group could be fetched.
+        """
+        self._set_now(dt_util.now())
+        LOGGER.debug("Starting _async_update_data for groups %s", ", ".join(self.groups))
+        started = time.monotonic()
+        record = RefreshRecord(self.now)
+        self.refresh_history.append(record)
+        # Окреме завдання: заплановане оновлення DataUpdateCoordinator не скасовується при вивантаженні
+        # Ручне оновлення завжди завантажує сторінки, сплески викликів об'єднує вікно RefreshCoalescer
+        max_age = 0 if self._priority is FetchPriority.INTERACTIVE else self.cache_ttl
+        fetch = asyncio.ensure_future(
+            self.hub.async_fetch_schedules(self.groups, max_age=max_age, priority=self._priority)
+        )
+        self._fetches.add(fetch)
         try:
-            LOGGER.debug("Starting _async_update_data for group %s", self.group)
-            await self._fetch_periods()
-            LOGGER.debug("After _fetch_periods, periods count: %d", len(self.periods))
-            return {}  # noqa: TRY300
+            results = await fetch
+        except asyncio.CancelledError:
+            record.error = "cancelled"
+            raise
         except Exception as err:
-            LOGGER.exception("Cannot obtain power offs periods for group %s", self.group)
+            LOGGER.exception("Cannot obtain power offs periods for groups %s", ", ".join(self.groups))
+            record.error = repr(err)
+            self.update_interval = self.polling.on_failure(self.now)
+            msg = f"Power offs not polled: {err}"
+            raise UpdateFailed(msg) from err
+        finally:
+            self._fetches.discard(fetch)
+        self.last_refresh_duration = record.duration = time.monotonic() - started
+        LOGGER.debug("Refreshed %d groups in %.2f s", len(self.groups), self.last_refresh_duration)
+        for group, result in results.items():
+            fetch = self.hub.scraper(group).last_fetch
+            record.groups[group] = GroupRefresh(
+                fetch=fetch,
+                shared=fetch is None or fetch.started < started,
+                error=repr(result) if isinstance(result, Exception) else None,
+            )
+
+        errors = {group: result for group, result in results.items() if isinstance(result, Exception)}
+        for group, err in errors.items():
+            LOGGER.error("Cannot obtain power offs periods for group %s", group, exc_info=err)
+        if len(errors) == len(self.groups):
+            self.update_interval = self.polling.on_failure(self.now)
+            err = next(iter(errors.values()))
             msg = f"Power offs not polled: {err}"
             raise UpdateFailed(msg) from err
 
-    async def _fetch_periods(self) -> None:
-        LOGGER.debug("Calling api.get_power_off_periods() for group %s", self.group)
-        today_periods, tomorrow_periods = await self.api.get_power_off_periods()
-        self.today_periods = today_periods
-        self.tomorrow_periods = tomorrow_periods
-        # Для calendar - об'єднуємо всі періоди
-        self.periods = today_periods + tomorrow_periods
-        LOGGER.debug(
-            "Fetched %d today periods, %d tomorrow periods", len(self.today_periods), len(self.tomorrow_periods)
-        )
-
-    def _get_next_power_change_dt(self, on: bool, use_tomorrow_if_no_today: bool = True) -> datetime | None:
-        """Get the next power on/off.
-
-        Args:
-            on: True for power on, False for power off
-            use_tomorrow_if_no_today: If True and no today events found, check tomorrow
-        """
-        now = dt_util.now()
-        # Спочатку шукаємо в сьогоднішніх періодах
-        today_events = []
-        for period in self.today_periods:
-            start, end = period.to_datetime_period(now.tzinfo)
-            if start > now or end > now:
-                today_events.append(self._get_calendar_event(start, end))
-
-        if today_events:
-            if on:
-                dts = sorted(event.end for event in today_events)
-            else:
-                dts = sorted(event.start for event in today_events)
-            LOGGER.debug("Next dts from today: %s", dts)
-            for dt in dts:
-                if dt > now:
-                    return dt  # type: ignore
-
-        # Якщо сьогодні немає більше подій і дозволено, шукаємо в завтрашніх
-        if use_tomorrow_if_no_today and self.tomorrow_periods:
-            tomorrow_events = []
-            for period in self.tomorrow_periods:
-                start, end = period.to_datetime_period(now.tzinfo)
-                tomorrow_events.append(self._get_calendar_event(start, end))
-
-            if tomorrow_events:
-                if on:
-                    dts = sorted(event.end for event in tomorrow_events)
-                else:
-                    dts = sorted(event.start for event in tomorrow_events)
-                LOGGER.debug("Next dts from tomorrow: %s", dts)
-                if dts:
-                    return dts[0]  # type: ignore
-
-        return None
-
-    @property
-    def next_poweroff(self) -> datetime | None:
-        """Get the next poweroff time."""
-        dt = self._get_next_power_change_dt(on=False)
-        LOGGER.debug("Next poweroff: %s", dt)
-        return dt
+        changed = False
+        for group, result in results.items():
+            if not isinstance(result, Exception):
+                record.groups[group].changed = self.groups[group].apply(result)
+                changed |= record.groups[group].changed
+        if changed:
+            self._async_arm_transitions()
+        has_tomorrow = all(schedule.tomorrow_periods for schedule in self.groups.values())
+        self.update_interval = self.polling.on_success(changed, has_tomorrow, self.now)
+        return self._data()
+
+    async def async_refresh_interactive(self) -> None:
+        """Refresh now, bypassing the hub cache, with the requests ahead of the background polls of all entries."""
+        self._priority = FetchPriority.INTERACTIVE
+        try:
+            await self.async_refresh()
+        finally:
+            self._priority = FetchPriority.BACKGROUND
 
-    @property
-    def next_poweron(self) -> datetime | None:
-        """Get next connectivity time."""
-        dt = self._get_next_power_change_dt(on=True)
-        LOGGER.debug("Next powerof: %s", dt)
-        return dt
+    def _data(self) -> dict[str, Any]:
+        """Get the coordinator data, which only changes with the schedules or their age."""
+        return {group: (schedule.digest, schedule.fetched_at) for group, schedule in self.groups.items()}
 
     @property
-    def current_state(self) -> str:
-        """Get the current state."""
-        now = dt_util.now()
-        event = self.get_event_at(now)
-        return STATE_OFF if event else STATE_ON
-
-    def get_event_at(self, at: datetime) -> CalendarEvent | None:
-        """Get the current event."""
-        # Спочатку перевіряємо сьогоднішні періоди
-        for period in self.today_periods:
-            start, end = period.to_datetime_period(at.tzinfo)
-            # Використовуємо start <= at < end, щоб коли at == end, подія вже не активна
-            # Це важливо для періодів, що закінчуються в 12:00 (опівночі або опівдня)
-            if start <= at < end:
-                return self._get_calendar_event(start, end)
-        return None
-
-    def get_events_between(
-        self,
-        start_date: datetime,
-        end_date: datetime,
-    ) -> list[CalendarEvent]:
-        """Get all events."""
-        events = []
-        for period in self.periods:
-            start, end = period.to_datetime_period(start_date.tzinfo)
-            if start_date <= start <= end_date or start_date <= end <= end_date:
-                events.append(self._get_calendar_event(start, end))
-        return events
-
-    def _get_calendar_event(self, start: datetime, end: datetime) -> CalendarEvent:
-        return CalendarEvent(
-            start=start,
-            end=end,
-            summary=STATE_OFF,
-        )
+    def has_schedule(self) -> bool:
+        """Whether a schedule of any group is known."""
+        return any(schedule.has_schedule for schedule in self.groups.values())
 
-    def get_next_off_time(self) -> str | None:
-        """Get the next poweroff time as string."""
-        dt = self.next_poweroff
-        return dt.isoformat() if dt else None
+    async def async_restore_schedule(self) -> bool:
+        """Restore the last saved schedules, dropping days that have passed.
 
-    def get_next_on_time(self) -> str | None:
-        """Get next connectivity time as string."""
-        dt = self.next_poweron
-        return dt.isoformat() if dt else None
+        Returns True when there is a schedule to show until the first refresh.
+        """
+        restored = [await schedule.async_restore() for schedule in self.groups.values()]
+        if not any(restored):
+            return False
+        self._async_arm_transitions()
+        self.async_set_updated_data(self._data())
+        return True
+
+    async def async_shutdown(self) -> None:
+        """Cancel the running refresh and transition timers and shut down the coordinator."""
+        await super().async_shutdown()
+        for fetch in self._fetches:
+            fetch.cancel()
+        self._async_cancel_transitions()
+
+    @callback
+    def _async_arm_transitions(self) -> None:
+        """Arm a timer at every known state change and at the next midnight.
+
+        Timers for moments that are no longer in the schedules are cancelled, timers that
+        are still valid are kept as they are.
+        """
+        moments = {
+            moment for schedule in self.groups.values() for moment in schedule.timeline.boundaries_after(self.now)
+        }
+        moments.add(dt_util.start_of_local_day(self.now.date() + timedelta(days=1)))
+
+        for moment in set(self._transition_unsubs) - moments:
+            self._transition_unsubs.pop(moment)()
+        for moment in moments - set(self._transition_unsubs):
+            self._transition_unsubs[moment] = async_track_point_in_time(
+                self.hass, self._async_handle_transition, moment
+            )
+        LOGGER.debug("Armed %d transition timers for groups %s", len(self._transition_unsubs), ", ".join(self.groups))
+
+    @callback
+    def _async_cancel_transitions(self) -> None:
+        for unsub in self._transition_unsubs.values():
+            unsub()
+        self._transition_unsubs.clear()
+
+    @callback
+    def _async_handle_transition(self, _now: datetime) -> None:
+        """Push the new state to entities at a scheduled moment without fetching."""
+        self._set_now(dt_util.now())
+        for moment in [moment for moment in self._transition_unsubs if moment <= self.now]:
+            del self._transition_unsubs[moment]
+        LOGGER.debug("Scheduled transition at %s for groups %s", self.now, ", ".join(self.groups))
+        self.async_update_listeners()
+        # Опівночі додаємо таймер на наступну північ
+        self._async_arm_transitions()
@@ -0,0 +1,128 @@
+"""Provides diagnostics for the Poltava Power Offline integration."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import asdict
+import math
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .coordinator import GroupRefresh, PoltavaPowerOffCoordinator, RefreshRecord
+from .ratelimit import TokenBucket
+from .schedule import GroupSchedule
+
+# Часи кроків завантаження, для яких рахуємо зведення
+FETCH_TIMINGS = ("dns", "connect", "wait", "transfer")
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,  # noqa: ARG001
+    entry: ConfigEntry,
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: PoltavaPowerOffCoordinator = entry.runtime_data
+    hub_stats = coordinator.hub.stats
+    history = list(coordinator.refresh_history)
+    return {
+        "group": coordinator.group,
+        "update_interval": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+        "last_refresh_duration": coordinator.last_refresh_duration,
+        "groups": {group: _group_diagnostics(coordinator, schedule) for group, schedule in coordinator.groups.items()},
+        "hub": {
+            "cache_ttl": coordinator.cache_ttl,
+            "fetched": hub_stats.fetched,
+            "memory_hits": hub_stats.memory_hits,
+            "merged": hub_stats.merged,
+            "rate_limiter": _rate_limiter_diagnostics(coordinator.hub.rate_limiter),
+        },
+        "refreshes": [_refresh_diagnostics(record) for record in history],
+        "aggregates": _aggregates(history),
+    }
+
+
+def _rate_limiter_diagnostics(limiter: TokenBucket) -> dict[str, Any]:
+    return {"rate": limiter.rate, "base_rate": limiter.base_rate, "burst": limiter.burst, **asdict(limiter.stats)}
+
+
+def _group_diagnostics(coordinator: PoltavaPowerOffCoordinator, schedule: GroupSchedule) -> dict[str, Any]:
+    scraper = coordinator.hub.scraper(schedule.group)
+    stats = scraper.stats
+    return {
+        "transport": scraper.transport.name,
+        "schedule_digest": schedule.digest,
+        "fetch_cache": {
+            "hits": stats.hits,
+            "misses": stats.misses,
+            "not_modified": stats.not_modified,
+            "unchanged": stats.unchanged,
+        },
+    }
+
+
+def _refresh_diagnostics(record: RefreshRecord) -> dict[str, Any]:
+    return {
+        "at": record.at.isoformat(),
+        "duration": record.duration,
+        "error": record.error,
+        "groups": {group: _group_refresh(refresh) for group, refresh in record.groups.items()},
+    }
+
+
+def _group_refresh(refresh: GroupRefresh) -> dict[str, Any]:
+    result: dict[str, Any] = {"shared": refresh.shared, "changed": refresh.changed, "error": refresh.error}
+    if (fetch := refresh.fetch) is not None:
+        result.update(asdict(fetch))
+        del result["started"]
+        if (trace := result.pop("trace")) is not None:
+            trace.pop("_marks")
+            trace["challenge"] |= result["challenge"]
+            result.update(trace)
+    return result
+
+
+def _own_fetches(history: list[RefreshRecord]) -> Iterable[GroupRefresh]:
+    """Group refreshes that really fetched, not served by the hub to another entry."""
+    for record in history:
+        for refresh in record.groups.values():
+            if refresh.fetch is not None and not refresh.shared:
+                yield refresh
+
+
+def _aggregates(history: list[RefreshRecord]) -> dict[str, Any]:
+    """Get min/p50/p95/max of the refresh, fetch step and parse durations."""
+    fetches = list(_own_fetches(history))
+    traces = [refresh.fetch.trace for refresh in fetches if refresh.fetch and refresh.fetch.trace]
+    aggregates = {
+        "refresh": _summary(record.duration for record in history),
+        **{name: _summary(getattr(trace, name) for trace in traces) for name in FETCH_TIMINGS},
+        "queue_wait": _summary(refresh.fetch.queue_wait for refresh in fetches if refresh.fetch),
+        "parse": _summary(refresh.fetch.parse_time for refresh in fetches if refresh.fetch),
+        "size": _summary(trace.size for trace in traces),
+    }
+    aggregates["failed"] = sum(record.error is not None for record in history)
+    aggregates["failed_fetches"] = sum(
+        refresh.error is not None for record in history for refresh in record.groups.values()
+    )
+    aggregates["challenges"] = sum(bool(refresh.fetch and refresh.fetch.challenge) for refresh in fetches)
+    return aggregates
+
+
+def _summary(values: Iterable[float | None]) -> dict[str, float] | None:
+    ordered = sorted(value for value in values if value is not None)
+    if not ordered:
+        return None
+    return {
+        "count": len(ordered),
+        "min": ordered[0],
+        "p50": _percentile(ordered, 0.5),
+        "p95": _percentile(ordered, 0.95),
+        "max": ordered[-1],
+    }
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
@@ -3,66 +3,250 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from concurrent.futures import Executor
+from dataclasses import dataclass, replace
+from functools import cache
+import hashlib
+from html.parser import HTMLParser
+from importlib.util import find_spec
 import logging
 import re
+import time
+from typing import TYPE_CHECKING, NamedTuple, TypeVar
 
-import cloudscraper  # type: ignore[import-untyped]
-from bs4 import BeautifulSoup, Tag
+import aiohttp
 
-from .const import PowerOffGroup
-from .entities import PowerOffPeriod
+from homeassistant.util import dt as dt_util
+
+from .const import PARSE_WORKERS, PowerOffGroup
+from .entities import DaySchedule, PowerOffPeriod, PowerOffSchedule
+from .ratelimit import FetchPriority, TokenBucket
+from .transport import AiohttpTransport, ChallengeError, CloudscraperTransport, FetchResponse, FetchTrace
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+    from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+_T = TypeVar("_T")
+
+# Розклад сторінки у хвилинах: (сьогодні, завтра, шлях парсера, тривалість), кожен день - кортеж (початок, кінець)
+PageMinutes = tuple[tuple[tuple[int, int], ...], tuple[tuple[int, int], ...], str, float]
 
 LOGGER = logging.getLogger(__name__)
 
 URL = "https://energy-ua.info/cherga/{}"
 
+# lxml будує дерево значно швидше за html.parser, але це необов'язкова залежність.
+# find_spec лише шукає модуль: bs4 та lxml імпортуються при першому розборі, у потоці executor,
+# а не під час завантаження інтеграції
+PARSER_FEATURES = "lxml" if find_spec("lxml") is not None else "html.parser"
+
+# Будуємо лише ті піддерева, з яких читаємо розклад, замість повного DOM сторінки
+SCHEDULE_CLASSES = ("scale_info_periods", "ch_day_title", "scale_hours")
+
+
+@cache
+def schedule_strainer() -> SoupStrainer:
+    """Get the strainer that keeps only the schedule subtrees."""
+    from bs4 import SoupStrainer  # noqa: PLC0415
+
+    return SoupStrainer(["div", "h4"], class_=SCHEDULE_CLASSES)
+
+
+# Блоки графіка черги різних версій розмітки сайту. Вони є і тоді, коли відключень немає,
+# а на сторінці помилки чи виклику Cloudflare їх немає
+SCHEDULE_BLOCK_RE = re.compile(
+    r'class="[^"]*\b(?:scale_info_periods|ch_day_title|scale_hours|scale_block|grafik_string)\b'
+)
+
+# Текст періоду виду "З 12:00 до 14:30"
+PERIOD_RE = re.compile(r"З\s+(\d{1,2}:\d{2})\s+до\s+(\d{1,2}:\d{2})")
+
+REQUEST_HEADERS = {
+    "Cache-Control": "no-cache, no-store, must-revalidate",
+    "Pragma": "no-cache",
+    "Expires": "0",
+}
+
+# Фрагменти сторінки, від яких залежить розклад: заголовки днів, дати, періоди та стан годин.
+# Решта сторінки (таймери, реклама, прозорість минулих годин) змінюється між запитами
+FINGERPRINT_RE = re.compile(
+    r'class="(?:ch_day_title|scale_info_title|scale_info_ch_date)">[^<]*'
+    r'|class="hour_info_(?:from|to)">[^<]*'
+    r'|class="hour_status[^"]*"'
+    r"|З\s*<b>\d{1,2}:\d{2}</b>\s*до\s*<b>\d{1,2}:\d{2}</b>"
+)
+
+
+class UnrecognizedPageError(Exception):
+    """Error to indicate a page without a recognizable schedule."""
+
+
+@dataclass
+class FetchStats:
+    """Counts of fetches, split by how much work they needed."""
+
+    not_modified: int = 0  # сервер відповів 304
+    unchanged: int = 0  # сторінка та сама за відбитком, парсинг пропущено
+    parsed: int = 0
+
+    @property
+    def hits(self) -> int:
+        """Fetches that skipped parsing."""
+        return self.not_modified + self.unchanged
+
+    @property
+    def misses(self) -> int:
+        """Fetches that had to be parsed."""
+        return self.parsed
+
+
+@dataclass
+class FetchRecord:
+    """What the last fetch of a group did and how long each step took."""
+
+    started: float  # time.monotonic()
+    transport: str | None = None
+    status: int | None = None
+    trace: FetchTrace | None = None
+    challenge: bool = False  # виклик Cloudflare: перехід на cloudscraper або розв'язаний ним
+    queue_wait: float = 0.0  # секунд у черзі спільного обмеження частоти запитів
+    outcome: str = "pending"  # not_modified, unchanged або parsed
+    parser: str | None = None
+    parse_time: float | None = None
+    today_periods: int | None = None
+    tomorrow_periods: int | None = None
+
+
+class ParsedPage(NamedTuple):
+    """Periods parsed from a page, with the parser path that found them."""
+
+    today: list[PowerOffPeriod]
+    tomorrow: list[PowerOffPeriod]
+    parser: str  # scale_info_periods або scale_hours, якщо хоч один день взято зі шкали годин
+    parse_time: float
+
+
+@dataclass(frozen=True)
+class UnparsedPage:
+    """Fetched page whose schedule changed and still has to be parsed."""
+
+    text: str
+    digest: str
+    date: str
+    # Валідатори сторінки запам'ятовуються лише разом з розібраним розкладом
+    etag: str | None = None
+    last_modified: str | None = None
+
 
 class EnergyUaScrapper:
     """Class for scraping power off periods from the Energy UA website."""
 
-    def __init__(self, group: PowerOffGroup) -> None:
-        """Initialize the EnergyUaScrapper object."""
+    def __init__(
+        self,
+        group: PowerOffGroup,
+        session: aiohttp.ClientSession | None = None,
+        transports: list[AiohttpTransport | CloudscraperTransport] | None = None,
+        rate_limiter: TokenBucket | None = None,
+    ) -> None:
+        """Initialize the EnergyUaScrapper object.
+
+        With a session, pages are fetched with aiohttp and cloudscraper is only used once
+        a Cloudflare challenge shows up. Without it, cloudscraper is used for everything.
+        `transports` shares already created transports instead, in fallback order.
+        Every request, including a retry with the next transport, first takes a token from
+        `rate_limiter`, which also slows down when the website throttles.
+        """
         self.group = group
-        self.scraper = None
-
-    async def _get_scraper(self):
-        """Get or create cloudscraper instance."""
-        if self.scraper is None:
-            self.scraper = await asyncio.to_thread(
-                cloudscraper.create_scraper, browser={"browser": "chrome", "platform": "windows", "desktop": True}
-            )
-        return self.scraper
-
-    async def validate(self) -> bool:
-        """Validate connection to the website."""
-        try:
-            scraper = await self._get_scraper()
-            headers = {
-                "Cache-Control": "no-cache, no-store, must-revalidate",
-                "Pragma": "no-cache",
-                "Expires": "0",
-            }
-            response = await asyncio.to_thread(scraper.get, URL.format(self.group), headers=headers)
-            return response.status_code == 200
-        except Exception:
-            return False
+        self.transports: list[AiohttpTransport | CloudscraperTransport] = []
+        if transports is not None:
+            self.transports.extend(transports)
+        else:
+            if session is not None:
+                self.transports.append(AiohttpTransport(session))
+            self.transports.append(CloudscraperTransport())
+        self._transport_index = 0
+        self.rate_limiter = rate_limiter
+        self.stats = FetchStats()
+        self.last_fetch: FetchRecord | None = None
+        # Останній розклад та валідатори для умовних запитів
+        self._schedule: PowerOffSchedule | None = None
+        self._schedule_date: str | None = None
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+
+    @property
+    def transport(self) -> AiohttpTransport | CloudscraperTransport:
+        """Get the transport that currently works for the website."""
+        return self.transports[self._transport_index]
+
+    async def _with_fallback(
+        self,
+        request: Callable[[AiohttpTransport | CloudscraperTransport], Awaitable[_T]],
+        priority: FetchPriority = FetchPriority.BACKGROUND,
+        record: FetchRecord | None = None,
+    ) -> _T:
+        """Run the request, moving to the next transport when a challenge is detected.
+
+        The transport that passed is remembered, so later requests start from it.
+        Time spent waiting for the rate limiter is added to `record`.
+        """
+        while True:
+            if self.rate_limiter is not None:
+                wait = await self.rate_limiter.acquire(priority)
+                if record is not None:
+                    record.queue_wait += wait
+            try:
+                return await request(self.transport)
+            except ChallengeError:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.slow_down()
+                if self._transport_index + 1 >= len(self.transports):
+                    raise
+                self._transport_index += 1
+                LOGGER.info("Cloudflare challenge detected, switching to %s transport", self.transport.name)
+
+    async def _fetch(
+        self,
+        headers: Mapping[str, str] = REQUEST_HEADERS,
+        priority: FetchPriority = FetchPriority.BACKGROUND,
+        record: FetchRecord | None = None,
+    ) -> FetchResponse:
+        transport_index = self._transport_index
+
+        async def request(transport: AiohttpTransport | CloudscraperTransport) -> FetchResponse:
+            # REQUEST_HEADERS запобігають кешуванню відповіді проміжними кешами
+            response = await transport.fetch(URL.format(self.group), headers)
+            challenge = response.trace is not None and response.trace.challenge
+            # Виклик, через який запит перейшов на цей транспорт, уже сповільнив запити в _with_fallback
+            if self.rate_limiter is not None and not (challenge and self._transport_index != transport_index):
+                # 429/503 без ознак виклику та виклик, розв'язаний cloudscraper, теж сповільнюють запити
+                self.rate_limiter.on_response(response.status, response.headers, challenge)
+            return response
+
+        return await self._with_fallback(request, priority, record)
+
+    async def fetch_text(self) -> str:
+        """Fetch the whole page, without validators and without touching the cached schedule."""
+        response = await self._fetch()
+        return response.text
+
+    @staticmethod
+    def has_schedule_blocks(content: str) -> bool:
+        """Check whether the page has the schedule markup, without parsing it."""
+        return SCHEDULE_BLOCK_RE.search(content) is not None
 
     @staticmethod
     def merge_periods(periods: list[PowerOffPeriod]) -> list[PowerOffPeriod]:
+        """Merge overlapping and adjacent periods of one day into sorted periods.
+
+        The input is left untouched, a period that crosses midnight keeps its end on the next day.
+        """
         if not periods:
             return []
-
-        periods.sort(key=lambda x: x.start)
-
-        merged_periods = [periods[0]]
-        for current in periods[1:]:
-            last = merged_periods[-1]
-            if current.start <= last.end:
-                last.end = max(last.end, current.end)
-                continue
-            merged_periods.append(current)
-
-        return merged_periods
+        return DaySchedule.from_periods(periods).to_periods(today=periods[0].today)
 
     async def get_power_off_periods(self) -> tuple[list[PowerOffPeriod], list[PowerOffPeriod]]:
         """Get power off periods from the website.
@@ -70,16 +254,173 @@ class EnergyUaScrapper:
         Returns:
             Tuple of (today_periods, tomorrow_periods)
         """
-        scraper = await self._get_scraper()
-        # Додаємо заголовки для запобігання кешування
-        headers = {
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Pragma": "no-cache",
-            "Expires": "0",
-        }
-        response = await asyncio.to_thread(scraper.get, URL.format(self.group), headers=headers)
-        content = response.text
-        soup = BeautifulSoup(content, "html.parser")
+        schedule = await self.fetch_schedule()
+        return schedule.today, schedule.tomorrow
+
+    async def fetch_schedule(self) -> PowerOffSchedule:
+        """Fetch the schedule, skipping the parse when the page has not changed.
+
+        Sends ETag / Last-Modified validators when the server provided them. When the server
+        does not answer 304, the schedule fragments of the page are hashed and compared with
+        the previous fetch. Unchanged schedules are returned with `not_modified` set.
+        """
+        page = await self.fetch_page()
+        if isinstance(page, PowerOffSchedule):
+            return page
+        # Парсинг завантажує CPU, тому виконуємо його поза event loop
+        return self.apply_parsed(page, await asyncio.to_thread(self.parse_page, page.text))
+
+    async def fetch_page(self, priority: FetchPriority = FetchPriority.BACKGROUND) -> PowerOffSchedule | UnparsedPage:
+        """Fetch the page, returning the schedule when it is unchanged or the page to parse.
+
+        The page is passed to `parse_page` and the result to `apply_parsed`, which lets
+        callers parse pages of several groups together. Timings go to `last_fetch`.
+        `priority` orders the request among the ones waiting for the rate limiter.
+        """
+        today = dt_util.now().date().isoformat()
+        if self._schedule_date != today:
+            # "Сьогодні" на сторінці вже інший день, тому попередній розклад не годиться
+            self._schedule = None
+            self._etag = self._last_modified = None
+
+        headers = dict(REQUEST_HEADERS)
+        if self._schedule is not None:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+        record = self.last_fetch = FetchRecord(time.monotonic())
+        transport_index = self._transport_index
+        response = await self._fetch(headers, priority, record)
+        record.transport = response.transport
+        record.status = response.status
+        record.trace = response.trace
+        record.challenge = self._transport_index != transport_index or bool(response.trace and response.trace.challenge)
+
+        if response.status == 304 and self._schedule is not None:
+            self.stats.not_modified += 1
+            record.outcome = "not_modified"
+            LOGGER.debug("Page for group %s not modified (304)", self.group)
+            return replace(self._schedule, not_modified=True)
+        if not self.has_schedule_blocks(response.text):
+            # Порожній розклад зі сторінки помилки затер би відомий
+            record.outcome = "unrecognized"
+            msg = f"No schedule on the page of group {self.group} (HTTP {response.status})"
+            raise UnrecognizedPageError(msg)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+
+        digest = self.schedule_fingerprint(response.text, today)
+        if self._schedule is not None and digest == self._schedule.digest:
+            # Розклад той самий, тож нові валідатори описують уже відомий розклад
+            self._etag, self._last_modified = etag, last_modified
+            self.stats.unchanged += 1
+            record.outcome = "unchanged"
+            LOGGER.debug("Schedule for group %s unchanged, parsing skipped", self.group)
+            return replace(self._schedule, not_modified=True)
+        # Якщо розбір не вдасться, 304 на нові валідатори повернув би старий розклад
+        return UnparsedPage(response.text, digest, today, etag, last_modified)
+
+    def apply_parsed(self, page: UnparsedPage, parsed: ParsedPage) -> PowerOffSchedule:
+        """Remember the parsed periods of the page and return its schedule."""
+        self.stats.parsed += 1
+        if (record := self.last_fetch) is not None:
+            record.outcome = "parsed"
+            record.parser = parsed.parser
+            record.parse_time = parsed.parse_time
+            record.today_periods = len(parsed.today)
+            record.tomorrow_periods = len(parsed.tomorrow)
+        self._schedule = PowerOffSchedule(parsed.today, parsed.tomorrow, page.digest)
+        self._schedule_date = page.date
+        self._etag = page.etag
+        self._last_modified = page.last_modified
+        return self._schedule
+
+    @staticmethod
+    def schedule_fingerprint(content: str, date: str) -> str:
+        """Hash the normalized schedule fragments of the page together with the local date."""
+        fragments = "\n".join(match.group() for match in FINGERPRINT_RE.finditer(content))
+        return hashlib.sha256(f"{date}\n{fragments}".encode()).hexdigest()
+
+    async def stream_power_off_periods(self) -> tuple[list[PowerOffPeriod], list[PowerOffPeriod]]:
+        """Get power off periods while the page is still downloading.
+
+        Returns the same tuple as `get_power_off_periods`, but never holds the whole page in memory
+        and stops reading as soon as both days are parsed. The integration itself does not use it:
+        it fingerprints the whole page to skip parsing, so this is an opt-in API for other callers.
+        """
+        parser = EnergyUaStreamParser()
+
+        async def request(transport: AiohttpTransport | CloudscraperTransport) -> None:
+            parser.reset()
+            await transport.stream(URL.format(self.group), REQUEST_HEADERS, parser)
+
+        await self._with_fallback(request)
+        return parser.result()
+
+    @classmethod
+    def parse_power_off_periods_stream(cls, chunks) -> tuple[list[PowerOffPeriod], list[PowerOffPeriod]]:
+        """Parse power off periods from an iterable of text chunks."""
+        parser = EnergyUaStreamParser()
+        for chunk in chunks:
+            parser.feed(chunk)
+            if parser.done:
+                break
+        else:
+            parser.close()
+        return parser.result()
+
+    @classmethod
+    def parse_power_off_periods(cls, content: str | bytes) -> tuple[list[PowerOffPeriod], list[PowerOffPeriod]]:
+        """Parse power off periods from the page content.
+
+        Only the schedule subtrees are built. This is CPU bound, call it from an executor.
+        """
+        parsed = cls.parse_page(content)
+        return parsed.today, parsed.tomorrow
+
+    @classmethod
+    def parse_page(cls, content: str | bytes) -> ParsedPage:
+        """Parse the page like `parse_power_off_periods`, also telling how and how fast."""
+        from bs4 import BeautifulSoup  # noqa: PLC0415
+
+        started = time.perf_counter()
+        soup = BeautifulSoup(content, PARSER_FEATURES, parse_only=schedule_strainer())
+        today, tomorrow, parser = cls._extract_page(soup)
+        return ParsedPage(today, tomorrow, parser, time.perf_counter() - started)
+
+    @classmethod
+    def parse_power_off_periods_batch(
+        cls,
+        contents: Sequence[str | bytes],
+        executor: Executor | None = None,
+        workers: int = PARSE_WORKERS,
+    ) -> list[tuple[list[PowerOffPeriod], list[PowerOffPeriod]]]:
+        """Parse many pages in worker processes, in the order given.
+
+        Pages are sent to the workers as UTF-8 bytes and only the period minutes come back.
+        Uses `executor` when given, otherwise a pool of `workers` processes created for this
+        call; a single page or one worker is parsed in this process. Blocks, call it from an executor.
+        """
+        pages = [content.encode() if isinstance(content, str) else content for content in contents]
+        if executor is None and (len(pages) <= 1 or workers <= 1):
+            return [cls.parse_power_off_periods(page) for page in pages]
+        if executor is not None:
+            return [periods_from_minutes(minutes)[:2] for minutes in executor.map(parse_page_minutes, pages)]
+        with create_parse_pool(min(workers, len(pages))) as pool:
+            return [periods_from_minutes(minutes)[:2] for minutes in pool.map(parse_page_minutes, pages)]
+
+    @classmethod
+    def _extract_periods(cls, soup: BeautifulSoup) -> tuple[list[PowerOffPeriod], list[PowerOffPeriod]]:
+        """Extract today and tomorrow periods from a parsed page."""
+        today, tomorrow, _ = cls._extract_page(soup)
+        return today, tomorrow
+
+    @classmethod
+    def _extract_page(cls, soup: BeautifulSoup) -> tuple[list[PowerOffPeriod], list[PowerOffPeriod], str]:
+        """Extract today and tomorrow periods from a parsed page, with the parser path used."""
+        from bs4 import Tag  # noqa: PLC0415
+
         today_results: list[PowerOffPeriod] = []
         tomorrow_results: list[PowerOffPeriod] = []
 
@@ -100,19 +441,21 @@ class EnergyUaScrapper:
             title_text = title.get_text().strip().lower()
             # Парсимо блоки для сьогодні
             if "сьогодні" in title_text or "сегодня" in title_text:
-                periods = self._parse_periods_from_text_block(scale_info_block, today=True)
+                periods = cls._parse_periods_from_text_block(scale_info_block, today=True)
                 if periods:
                     today_results.extend(periods)
                     today_periods_found = True
             # Парсимо блоки для завтра
             elif "завтра" in title_text or "завтра" in title_text:
-                periods = self._parse_periods_from_text_block(scale_info_block, today=False)
+                periods = cls._parse_periods_from_text_block(scale_info_block, today=False)
                 if periods:
                     tomorrow_results.extend(periods)
                     tomorrow_periods_found = True
 
         # Якщо не знайшли періоди через scale_info_periods, використовуємо fallback
+        parser = "scale_info_periods"
         if not today_periods_found or not tomorrow_periods_found:
+            parser = "scale_hours"
             if not today_periods_found:
                 LOGGER.debug(
                     "Не знайдено періодів для сьогодні через scale_info_periods, використовуємо fallback з scale_hours"
@@ -142,7 +485,7 @@ class EnergyUaScrapper:
                         scale_hours_el = scale_hours_block.find_all("div", class_="scale_hours_el")
                         for item in scale_hours_el:
                             if item.find("span", class_="hour_active"):
-                                start, end = self._parse_item(item)
+                                start, end = cls._parse_item(item)
                                 period = PowerOffPeriod(start, end, today=True)
                                 today_results.append(period)
                                 LOGGER.debug("Додано сьогоднішній період: %s-%s", start, end)
@@ -151,14 +494,14 @@ class EnergyUaScrapper:
                         scale_hours_el = scale_hours_block.find_all("div", class_="scale_hours_el")
                         for item in scale_hours_el:
                             if item.find("span", class_="hour_active"):
-                                start, end = self._parse_item(item)
+                                start, end = cls._parse_item(item)
                                 period = PowerOffPeriod(start, end, today=False)
                                 tomorrow_results.append(period)
                                 LOGGER.debug("Додано завтрашній період: %s-%s", start, end)
 
         # Об'єднуємо періоди окремо
-        today_results = self.merge_periods(today_results)
-        tomorrow_results = self.merge_periods(tomorrow_results)
+        today_results = cls.merge_periods(today_results)
+        tomorrow_results = cls.merge_periods(tomorrow_results)
 
         # Логуємо результат для діагностики
         LOGGER.debug(
@@ -169,10 +512,13 @@ class EnergyUaScrapper:
         for period in tomorrow_results:
             LOGGER.debug("Завтрашній період: %s-%s", period.start, period.end)
 
-        return today_results, tomorrow_results
+        return today_results, tomorrow_results, parser
 
-    def _parse_periods_from_text_block(self, scale_info_block: Tag, today: bool) -> list[PowerOffPeriod]:
+    @classmethod
+    def _parse_periods_from_text_block(cls, scale_info_block: Tag, today: bool) -> list[PowerOffPeriod]:
         """Parse periods from a specific scale_info_periods block."""
+        from bs4 import Tag  # noqa: PLC0415
+
         periods: list[PowerOffPeriod] = []
 
         periods_items = scale_info_block.find("div", class_="periods_items")
@@ -188,21 +534,22 @@ class EnergyUaScrapper:
             text = span.get_text()
             # Шукаємо патерн "З HH:MM до HH:MM"
             # get_text() вже видалив <b> теги, тому шукаємо просто "З 12:00 до 14:30"
-            match = re.search(r"З\s+(\d{1,2}:\d{2})\s+до\s+(\d{1,2}:\d{2})", text)
+            match = PERIOD_RE.search(text)
             if match:
                 start_str = match.group(1)
                 end_str = match.group(2)
-                start = self._value_from_timestring(start_str)
-                end = self._value_from_timestring(end_str)
+                start = cls._value_from_timestring(start_str)
+                end = cls._value_from_timestring(end_str)
                 periods.append(PowerOffPeriod(start, end, today=today))
 
         return periods
 
-    def _parse_item(self, item: BeautifulSoup) -> tuple[float, float]:
+    @classmethod
+    def _parse_item(cls, item: Tag) -> tuple[float, float]:
         start_hour = item.find("i", class_="hour_info_from")
         end_hour = item.find("i", class_="hour_info_to")
         if start_hour and end_hour:
-            return self._value_from_timestring(start_hour.text), self._value_from_timestring(end_hour.text)
+            return cls._value_from_timestring(start_hour.text), cls._value_from_timestring(end_hour.text)
         raise ValueError(f"Time period not found in the input string: {item.text}")
 
     @staticmethod
@@ -212,3 +559,222 @@ class EnergyUaScrapper:
         hour = int(hour_str)
         minute = int(minute_str)
         return hour + minute / 60
+
+
+def create_parse_pool(workers: int = PARSE_WORKERS) -> ProcessPoolExecutor:
+    """Create a process pool for `parse_page_minutes`.
+
+    Workers are spawned rather than forked, forking the threaded Home Assistant process is not safe.
+    """
+    from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+    import multiprocessing  # noqa: PLC0415
+
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def parse_page_minutes(content: bytes) -> PageMinutes:
+    """Parse a page in a worker process and return (start, end) minutes of today and tomorrow."""
+    today, tomorrow, parser, parse_time = EnergyUaScrapper.parse_page(content.decode())
+    return (
+        tuple((period.start_minute, period.end_minute) for period in today),
+        tuple((period.start_minute, period.end_minute) for period in tomorrow),
+        parser,
+        parse_time,
+    )
+
+
+def periods_from_minutes(minutes: PageMinutes) -> ParsedPage:
+    """Rebuild the parsed page returned by `parse_page_minutes`."""
+    today, tomorrow, parser, parse_time = minutes
+    return ParsedPage(
+        [PowerOffPeriod.from_minutes(start, end, today=True) for start, end in today],
+        [PowerOffPeriod.from_minutes(start, end, today=False) for start, end in tomorrow],
+        parser,
+        parse_time,
+    )
+
+
+class EnergyUaStreamParser(HTMLParser):
+    """Event-driven parser for the Energy UA page.
+
+    Gets the page in chunks and keeps only the schedule it has seen so far, so memory use
+    does not depend on the page size. Mirrors `EnergyUaScrapper._extract_periods`: periods
+    from `scale_info_periods` win, `scale_hours` cells are the fallback for a day without them.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser state."""
+        super().__init__(convert_charrefs=True)
+
+    def reset(self) -> None:
+        """Forget everything parsed so far."""
+        super().reset()
+        # Періоди за днями (True - сьогодні) з текстових блоків та зі шкали годин
+        self._info_periods: dict[bool, list[PowerOffPeriod]] = {True: [], False: []}
+        self._hours_periods: dict[bool, list[PowerOffPeriod]] = {True: [], False: []}
+        self._info_closed: dict[bool, bool] = {True: False, False: False}
+        self._hours_closed: dict[bool, bool] = {True: False, False: False}
+
+        # Блок scale_info_periods, що зараз читається
+        self._info_depth = 0
+        self._info_day: bool | None = None
+        self._info_title: list[str] | None = None
+        self._items_depth = 0
+        self._span_depth = 0
+        self._span_text: list[str] = []
+
+        # Заголовок ch_day_title та наступний за ним блок scale_hours
+        self._day_title: list[str] | None = None
+        self._hours_day: bool | None = None
+        self._hours_pending = False
+        self._hours_depth = 0
+        self._el_depth = 0
+        self._el_active = False
+        self._el_times: dict[str, list[str]] = {}
+        self._el_time_key: str | None = None
+
+        self.done = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        """Track the schedule blocks and the elements inside them."""
+        classes = self._classes(attrs)
+
+        if tag == "div":
+            if self._info_depth:
+                self._info_depth += 1
+                if self._items_depth:
+                    self._items_depth += 1
+                elif "periods_items" in classes:
+                    self._items_depth = 1
+            elif "scale_info_periods" in classes:
+                self._info_depth = 1
+                self._info_day = None
+            if self._hours_depth:
+                self._hours_depth += 1
+                if self._el_depth:
+                    self._el_depth += 1
+                elif "scale_hours_el" in classes:
+                    self._el_depth = 1
+                    self._el_active = False
+                    self._el_times = {}
+            elif "scale_hours" in classes and self._hours_pending:
+                self._hours_depth = 1
+                self._hours_pending = False
+        elif tag == "h4":
+            if self._info_depth and self._info_day is None and "scale_info_title" in classes:
+                self._info_title = []
+            elif "ch_day_title" in classes:
+                self._day_title = []
+        elif tag == "span":
+            if self._items_depth:
+                self._span_depth += 1
+                if self._span_depth == 1:
+                    self._span_text = []
+            if self._el_depth and "hour_active" in classes:
+                self._el_active = True
+        elif tag == "i" and self._el_depth:
+            for key in ("hour_info_from", "hour_info_to"):
+                if key in classes and key not in self._el_times:
+                    self._el_times[key] = []
+                    self._el_time_key = key
+
+    def handle_endtag(self, tag: str) -> None:
+        """Close tracked elements and collect their periods."""
+        if tag == "div":
+            if self._items_depth:
+                self._items_depth -= 1
+            if self._info_depth:
+                self._info_depth -= 1
+                if not self._info_depth:
+                    self._close_info_block()
+            if self._el_depth:
+                self._el_depth -= 1
+                if not self._el_depth:
+                    self._close_hours_el()
+            if self._hours_depth:
+                self._hours_depth -= 1
+                if not self._hours_depth and self._hours_day is not None:
+                    self._hours_closed[self._hours_day] = True
+                    self._hours_day = None
+        elif tag == "h4":
+            if self._info_title is not None:
+                self._info_day = self._day_of("".join(self._info_title), ("сьогодні", "сегодня"))
+                self._info_title = None
+            elif self._day_title is not None:
+                self._hours_day = self._day_of("".join(self._day_title), ("сьогодні",))
+                self._hours_pending = True
+                self._day_title = None
+        elif tag == "span" and self._span_depth:
+            self._span_depth -= 1
+            if not self._span_depth:
+                self._close_period_span()
+        elif tag == "i":
+            self._el_time_key = None
+
+    def handle_data(self, data: str) -> None:
+        """Collect text of the titles, period spans and hour cells."""
+        if self._info_title is not None:
+            self._info_title.append(data)
+        if self._day_title is not None:
+            self._day_title.append(data)
+        if self._span_depth:
+            self._span_text.append(data)
+        if self._el_time_key is not None:
+            self._el_times[self._el_time_key].append(data)
+
+    def result(self) -> tuple[list[PowerOffPeriod], list[PowerOffPeriod]]:
+        """Return (today_periods, tomorrow_periods) collected so far."""
+        today_results = self._info_periods[True] or self._hours_periods[True]
+        tomorrow_results = self._info_periods[False] or self._hours_periods[False]
+        return EnergyUaScrapper.merge_periods(today_results), EnergyUaScrapper.merge_periods(tomorrow_results)
+
+    def _close_info_block(self) -> None:
+        if self._info_day is not None:
+            self._info_closed[self._info_day] = True
+        self._info_day = None
+        self._update_done()
+
+    def _close_period_span(self) -> None:
+        if self._info_day is None:
+            return
+        match = PERIOD_RE.search("".join(self._span_text))
+        if match:
+            start = EnergyUaScrapper._value_from_timestring(match.group(1))
+            end = EnergyUaScrapper._value_from_timestring(match.group(2))
+            self._info_periods[self._info_day].append(PowerOffPeriod(start, end, today=self._info_day))
+
+    def _close_hours_el(self) -> None:
+        if not self._el_active or self._hours_day is None:
+            return
+        start_hour = self._el_times.get("hour_info_from")
+        end_hour = self._el_times.get("hour_info_to")
+        if start_hour is None or end_hour is None:
+            raise ValueError("Time period not found in the scale_hours_el block")
+        start = EnergyUaScrapper._value_from_timestring("".join(start_hour))
+        end = EnergyUaScrapper._value_from_timestring("".join(end_hour))
+        self._hours_periods[self._hours_day].append(PowerOffPeriod(start, end, today=self._hours_day))
+
+    def _update_done(self) -> None:
+        # День готовий, коли закрито його текстовий блок і або він дав періоди,
+        # або шкала годин для fallback вже прочитана (вона йде перед текстовим блоком)
+        self.done = all(
+            self._info_closed[day] and (bool(self._info_periods[day]) or self._hours_closed[day])
+            for day in (True, False)
+        )
+
+    @staticmethod
+    def _classes(attrs: list[tuple[str, str | None]]) -> set[str]:
+        for name, value in attrs:
+            if name == "class" and value:
+                return set(value.split())
+        return set()
+
+    @staticmethod
+    def _day_of(title: str, today_words: tuple[str, ...]) -> bool | None:
+        """Return True for today, False for tomorrow, None for any other title."""
+        title = title.strip().lower()
+        if any(word in title for word in today_words):
+            return True
+        if "завтра" in title:
+            return False
+        return None
@@ -1,41 +1,166 @@
 """Module for power off period entities."""
 
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
-from homeassistant.util import dt as dt_util
+
+MINUTES_PER_DAY = 24 * 60
 
 
-@dataclass
 class PowerOffPeriod:
-    """Power off period in hours from midnight."""
+    """Power off period of one day, stored in whole minutes from midnight.
+
+    `start` and `end` are hours from midnight. An `end` of 0.0 means the end of the day (24:00),
+    it is stored as MINUTES_PER_DAY. An `end` before `start` means the period crosses midnight,
+    its end is stored as minutes from the same midnight, past MINUTES_PER_DAY.
+    """
+
+    __slots__ = ("start_minute", "end_minute", "today")
+
+    def __init__(self, start: float, end: float, today: bool) -> None:
+        """Initialize the period from hours from midnight."""
+        self.start_minute = round(start * 60)
+        self.end_minute = round(end * 60) or MINUTES_PER_DAY
+        if self.end_minute < self.start_minute:
+            # Період переходить через північ і закінчується наступного дня
+            self.end_minute += MINUTES_PER_DAY
+        self.today = today
+
+    @classmethod
+    def from_minutes(cls, start_minute: int, end_minute: int, today: bool) -> PowerOffPeriod:
+        """Create the period from minutes from midnight."""
+        return cls(start_minute / 60, end_minute / 60, today)
+
+    @property
+    def start(self) -> float:
+        """Start in hours from midnight."""
+        return self.start_minute / 60
+
+    @property
+    def end(self) -> float:
+        """End in hours from midnight, 0.0 for the end of the day."""
+        return (self.end_minute % MINUTES_PER_DAY) / 60
+
+    @property
+    def mask(self) -> int:
+        """Bits of the power off minutes from the midnight of the day, see DaySchedule."""
+        return ((1 << self.end_minute) - 1) ^ ((1 << self.start_minute) - 1)
 
-    start: float
-    end: float
-    today: bool
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PowerOffPeriod):
+            return NotImplemented
+        return (self.start_minute, self.end_minute, self.today) == (other.start_minute, other.end_minute, other.today)
 
-    def to_datetime_period(self, tz_info) -> tuple[datetime, datetime]:
-        """Convert to datetime period."""
-        now = dt_util.now()
+    def __hash__(self) -> int:
+        return hash((self.start_minute, self.end_minute, self.today))
 
+    def __repr__(self) -> str:
+        return f"PowerOffPeriod(start={self.start!r}, end={self.end!r}, today={self.today!r})"
+
+    def to_datetime_period(self, now: datetime) -> tuple[datetime, datetime]:
+        """Convert to a datetime period on the day of `now` (the next day for tomorrow), in its timezone."""
         # Визначаємо базову дату
         if self.today:
             base_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
         else:
             base_date = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
 
-        start = base_date + timedelta(hours=self.start)
-        end = base_date + timedelta(hours=self.end)
-
-        # Якщо end менший або рівний start, це означає що період йде через північ
-        # Але якщо end == 0.0 (опівночі), це означає кінець доби (24:00)
-        # Тому додаємо день тільки якщо end < start (не <=, щоб уникнути проблем з end == start == 0)
-        if end < start:
-            end = end + timedelta(days=1)
-        elif end == start and self.end == 0.0:
-            # Якщо end == start == 0.0, це означає період з 00:00 до 00:00 (опівночі до опівночі)
-            # Але це не має сенсу, тому це має бути помилка в даних
-            # Або це означає період, що закінчується в опівночі (24:00)
-            end = end + timedelta(days=1)
-
-        return start, end
+        # Кінець після півночі вже збережено як хвилини від початку дня періоду
+        return base_date + timedelta(minutes=self.start_minute), base_date + timedelta(minutes=self.end_minute)
+
+
+class DaySchedule:
+    """Power off minutes of one day as a bitmap.
+
+    Bit i is set when the power is off during minute i after midnight, so merging,
+    overlap tests, lookups and the total off time are plain integer operations. Bits from
+    MINUTES_PER_DAY on carry the next-day minutes of periods that cross midnight.
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits: int = 0) -> None:
+        """Initialize the day from a bitmap."""
+        self.bits = bits
+
+    @classmethod
+    def from_periods(cls, periods: Iterable[PowerOffPeriod]) -> DaySchedule:
+        """Create the day from periods, overlapping and adjacent periods are merged."""
+        bits = 0
+        for period in periods:
+            bits |= period.mask
+        return cls(bits)
+
+    def spans(self) -> Iterator[tuple[int, int]]:
+        """Iterate (start, end) minutes of the power off periods in order."""
+        bits = self.bits
+        while bits:
+            start = (bits & -bits).bit_length() - 1
+            # Перший нульовий біт після start - кінець періоду
+            zeros = ~bits >> start
+            end = start + (zeros & -zeros).bit_length() - 1
+            yield start, end
+            bits &= -1 << end
+
+    def to_periods(self, today: bool) -> list[PowerOffPeriod]:
+        """Convert to sorted, merged periods."""
+        return [PowerOffPeriod.from_minutes(start, end, today) for start, end in self.spans()]
+
+    def is_off(self, minute: int) -> bool:
+        """Whether the power is off during the minute after midnight."""
+        return bool(self.bits >> minute & 1)
+
+    def is_off_at(self, at: datetime) -> bool:
+        """Whether the power is off at the time of day of `at`."""
+        return self.is_off(at.hour * 60 + at.minute)
+
+    def has_off_from(self, minute: int) -> bool:
+        """Whether the power is off at any minute from `minute` till the end of the day."""
+        return bool(self.bits >> minute)
+
+    def overlaps(self, other: DaySchedule | PowerOffPeriod) -> bool:
+        """Whether the power is off at the same minute in both."""
+        other_bits = other.mask if isinstance(other, PowerOffPeriod) else other.bits
+        return bool(self.bits & other_bits)
+
+    @property
+    def off_minutes(self) -> int:
+        """Total power off time in minutes."""
+        return self.bits.bit_count()
+
+    def __or__(self, other: DaySchedule) -> DaySchedule:
+        return DaySchedule(self.bits | other.bits)
+
+    def __and__(self, other: DaySchedule) -> DaySchedule:
+        return DaySchedule(self.bits & other.bits)
+
+    def __bool__(self) -> bool:
+        return bool(self.bits)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DaySchedule):
+            return NotImplemented
+        return self.bits == other.bits
+
+    def __hash__(self) -> int:
+        return hash(self.bits)
+
+    def __repr__(self) -> str:
+        return f"DaySchedule({list(self.spans())!r})"
+
+
+@dataclass(frozen=True)
+class PowerOffSchedule:
+    """Power off periods parsed from one page.
+
+    `digest` identifies the schedule content, `not_modified` is set when the periods
+    were reused from the previous fetch without parsing.
+    """
+
+    today: list[PowerOffPeriod]
+    tomorrow: list[PowerOffPeriod]
+    digest: str
+    not_modified: bool = False
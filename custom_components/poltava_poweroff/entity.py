@@ -0,0 +1,57 @@
+"""Provides the PoltavaPowerOffEntity base class of the integration entities."""
+
+from __future__ import annotations
+
+from abc import abstractmethod
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import PoltavaPowerOffCoordinator
+from .schedule import GroupSchedule
+
+
+class PoltavaPowerOffEntity(CoordinatorEntity[PoltavaPowerOffCoordinator]):
+    """Entity showing the schedule of one group.
+
+    Coordinator updates only write the state when the value, the attributes or the
+    availability of the entity changed.
+    """
+
+    coordinator: PoltavaPowerOffCoordinator
+
+    def __init__(
+        self,
+        coordinator: PoltavaPowerOffCoordinator,
+        schedule: GroupSchedule,
+        entity_description: EntityDescription,
+    ) -> None:
+        """Initialize the entity of one group."""
+        super().__init__(coordinator)
+        self.coordinator = coordinator
+        self.schedule = schedule
+        self.entity_description = entity_description
+        self._attr_unique_id = f"{coordinator.config_entry.entry_id}-{schedule.group}-{entity_description.key}"
+        if len(coordinator.groups) > 1:
+            self._attr_name = f"{entity_description.name} {schedule.group}"
+        self._written_state: tuple[Any, ...] | None = None
+
+    @property
+    def available(self) -> bool:
+        """Stay available with the last known schedule while the website is unreachable."""
+        return self.schedule.has_schedule
+
+    @abstractmethod
+    def _state_snapshot(self) -> tuple[Any, ...]:
+        """Get everything the written state depends on, besides availability."""
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when it differs from the last written one."""
+        snapshot = (self.available, *self._state_snapshot())
+        if snapshot == self._written_state:
+            return
+        self._written_state = snapshot
+        self.async_write_ha_state()
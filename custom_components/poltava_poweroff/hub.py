@@ -0,0 +1,380 @@
+"""Provides the PoltavaPowerOffHub shared by all config entries."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine, Iterable
+from dataclasses import dataclass
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    HANDOFF_TTL,
+    HUB_CACHE_TTL,
+    MAX_CONCURRENT_FETCHES,
+    PARSE_WORKERS,
+    RATE_LIMITER_KEY,
+    SESSION_SAVE_DELAY,
+    SESSION_STORAGE_KEY,
+    STORAGE_VERSION,
+    PowerOffGroup,
+)
+from .energyua_scrapper import (
+    EnergyUaScrapper,
+    ParsedPage,
+    UnparsedPage,
+    create_parse_pool,
+    parse_page_minutes,
+    periods_from_minutes,
+)
+from .entities import PowerOffSchedule
+from .ratelimit import FetchPriority, TokenBucket
+from .transport import (
+    CONNECT_TIMEOUT,
+    READ_TIMEOUT,
+    REQUEST_TIMEOUT,
+    AiohttpTransport,
+    CloudscraperTransport,
+    create_trace_config,
+    valid_cookies,
+)
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class HubStats:
+    """Counts of schedule requests served by the hub."""
+
+    fetched: int = 0
+    memory_hits: int = 0  # результат молодший за TTL віддано з пам'яті
+    merged: int = 0  # запит приєднався до вже запущеного завантаження
+
+
+class PoltavaPowerOffHub:
+    """Fetches group pages once for all config entries.
+
+    Owns the transports (one traced aiohttp and one cloudscraper session per process) and one
+    scraper per group. Concurrent requests for the same group share one in-flight fetch,
+    and results newer than the requested max age are served from memory. Groups requested
+    together are fetched with bounded concurrency and parsed as one batch in worker processes.
+    When the last group is unsubscribed the hub shuts down and a new one is created on next use.
+    All requests go through one token bucket per Home Assistant instance, kept in `hass.data`
+    so that its slowdown survives the hub being recreated.
+    The cloudscraper session is saved to storage and restored by `async_start_warm_up`.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        ttl: float = HUB_CACHE_TTL,
+        parse_workers: int = PARSE_WORKERS,
+        timeout: float = REQUEST_TIMEOUT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+    ) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self.ttl = ttl
+        self.parse_workers = parse_workers
+        # Пул процесів створюється лише коли справді треба розібрати кілька сторінок
+        self._parse_pool: ProcessPoolExecutor | None = None
+        # Власна сесія з трасуванням, щоб діагностика бачила час DNS та з'єднання. Від'єднує її hub:
+        # auto_cleanup прив'язав би сесію до запису, під час налаштування якого створено hub
+        self._session = async_create_clientsession(hass, auto_cleanup=False, trace_configs=[create_trace_config()])
+        self._cloudscraper = CloudscraperTransport(
+            timeout, connect_timeout, read_timeout, on_session_change=self._async_save_session
+        )
+        self.transports: list[AiohttpTransport | CloudscraperTransport] = [
+            AiohttpTransport(self._session, timeout, connect_timeout, read_timeout),
+            self._cloudscraper,
+        ]
+        self.rate_limiter: TokenBucket = hass.data.setdefault(RATE_LIMITER_KEY, TokenBucket())
+        self.stats = HubStats()
+        self._scrapers: dict[PowerOffGroup, EnergyUaScrapper] = {}
+        self._subscribers: dict[PowerOffGroup, int] = {}
+        self._results: dict[PowerOffGroup, tuple[float, PowerOffSchedule]] = {}
+        self._pending: dict[PowerOffGroup, asyncio.Future[PowerOffSchedule]] = {}
+        # Розклади, перевірені config flow, для першого оновлення нового запису
+        self._handoffs: dict[PowerOffGroup, tuple[float, PowerOffSchedule]] = {}
+        # Запущені пакетні завантаження, щоб скасувати їх при зупинці
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._on_shutdown: list[CALLBACK_TYPE] = []
+        self._shutdown = False
+        # Сховище сесії cloudscraper створює прогрів, без нього сесія не зберігається
+        self._session_store: Store[dict[str, Any]] | None = None
+        self._warm_up: asyncio.Task[None] | None = None
+
+    def scraper(self, group: PowerOffGroup) -> EnergyUaScrapper:
+        """Get the scraper of the group."""
+        if (scraper := self._scrapers.get(group)) is None:
+            scraper = self._scrapers[group] = EnergyUaScrapper(
+                group, transports=self.transports, rate_limiter=self.rate_limiter
+            )
+        return scraper
+
+    @callback
+    def async_subscribe(self, group: PowerOffGroup) -> CALLBACK_TYPE:
+        """Register an entry interested in the group, returns the unsubscribe callback."""
+        self._subscribers[group] = self._subscribers.get(group, 0) + 1
+
+        @callback
+        def unsubscribe() -> None:
+            self._subscribers[group] -= 1
+            if not self._subscribers[group]:
+                # Група більше нікому не потрібна, звільняємо її стан
+                del self._subscribers[group]
+                self._scrapers.pop(group, None)
+                self._results.pop(group, None)
+            if not self._subscribers:
+                # Останній запис вивантажено, сесії та процеси більше не потрібні. Hub прибираємо
+                # одразу, щоб перезавантажений запис отримав новий, а не той, що закривається
+                self._async_detach()
+                self.hass.async_create_task(self.async_shutdown(), f"{DOMAIN} hub shutdown")
+
+        return unsubscribe
+
+    @callback
+    def async_start_warm_up(self) -> None:
+        """Restore the saved cloudscraper session in the background, once.
+
+        Batches started before the warm-up is done wait for it, so the first fetch that
+        needs cloudscraper reuses a Cloudflare clearance that is still valid.
+        """
+        if self._warm_up is None:
+            self._warm_up = self._async_track(self._async_warm_up(), f"{DOMAIN} session warm-up")
+
+    async def _async_warm_up(self) -> None:
+        self._session_store = Store(self.hass, STORAGE_VERSION, SESSION_STORAGE_KEY)
+        try:
+            state = await self._session_store.async_load()
+        except Exception:
+            LOGGER.exception("Cannot load the saved cloudscraper session")
+            return
+        # Без чинних cookies відновлювати нічого, сесію створить перший запит, якому вона потрібна
+        if state and valid_cookies(state):
+            started = time.monotonic()
+            await self._cloudscraper.async_start(state)
+            LOGGER.debug("Warmed up cloudscraper session in %.2f s", time.monotonic() - started)
+
+    @callback
+    def _async_save_session(self, state: dict[str, Any]) -> None:
+        if self._session_store is not None:
+            self._session_store.async_delay_save(lambda: state, SESSION_SAVE_DELAY)
+
+    @callback
+    def _async_track(self, coro: Coroutine[Any, Any, None], name: str) -> asyncio.Task[None]:
+        """Run a task that is cancelled when the hub shuts down."""
+        task = self.hass.async_create_task(coro, name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    @callback
+    def async_hand_off(self, group: PowerOffGroup, schedule: PowerOffSchedule) -> None:
+        """Keep a schedule fetched before its entry exists, for the first request of the group.
+
+        The next request of the group gets it whatever its max age, once, if it comes
+        within HANDOFF_TTL seconds.
+        """
+        self._handoffs[group] = (time.monotonic(), schedule)
+
+    async def async_fetch_schedule(
+        self,
+        group: PowerOffGroup,
+        max_age: float | None = None,
+        priority: FetchPriority = FetchPriority.BACKGROUND,
+    ) -> PowerOffSchedule:
+        """Get the schedule of the group, fetching it only when needed.
+
+        Args:
+            group: Power off group
+            max_age: Oldest result in seconds that can be served from memory, defaults to the hub TTL
+            priority: Place of the request in the rate limiter queue
+        """
+        result = (await self.async_fetch_schedules([group], max_age, priority=priority))[group]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def async_fetch_schedules(
+        self,
+        groups: Iterable[PowerOffGroup],
+        max_age: float | None = None,
+        concurrency: int = MAX_CONCURRENT_FETCHES,
+        priority: FetchPriority = FetchPriority.BACKGROUND,
+    ) -> dict[PowerOffGroup, PowerOffSchedule | Exception]:
+        """Get the schedules of several groups, fetching the missing ones as one batch.
+
+        Pages are downloaded at most `concurrency` at a time and the changed ones are parsed
+        together. A group that failed gets its exception instead of the schedule, so one broken
+        page does not hide the others. `priority` orders the requests of the batch in the
+        rate limiter queue; joining an in-flight fetch does not change the priority of that fetch.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        results: dict[PowerOffGroup, PowerOffSchedule | Exception] = {}
+        waiters: dict[PowerOffGroup, asyncio.Future[PowerOffSchedule]] = {}
+        missing: list[PowerOffGroup] = []
+        for group in dict.fromkeys(groups):
+            cached = self._results.get(group)
+            if (handoff := self._handoffs.pop(group, None)) is not None and time.monotonic() - handoff[
+                0
+            ] <= HANDOFF_TTL:
+                self.stats.memory_hits += 1
+                LOGGER.debug("Serving schedule for group %s handed off by the config flow", group)
+                results[group] = handoff[1]
+            elif cached is not None and time.monotonic() - cached[0] <= max_age:
+                self.stats.memory_hits += 1
+                LOGGER.debug("Serving schedule for group %s from memory", group)
+                results[group] = cached[1]
+            elif (pending := self._pending.get(group)) is not None:
+                self.stats.merged += 1
+                LOGGER.debug("Joining in-flight fetch for group %s", group)
+                waiters[group] = pending
+            else:
+                missing.append(group)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            for group in missing:
+                self._pending[group] = waiters[group] = loop.create_future()
+            self._async_track(
+                self._async_fetch_batch(missing, concurrency, priority), f"{DOMAIN} fetch {len(missing)} groups"
+            )
+
+        for group, waiter in waiters.items():
+            try:
+                # shield: скасування одного з очікувачів не скасовує спільне завантаження
+                results[group] = await asyncio.shield(waiter)
+            except Exception as err:  # noqa: BLE001
+                results[group] = err
+        return results
+
+    async def _async_fetch_batch(self, groups: list[PowerOffGroup], concurrency: int, priority: FetchPriority) -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_page(group: PowerOffGroup) -> PowerOffSchedule | UnparsedPage:
+            async with semaphore:
+                return await self.scraper(group).fetch_page(priority)
+
+        try:
+            if self._warm_up is not None:
+                # wait, а не await: скасування пакета не повинно скасувати прогрів
+                await asyncio.wait([self._warm_up])
+            pages = dict(zip(groups, await asyncio.gather(*map(fetch_page, groups), return_exceptions=True)))
+            unparsed = {group: page for group, page in pages.items() if isinstance(page, UnparsedPage)}
+            if unparsed:
+                parsed = await self._async_parse_pages(unparsed)
+                for group, page in unparsed.items():
+                    result = parsed[group]
+                    pages[group] = (
+                        result if isinstance(result, Exception) else self.scraper(group).apply_parsed(page, result)
+                    )
+
+            for group, result in pages.items():
+                future = self._pending.pop(group)
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                    continue
+                self.stats.fetched += 1
+                self._results[group] = (time.monotonic(), result)
+                future.set_result(result)
+        finally:
+            # Скасоване завантаження не повинно залишити очікувачів назавжди
+            for group in groups:
+                if (future := self._pending.pop(group, None)) is not None:
+                    future.cancel()
+
+    async def _async_parse_pages(
+        self, pages: dict[PowerOffGroup, UnparsedPage]
+    ) -> dict[PowerOffGroup, ParsedPage | Exception]:
+        """Parse the pages in worker processes, a single page in a thread of this process."""
+        if len(pages) == 1 or self.parse_workers <= 1:
+            # Пул не окупається для однієї сторінки, розбираємо одним завданням поза event loop
+            return await asyncio.to_thread(_parse_pages, pages)
+
+        if self._parse_pool is None:
+            self._parse_pool = create_parse_pool(self.parse_workers)
+        loop = asyncio.get_running_loop()
+        # У процеси передаються лише байти сторінок, назад - хвилини періодів
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(self._parse_pool, parse_page_minutes, page.text.encode())
+                for page in pages.values()
+            ),
+            return_exceptions=True,
+        )
+        return {
+            group: result if isinstance(result, Exception) else periods_from_minutes(result)
+            for group, result in zip(pages, results)
+        }
+
+    @callback
+    def _async_detach(self) -> None:
+        if self.hass.data.get(DOMAIN) is self:
+            del self.hass.data[DOMAIN]
+
+    @callback
+    def async_on_shutdown(self, func: CALLBACK_TYPE) -> None:
+        """Call `func` when the hub shuts down."""
+        self._on_shutdown.append(func)
+
+    async def async_shutdown(self) -> None:
+        """Cancel in-flight fetches, stop the parse worker processes and release the HTTP sessions.
+
+        Waiters of cancelled fetches get CancelledError. Threads of cancelled cloudscraper
+        requests are not interrupted, they end within the read timeout.
+        """
+        if self._shutdown:
+            return
+        self._shutdown = True
+        self._async_detach()
+        while self._on_shutdown:
+            self._on_shutdown.pop()()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._parse_pool is not None:
+            pool, self._parse_pool = self._parse_pool, None
+            await self.hass.async_add_executor_job(pool.shutdown)
+        await self._cloudscraper.async_close()
+        # Сесія користується спільним connector Home Assistant, тому від'єднується, а не закривається
+        self._session.detach()
+        LOGGER.debug("Hub shut down")
+
+
+def _parse_pages(
+    pages: dict[PowerOffGroup, UnparsedPage],
+) -> dict[PowerOffGroup, ParsedPage | Exception]:
+    """Parse several pages, keeping the error of a page that could not be parsed."""
+    parsed: dict[PowerOffGroup, ParsedPage | Exception] = {}
+    for group, page in pages.items():
+        try:
+            parsed[group] = EnergyUaScrapper.parse_page(page.text)
+        except Exception as err:  # noqa: BLE001
+            parsed[group] = err
+    return parsed
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> PoltavaPowerOffHub:
+    """Get the hub, creating it on first use."""
+    if (hub := hass.data.get(DOMAIN)) is None:
+        hub = hass.data[DOMAIN] = PoltavaPowerOffHub(hass)
+
+        async def async_shutdown(_event: Event) -> None:
+            await hub.async_shutdown()
+
+        # Не async_listen_once: hub, зупинений раніше, знімає слухача сам
+        hub.async_on_shutdown(hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, async_shutdown))
+    return hub
@@ -0,0 +1,92 @@
+"""Provides polling interval policies for the PoltavaPowerOffCoordinator."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+import random
+
+from .const import (
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    PUBLICATION_HOURS,
+    UPDATE_INTERVAL,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PollingPolicy:
+    """Decides how long to wait before the next poll.
+
+    The coordinator reports the outcome of every update and sets the returned interval.
+    This base policy always polls every `UPDATE_INTERVAL` seconds.
+    """
+
+    def __init__(self, interval: float = UPDATE_INTERVAL) -> None:
+        """Initialize the policy."""
+        self.interval = interval
+
+    def on_success(self, changed: bool, has_tomorrow: bool, now: datetime) -> timedelta:  # noqa: ARG002
+        """Get the interval after a successful update."""
+        return timedelta(seconds=self.interval)
+
+    def on_failure(self, now: datetime) -> timedelta:  # noqa: ARG002
+        """Get the interval after a failed update."""
+        return timedelta(seconds=self.interval)
+
+
+class AdaptivePollingPolicy(PollingPolicy):
+    """Polls fast while the schedule is moving and slows down while it is stable.
+
+    - right after a change, or while tomorrow's schedule is missing during the evening
+      publication window, poll every `min_interval`;
+    - every unchanged poll stretches the interval by `STABLE_FACTOR` up to `max_interval`;
+    - failures back off exponentially from the base interval up to `max_interval`.
+
+    Every interval gets +-`JITTER` random jitter and is clamped to [min_interval, max_interval].
+    """
+
+    STABLE_FACTOR = 1.5
+    FAILURE_FACTOR = 2.0
+    JITTER = 0.1
+
+    def __init__(
+        self,
+        min_interval: float = DEFAULT_MIN_UPDATE_INTERVAL,
+        max_interval: float = DEFAULT_MAX_UPDATE_INTERVAL,
+        interval: float = UPDATE_INTERVAL,
+        publication_hours: tuple[int, int] = PUBLICATION_HOURS,
+    ) -> None:
+        """Initialize the policy."""
+        super().__init__(min(max(interval, min_interval), max_interval))
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.publication_hours = publication_hours
+        self.unchanged_polls = 0
+        self.failures = 0
+
+    def on_success(self, changed: bool, has_tomorrow: bool, now: datetime) -> timedelta:
+        """Get the interval after a successful update."""
+        self.failures = 0
+        if changed:
+            self.unchanged_polls = 0
+            return self._decide(self.min_interval, "schedule changed")
+        self.unchanged_polls += 1
+        start_hour, end_hour = self.publication_hours
+        if not has_tomorrow and start_hour <= now.hour < end_hour:
+            return self._decide(self.min_interval, "waiting for tomorrow's schedule")
+        interval = self.interval * self.STABLE_FACTOR ** (self.unchanged_polls - 1)
+        return self._decide(interval, f"unchanged for {self.unchanged_polls} polls")
+
+    def on_failure(self, now: datetime) -> timedelta:  # noqa: ARG002
+        """Get the interval after a failed update."""
+        self.failures += 1
+        interval = self.interval * self.FAILURE_FACTOR**self.failures
+        return self._decide(interval, f"{self.failures} failures in a row")
+
+    def _decide(self, interval: float, reason: str) -> timedelta:
+        jittered = interval * random.uniform(1 - self.JITTER, 1 + self.JITTER)
+        seconds = min(max(jittered, self.min_interval), self.max_interval)
+        LOGGER.debug("Next poll in %.0f s: %s", seconds, reason)
+        return timedelta(seconds=seconds)
@@ -0,0 +1,183 @@
+"""Profiles refresh cycles for the profile service."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import importlib.util
+import logging
+from pathlib import Path
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import PROFILE_DIRECTORY, PowerOffGroup
+from .energyua_scrapper import EnergyUaScrapper
+from .schedule import GroupSchedule
+
+LOGGER = logging.getLogger(__name__)
+
+# pyinstrument - семплюючий профайлер з меншими накладними витратами, використовуємо, якщо встановлено
+SAMPLING_PROFILER = importlib.util.find_spec("pyinstrument") is not None
+
+
+async def async_profile_refreshes(
+    hass: HomeAssistant,
+    scraper: EnergyUaScrapper,
+    cycles: int,
+    offline: bool,
+    top: int,
+) -> dict[str, Any]:
+    """Profile `cycles` refresh cycles of the scraper group and return the hottest functions.
+
+    A cycle fetches the page, fingerprints and parses it, and builds the schedule, the timeline,
+    the sensor attributes and the calendar events from it, all in one executor thread. With
+    `offline` the page saved by an earlier run is used instead of the network; it is fetched
+    once, outside the profile, when there is none yet. The profile is written to the config
+    directory: pstats from cProfile, speedscope JSON from pyinstrument when it is installed.
+    """
+    directory = Path(hass.config.path(PROFILE_DIRECTORY))
+    page_path = directory / f"page-{scraper.group}.html"
+
+    fetch: Callable[[], str]
+    if offline:
+        if (page := await hass.async_add_executor_job(_read_page, page_path)) is None:
+            LOGGER.debug("No saved page for group %s, fetching one before profiling", scraper.group)
+            page = await scraper.fetch_text()
+        fetch = lambda: page  # noqa: E731
+    else:
+        loop = hass.loop
+
+        def fetch() -> str:
+            # Мережа працює в event loop, у профілі це час очікування fetch_text
+            return asyncio.run_coroutine_threadsafe(scraper.fetch_text(), loop).result()
+
+    stamp = dt_util.now().strftime("%Y%m%d-%H%M%S-%f")
+    return await hass.async_add_executor_job(
+        _profile, fetch, scraper.group, cycles, top, directory, f"profile-{scraper.group}-{stamp}", page_path
+    )
+
+
+def _read_page(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+
+def _refresh_cycle(fetch: Callable[[], str], group: PowerOffGroup, now: datetime) -> str:
+    """Do the work of one refresh of the group, without storage and entity writes."""
+    page = fetch()
+    EnergyUaScrapper.schedule_fingerprint(page, now.date().isoformat())
+    parsed = EnergyUaScrapper.parse_page(page)
+    # Без hass розклад не має сховища: цикл виконується в потоці executor і нічого не зберігає
+    schedule = GroupSchedule(None, group, "profile", now)
+    schedule.set_periods(parsed.today, parsed.tomorrow)
+    schedule.state_attributes  # noqa: B018
+    day = dt_util.start_of_local_day(now)
+    schedule.get_events_between(day, day + timedelta(days=2))
+    schedule.timeline.boundaries_after(now)
+    return page
+
+
+def _profile(
+    fetch: Callable[[], str],
+    group: PowerOffGroup,
+    cycles: int,
+    top: int,
+    directory: Path,
+    name: str,
+    page_path: Path,
+) -> dict[str, Any]:
+    directory.mkdir(exist_ok=True)
+    now = dt_util.now()
+    if SAMPLING_PROFILER:
+        hot, path, duration, page = _profile_sampling(fetch, group, cycles, now, directory / f"{name}.speedscope.json")
+    else:
+        hot, path, duration, page = _profile_cprofile(fetch, group, cycles, now, directory / f"{name}.pstats")
+    # Остання сторінка стане кешованою для наступних запусків offline
+    page_path.write_text(page, encoding="utf-8")
+    LOGGER.info("Profiled %d refresh cycles of group %s in %.2f s, saved to %s", cycles, group, duration, path)
+    return {
+        "profiler": "pyinstrument" if SAMPLING_PROFILER else "cProfile",
+        "file": str(path),
+        "cycles": cycles,
+        "duration": duration,
+        "cycle_mean": duration / cycles,
+        "hot_functions": hot[:top],
+    }
+
+
+def _profile_cprofile(
+    fetch: Callable[[], str], group: PowerOffGroup, cycles: int, now: datetime, path: Path
+) -> tuple[list[dict[str, Any]], Path, float, str]:
+    import cProfile  # noqa: PLC0415
+    import pstats  # noqa: PLC0415
+
+    profile = cProfile.Profile()
+    started = time.perf_counter()
+    profile.enable()
+    try:
+        for _ in range(cycles):
+            page = _refresh_cycle(fetch, group, now)
+    finally:
+        profile.disable()
+    duration = time.perf_counter() - started
+    # pstats відкривається snakeviz, а flameprof будує з нього flame graph
+    profile.dump_stats(path)
+
+    stats = pstats.Stats(profile)
+    hot = [
+        {
+            "function": f"{function} ({Path(file).name}:{line})",
+            "calls": calls,
+            "self": self_time,
+            "cumulative": cumulative,
+        }
+        for (file, line, function), (_, calls, self_time, cumulative, _) in sorted(
+            stats.stats.items(),  # type: ignore[attr-defined]
+            key=lambda item: item[1][2],
+            reverse=True,
+        )
+    ]
+    return hot, path, duration, page
+
+
+def _profile_sampling(
+    fetch: Callable[[], str], group: PowerOffGroup, cycles: int, now: datetime, path: Path
+) -> tuple[list[dict[str, Any]], Path, float, str]:
+    from pyinstrument import Profiler  # noqa: PLC0415
+    from pyinstrument.renderers import SpeedscopeRenderer  # noqa: PLC0415
+
+    profiler = Profiler(interval=0.001)
+    started = time.perf_counter()
+    profiler.start()
+    try:
+        for _ in range(cycles):
+            page = _refresh_cycle(fetch, group, now)
+    finally:
+        profiler.stop()
+    duration = time.perf_counter() - started
+    # speedscope JSON відкривається на speedscope.app як flame graph
+    path.write_text(profiler.output(SpeedscopeRenderer()), encoding="utf-8")
+
+    # Власний час кожної функції, підсумований по всіх стеках
+    totals: dict[str, float] = {}
+    root = profiler.last_session.root_frame() if profiler.last_session else None
+    frames = [root] if root is not None else []
+    while frames:
+        frame = frames.pop()
+        # Синтетичні кадри ([self], [await]) вже враховані у total_self_time батька
+        if frame.is_synthetic:
+            continue
+        key = f"{frame.function} ({Path(frame.file_path or '?').name}:{frame.line_no})"
+        totals[key] = totals.get(key, 0.0) + frame.total_self_time
+        frames.extend(frame.children)
+    hot = [
+        {"function": function, "self": self_time}
+        for function, self_time in sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    ]
+    return hot, path, duration, page
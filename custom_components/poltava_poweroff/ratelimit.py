@@ -0,0 +1,161 @@
+"""Provides the token bucket that limits the request rate to the Energy UA website."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from dataclasses import dataclass
+from enum import IntEnum
+import heapq
+import itertools
+import logging
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+# Запитів за секунду та скільки їх можна зробити одразу після паузи
+RATE_LIMIT_RATE = 1.0
+RATE_LIMIT_BURST = 4
+# Найповільніший темп після сповільнень: один запит на хвилину
+RATE_LIMIT_MIN_RATE = 1 / 60
+# У скільки разів сповільнюватись на 429/503 чи виклик Cloudflare
+SLOWDOWN_FACTOR = 0.5
+# Яку частку звичайного темпу повертає кожна успішна відповідь
+RECOVERY_STEP = 0.1
+# Довший Retry-After вважаємо помилкою сервера
+MAX_RETRY_AFTER = 600  # секунд
+THROTTLE_STATUSES = (429, 503)
+
+
+class FetchPriority(IntEnum):
+    """Order in which queued requests get tokens, lower first."""
+
+    INTERACTIVE = 0  # service refresh, додавання запису
+    BACKGROUND = 1  # планове опитування
+
+
+@dataclass
+class RateLimiterStats:
+    """Counts of requests that went through the token bucket."""
+
+    acquired: int = 0
+    queued: int = 0  # чекали на токен
+    queue_wait: float = 0.0  # секунд усього
+    slowdowns: int = 0
+
+
+def retry_after(headers: Mapping[str, str]) -> float | None:
+    """Get the delay in seconds from a Retry-After header, when it holds one."""
+    value = headers.get("Retry-After", "").strip()
+    if not value.isdigit():
+        # HTTP-дату сайт не надсилає, такі відповіді лише сповільнюють темп
+        return None
+    return min(float(value), MAX_RETRY_AFTER)
+
+
+class TokenBucket:
+    """Token bucket shared by all requests of a Home Assistant instance.
+
+    Tokens refill at `rate` per second up to `burst`. Requests that find no token wait in a queue
+    ordered by priority, then by arrival. Throttling responses halve the rate (down to `min_rate`)
+    and honour Retry-After, successful ones bring it back step by step.
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_RATE,
+        burst: int = RATE_LIMIT_BURST,
+        min_rate: float = RATE_LIMIT_MIN_RATE,
+    ) -> None:
+        """Initialize the token bucket."""
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min(min_rate, rate)
+        self.stats = RateLimiterStats()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        # До цього моменту (time.monotonic) токени не видаються, з Retry-After
+        self._blocked_until = 0.0
+        self._waiters: list[tuple[FetchPriority, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority: FetchPriority = FetchPriority.BACKGROUND) -> float:
+        """Wait for a token and return how long the request was queued, in seconds."""
+        started = time.monotonic()
+        self._refill(started)
+        self.stats.acquired += 1
+        if not self._waiters and self._tokens >= 1 and started >= self._blocked_until:
+            self._tokens -= 1
+            return 0.0
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Токен уже видано, але запит не відбудеться
+                self._tokens = min(self.burst, self._tokens + 1)
+            self._dispatch()
+            raise
+        wait = time.monotonic() - started
+        self.stats.queued += 1
+        self.stats.queue_wait += wait
+        LOGGER.debug("Request with %s priority waited %.2f s for a token", priority.name.lower(), wait)
+        return wait
+
+    def _dispatch(self) -> None:
+        """Hand the available tokens to the queued requests and wake up for the next one."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters and self._tokens >= 1 and now >= self._blocked_until:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # Запит скасовано, поки він чекав
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if self._waiters:
+            delay = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def on_response(self, status: int, headers: Mapping[str, str], challenge: bool = False) -> None:
+        """Adjust the rate to a response of the website."""
+        if challenge or status in THROTTLE_STATUSES:
+            self.slow_down(retry_after(headers))
+        else:
+            self.recover()
+
+    def slow_down(self, delay: float | None = None) -> None:
+        """Slow down after the website throttled a request, pausing for `delay` seconds if given."""
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate * SLOWDOWN_FACTOR)
+        # Запас токенів згоряє, наступні запити йдуть уже новим темпом
+        self._tokens = 0.0
+        if delay is not None:
+            self._blocked_until = max(self._blocked_until, now + delay)
+        self.stats.slowdowns += 1
+        LOGGER.info("Website throttles requests, slowing down to %.3f requests per second", self.rate)
+        if self._waiters:
+            self._dispatch()
+
+    def recover(self) -> None:
+        """Bring the rate back towards the normal one after a successful response."""
+        if self.rate < self.base_rate:
+            self._refill(time.monotonic())
+            self.rate = min(self.base_rate, self.rate + self.base_rate * RECOVERY_STEP)
+            if self._waiters:
+                self._dispatch()
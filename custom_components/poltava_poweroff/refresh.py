@@ -0,0 +1,106 @@
+"""Runs the refresh service: concurrent refreshes of the targeted entries, with bursts coalesced."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, REFRESH_COALESCE_WINDOW
+
+if TYPE_CHECKING:
+    from .coordinator import PoltavaPowerOffCoordinator
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class RefreshBatch:
+    """Refresh service calls collected during one coalescing window."""
+
+    coordinators: dict[str, PoltavaPowerOffCoordinator] = field(default_factory=dict)
+    calls: int = 0
+    result: asyncio.Future[dict[str, dict[str, Any]]] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+class RefreshCoalescer:
+    """Merges refresh service calls that come within a short window into one refresh."""
+
+    def __init__(self, hass: HomeAssistant, window: float = REFRESH_COALESCE_WINDOW) -> None:
+        """Initialize the coalescer."""
+        self.hass = hass
+        self.window = window
+        self._batch: RefreshBatch | None = None
+
+    async def async_refresh(self, coordinators: list[PoltavaPowerOffCoordinator]) -> dict[str, Any]:
+        """Refresh the coordinators together with the other calls of the window.
+
+        Returns the timing of each of the given entries and how many calls shared the refresh.
+        """
+        if (batch := self._batch) is None:
+            batch = self._batch = RefreshBatch()
+            self.hass.async_create_background_task(self._async_run(batch), f"{DOMAIN} refresh service")
+        batch.calls += 1
+        for coordinator in coordinators:
+            batch.coordinators[coordinator.config_entry.entry_id] = coordinator
+        # shield: скасування одного виклику не скасовує оновлення для інших
+        entries = await asyncio.shield(batch.result)
+        return {
+            "coalesced_calls": batch.calls,
+            "entries": {
+                coordinator.config_entry.entry_id: entries[coordinator.config_entry.entry_id]
+                for coordinator in coordinators
+            },
+        }
+
+    async def _async_run(self, batch: RefreshBatch) -> None:
+        try:
+            await asyncio.sleep(self.window)
+            # Виклики після цього моменту збираються в наступне оновлення
+            self._batch = None
+            LOGGER.debug("Refreshing %d entries for %d service calls", len(batch.coordinators), batch.calls)
+            # Записи оновлюються одночасно, тож однакові групи приєднуються до одного завантаження в hub
+            results = await asyncio.gather(*(_async_refresh_entry(c) for c in batch.coordinators.values()))
+        except asyncio.CancelledError:
+            if self._batch is batch:
+                self._batch = None
+            batch.result.cancel()
+            raise
+        except Exception as err:  # noqa: BLE001
+            # Помилку отримують усі виклики вікна, інакше вони чекали б вічно
+            batch.result.set_exception(err)
+            return
+        batch.result.set_result(dict(zip(batch.coordinators, results, strict=True)))
+
+
+async def _async_refresh_entry(coordinator: PoltavaPowerOffCoordinator) -> dict[str, Any]:
+    """Refresh one entry ahead of background polls, bypassing the request debouncer, and describe how it went."""
+    last_record = coordinator.refresh_history[-1] if coordinator.refresh_history else None
+    started = time.monotonic()
+    await coordinator.async_refresh_interactive()
+    duration = time.monotonic() - started
+    record = coordinator.refresh_history[-1] if coordinator.refresh_history else None
+    error = coordinator.last_exception
+    return {
+        "title": coordinator.config_entry.title,
+        "duration": round(duration, 3),
+        "success": coordinator.last_update_success,
+        "error": None if coordinator.last_update_success or error is None else str(error),
+        # Групи, отримані з пам'яті hub або з завантаження, яке почав інший запис
+        "groups": {
+            group: {
+                "shared": refresh.shared,
+                "changed": refresh.changed,
+                "error": refresh.error,
+                # Секунд у черзі обмеження частоти запитів, лише для власного завантаження запису
+                "queue_wait": refresh.fetch.queue_wait if refresh.fetch is not None and not refresh.shared else None,
+            }
+            for group, refresh in (record.groups.items() if record is not None and record is not last_record else ())
+        },
+    }
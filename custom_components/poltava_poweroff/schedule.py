@@ -0,0 +1,207 @@
+"""Provides the GroupSchedule class with the known schedule of one power off group."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.components.calendar import CalendarEvent
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import FETCHED_AT_RESOLUTION, SCHEDULE_SAVE_DELAY, STATE_OFF, STATE_ON, STORAGE_VERSION, PowerOffGroup
+from .entities import DaySchedule, PowerOffPeriod, PowerOffSchedule
+from .timeline import PowerOffTimeline
+
+LOGGER = logging.getLogger(__name__)
+
+# Скільки діапазонів календаря пам'ятати: панель запитує місяць і тиждень, тригери - свої вікна
+EVENTS_CACHE_SIZE = 32
+
+
+class GroupSchedule:
+    """Known schedule of one group and the queries entities make on it.
+
+    The coordinator updates `now` once per refresh or scheduled transition, so all
+    queries made in between agree on the current moment.
+    """
+
+    def __init__(self, hass: HomeAssistant | None, group: PowerOffGroup, storage_key: str, now: datetime) -> None:
+        """Initialize an empty schedule.
+
+        Without `hass` the schedule is never saved or restored, for profiling and benchmarks.
+        """
+        self.group = group
+        self.now = now
+        self.digest: str | None = None
+        # Коли розклад востаннє підтверджено сайтом, з точністю до FETCHED_AT_RESOLUTION
+        self.fetched_at: datetime | None = None
+        self._store: Store[dict[str, Any]] | None = (
+            Store(hass, STORAGE_VERSION, storage_key) if hass is not None else None
+        )
+        # Атрибути сенсорів: періоди будуються при зміні розкладу, решта - раз на оновлення
+        self._attributes: dict[str, Any] = {}
+        self._attributes_key: tuple[Any, ...] | None = None
+        # Зростає з кожною зміною розкладу, кешовані запити старших поколінь недійсні
+        self.generation = 0
+        self._events_cache: dict[tuple[datetime, datetime], list[CalendarEvent]] = {}
+        self.set_periods([], [])
+
+    @property
+    def has_schedule(self) -> bool:
+        """Whether a schedule is known, fetched now or restored from storage."""
+        return self.fetched_at is not None
+
+    def apply(self, schedule: PowerOffSchedule) -> bool:
+        """Take a fetched schedule and return whether it changed."""
+        changed = schedule.digest != self.digest
+        if changed:
+            self.digest = schedule.digest
+            self.set_periods(schedule.today, schedule.tomorrow)
+            LOGGER.debug(
+                "Group %s: %d today periods, %d tomorrow periods",
+                self.group,
+                len(self.today_periods),
+                len(self.tomorrow_periods),
+            )
+        else:
+            LOGGER.debug("Schedule for group %s unchanged, keeping current periods", self.group)
+        if changed or self.fetched_at is None or self.now - self.fetched_at >= timedelta(seconds=FETCHED_AT_RESOLUTION):
+            self.fetched_at = self.now
+            if self._store is not None:
+                self._store.async_delay_save(self._to_store, SCHEDULE_SAVE_DELAY)
+        return changed
+
+    def set_periods(self, today: list[PowerOffPeriod], tomorrow: list[PowerOffPeriod]) -> None:
+        """Replace the schedule and rebuild everything derived from it, without saving it."""
+        # Ті самі періоди як бітові карти хвилин доби
+        self.today_schedule = DaySchedule.from_periods(today)
+        self.tomorrow_schedule = DaySchedule.from_periods(tomorrow)
+        # Бітова карта вже об'єднала перетини, тож списки завжди впорядковані та без дублів
+        self.today_periods: list[PowerOffPeriod] = self.today_schedule.to_periods(today=True)
+        self.tomorrow_periods: list[PowerOffPeriod] = self.tomorrow_schedule.to_periods(today=False)
+        # Для calendar - об'єднуємо всі періоди
+        self.periods: list[PowerOffPeriod] = self.today_periods + self.tomorrow_periods
+        self.timeline = PowerOffTimeline.build(self.today_periods, self.tomorrow_periods, self.now)
+        self.generation += 1
+        self._events_cache.clear()
+
+        today_attributes = [{"start": period.start, "end": period.end} for period in self.today_periods]
+        tomorrow_attributes = [{"start": period.start, "end": period.end} for period in self.tomorrow_periods]
+        self._period_attributes: dict[str, Any] = {
+            # Для сумісності зі старою карткою - poweroff_periods містить сьогоднішні
+            # Але якщо сьогодні відключень немає, показуємо завтрашні
+            "poweroff_periods": today_attributes if self.today_schedule else tomorrow_attributes,
+            "poweroff_periods_today": today_attributes,
+            "poweroff_periods_tomorrow": tomorrow_attributes,
+            "poweroff_minutes_today": self.today_schedule.off_minutes,
+            "poweroff_minutes_tomorrow": self.tomorrow_schedule.off_minutes,
+        }
+
+    @property
+    def state_attributes(self) -> dict[str, Any]:
+        """Get the sensor attributes, built once per refresh or transition and shared by all sensors."""
+        key = (self.timeline, self.now, self.fetched_at)
+        if key != self._attributes_key:
+            self._attributes = {
+                **self._period_attributes,
+                "next_off": self.get_next_off_time(),
+                "next_on": self.get_next_on_time(),
+                "last_fetched": self.fetched_at.isoformat() if self.fetched_at else None,
+            }
+            self._attributes_key = key
+        return self._attributes
+
+    def _to_store(self) -> dict[str, Any]:
+        anchor = self.timeline.anchor.date()
+        return {
+            "fetched_at": self.fetched_at.isoformat() if self.fetched_at else None,
+            "digest": self.digest,
+            "days": {
+                anchor.isoformat(): [[period.start, period.end] for period in self.today_periods],
+                (anchor + timedelta(days=1)).isoformat(): [
+                    [period.start, period.end] for period in self.tomorrow_periods
+                ],
+            },
+        }
+
+    async def async_restore(self) -> bool:
+        """Restore the last saved schedule, dropping days that have passed.
+
+        Returns True when there is a schedule to show until the first refresh.
+        """
+        if self._store is None:
+            return False
+        stored = await self._store.async_load()
+        if not stored or not stored.get("fetched_at"):
+            return False
+
+        today = self.now.date()
+        days = {date.fromisoformat(day): periods for day, periods in stored["days"].items()}
+        if not any(day >= today for day in days):
+            LOGGER.debug("Saved schedule for group %s is outdated", self.group)
+            return False
+        self.set_periods(
+            [PowerOffPeriod(start, end, today=True) for start, end in days.get(today, [])],
+            [PowerOffPeriod(start, end, today=False) for start, end in days.get(today + timedelta(days=1), [])],
+        )
+        self.fetched_at = dt_util.parse_datetime(stored["fetched_at"])
+        # Відбиток містить дату, тому він дійсний лише для того ж дня
+        if self.fetched_at and self.fetched_at.date() == today:
+            self.digest = stored["digest"]
+        LOGGER.debug("Restored schedule for group %s fetched at %s", self.group, self.fetched_at)
+        return True
+
+    @property
+    def next_poweroff(self) -> datetime | None:
+        """Get the next poweroff time."""
+        dt = self.timeline.next_start_after(self.now)
+        LOGGER.debug("Next poweroff: %s", dt)
+        return dt
+
+    @property
+    def next_poweron(self) -> datetime | None:
+        """Get next connectivity time."""
+        dt = self.timeline.next_end_after(self.now)
+        LOGGER.debug("Next poweron: %s", dt)
+        return dt
+
+    @property
+    def current_state(self) -> str:
+        """Get the current state."""
+        event = self.get_event_at(self.now)
+        return STATE_OFF if event else STATE_ON
+
+    def get_event_at(self, at: datetime) -> CalendarEvent | None:
+        """Get the current event."""
+        return self.timeline.event_at(at)
+
+    def get_events_between(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+    ) -> list[CalendarEvent]:
+        """Get events overlapping the range.
+
+        Results are cached per range until the schedule changes, the returned list is
+        shared between callers and must not be modified.
+        """
+        key = (start_date, end_date)
+        if (events := self._events_cache.get(key)) is None:
+            if len(self._events_cache) >= EVENTS_CACHE_SIZE:
+                # Викидаємо найстаріший діапазон
+                del self._events_cache[next(iter(self._events_cache))]
+            events = self._events_cache[key] = self.timeline.events_between(start_date, end_date)
+        return events
+
+    def get_next_off_time(self) -> str | None:
+        """Get the next poweroff time as string."""
+        dt = self.next_poweroff
+        return dt.isoformat() if dt else None
+
+    def get_next_on_time(self) -> str | None:
+        """Get next connectivity time as string."""
+        dt = self.next_poweron
+        return dt.isoformat() if dt else None
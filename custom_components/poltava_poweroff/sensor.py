@@ -1,5 +1,5 @@
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass
 from typing import Any
 
@@ -11,10 +11,11 @@ from homeassistant.components.sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import STATE_OFF, STATE_ON
 from .coordinator import PoltavaPowerOffCoordinator
+from .entity import PoltavaPowerOffEntity
+from .schedule import GroupSchedule
 
 LOGGER = logging.getLogger(__name__)
 
@@ -23,7 +24,7 @@ LOGGER = logging.getLogger(__name__)
 class PoltavaPowerOffSensorDescription(SensorEntityDescription):
     """Poltava PowerOff entity description."""
 
-    val_func: Callable[[PoltavaPowerOffCoordinator], Any]
+    val_func: Callable[[GroupSchedule], Any]
 
 
 SENSOR_TYPES: tuple[PoltavaPowerOffSensorDescription, ...] = (
@@ -33,21 +34,21 @@ SENSOR_TYPES: tuple[PoltavaPowerOffSensorDescription, ...] = (
         device_class=SensorDeviceClass.ENUM,
         name="Power state",
         options=[STATE_ON, STATE_OFF],
-        val_func=lambda coordinator: coordinator.current_state,
+        val_func=lambda schedule: schedule.current_state,
     ),
     PoltavaPowerOffSensorDescription(
         key="next_poweroff",
         icon="mdi:calendar-remove",
         device_class=SensorDeviceClass.TIMESTAMP,
         name="Next power off",
-        val_func=lambda coordinator: coordinator.next_poweroff,
+        val_func=lambda schedule: schedule.next_poweroff,
     ),
     PoltavaPowerOffSensorDescription(
         key="next_poweron",
         icon="mdi:calendar-check",
         device_class=SensorDeviceClass.TIMESTAMP,
         name="Next power on",
-        val_func=lambda coordinator: coordinator.next_poweron,
+        val_func=lambda schedule: schedule.next_poweron,
     ),
 )
 
@@ -60,60 +61,29 @@ async def async_setup_entry(
     """Set up the Poltava PowerOff sensors."""
     LOGGER.debug("Setup new entry: %s", config_entry)
     coordinator: PoltavaPowerOffCoordinator = config_entry.runtime_data
-    async_add_entities(PoltavaPowerOffSensor(coordinator, description) for description in SENSOR_TYPES)
+    async_add_entities(
+        PoltavaPowerOffSensor(coordinator, schedule, description)
+        for schedule in coordinator.groups.values()
+        for description in SENSOR_TYPES
+    )
 
 
-class PoltavaPowerOffSensor(CoordinatorEntity[PoltavaPowerOffCoordinator], SensorEntity):
-    coordinator: PoltavaPowerOffCoordinator
+class PoltavaPowerOffSensor(PoltavaPowerOffEntity, SensorEntity):
+    """Sensor of one group."""
 
-    def __init__(
-        self,
-        coordinator: PoltavaPowerOffCoordinator,
-        entity_description: PoltavaPowerOffSensorDescription,
-    ) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-        self.coordinator = coordinator
-        self.entity_description = entity_description
-        self._attr_unique_id = f"{coordinator.config_entry.entry_id}-{coordinator.group}-{self.entity_description.key}"
+    entity_description: PoltavaPowerOffSensorDescription
+    # Списки періодів великі й змінюються рідко, recorder їх не зберігає
+    _unrecorded_attributes = frozenset({"poweroff_periods", "poweroff_periods_today", "poweroff_periods_tomorrow"})
 
     @property
     def native_value(self) -> str | None:
         """Return the state of the sensor."""
-        return self.entity_description.val_func(self.coordinator)  # type: ignore
+        return self.entity_description.val_func(self.schedule)  # type: ignore
 
     @property
-    def extra_state_attributes(self):
-        """Return extra attributes."""
-        today_periods = []
-        for period in self.coordinator.today_periods:
-            today_periods.append({"start": period.start, "end": period.end})
-
-        tomorrow_periods = []
-        for period in self.coordinator.tomorrow_periods:
-            tomorrow_periods.append({"start": period.start, "end": period.end})
-
-        # Для сумісності зі старою карткою - poweroff_periods містить сьогоднішні
-        # Але якщо сьогодні немає більше періодів, показуємо завтрашні
-        active_periods = today_periods
-        if not today_periods and tomorrow_periods:
-            # Перевіряємо, чи є ще сьогоднішні події в майбутньому
-            from homeassistant.util import dt as dt_util
-
-            now_dt = dt_util.now()
-            has_future_today = False
-            for period in self.coordinator.today_periods:
-                start, end = period.to_datetime_period(now_dt.tzinfo)
-                if end > now_dt:
-                    has_future_today = True
-                    break
-            if not has_future_today:
-                active_periods = tomorrow_periods
-
-        return {
-            "poweroff_periods": active_periods,  # Для сумісності
-            "poweroff_periods_today": today_periods,
-            "poweroff_periods_tomorrow": tomorrow_periods,
-            "next_off": self.coordinator.get_next_off_time(),
-            "next_on": self.coordinator.get_next_on_time(),
-        }
+    def extra_state_attributes(self) -> Mapping[str, Any]:
+        """Return extra attributes, shared by all sensors of the group."""
+        return self.schedule.state_attributes
+
+    def _state_snapshot(self) -> tuple[Any, ...]:
+        return self.native_value, self.extra_state_attributes
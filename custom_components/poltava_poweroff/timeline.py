@@ -0,0 +1,89 @@
+"""Provides the PowerOffTimeline index of power off events."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from datetime import datetime
+
+from homeassistant.components.calendar import CalendarEvent
+
+from .const import STATE_OFF
+from .entities import PowerOffPeriod
+
+
+class PowerOffTimeline:
+    """Immutable, date-anchored index of power off events.
+
+    Built once per refresh, so every query is a bisect over precomputed boundaries
+    instead of converting the periods to datetimes again.
+    """
+
+    __slots__ = ("anchor", "events", "_spans", "_starts", "_ends", "_max_ends")
+
+    def __init__(self, spans: Iterable[tuple[datetime, datetime]], anchor: datetime) -> None:
+        """Initialize the timeline from (start, end) spans."""
+        self.anchor = anchor
+        spans = sorted(spans)
+        self.events: tuple[CalendarEvent, ...] = tuple(
+            CalendarEvent(start=start, end=end, summary=STATE_OFF) for start, end in spans
+        )
+        self._starts: tuple[datetime, ...] = tuple(start for start, _ in spans)
+        self._ends: tuple[datetime, ...] = tuple(sorted(end for _, end in spans))
+        # Найпізніший кінець серед подій до i-ї включно, щоб пошук не залежав від перетинів
+        max_ends: list[datetime] = []
+        for _, end in spans:
+            max_ends.append(max(max_ends[-1], end) if max_ends else end)
+        self._max_ends: tuple[datetime, ...] = tuple(max_ends)
+        self._spans: tuple[tuple[datetime, datetime], ...] = tuple(spans)
+
+    @classmethod
+    def build(
+        cls,
+        today_periods: Iterable[PowerOffPeriod],
+        tomorrow_periods: Iterable[PowerOffPeriod],
+        now: datetime,
+    ) -> PowerOffTimeline:
+        """Build the timeline with periods anchored to the date of `now`."""
+        spans = [period.to_datetime_period(now) for periods in (today_periods, tomorrow_periods) for period in periods]
+        return cls(spans, now)
+
+    def next_start_after(self, at: datetime) -> datetime | None:
+        """Get the first event start after `at`."""
+        index = bisect_right(self._starts, at)
+        return self._starts[index] if index < len(self._starts) else None
+
+    def next_end_after(self, at: datetime) -> datetime | None:
+        """Get the first event end after `at`."""
+        index = bisect_right(self._ends, at)
+        return self._ends[index] if index < len(self._ends) else None
+
+    def boundaries_after(self, at: datetime) -> list[datetime]:
+        """Get the sorted, unique moments after `at` when the power state changes."""
+        starts = self._starts[bisect_right(self._starts, at) :]
+        ends = self._ends[bisect_right(self._ends, at) :]
+        return sorted(set(starts) | set(ends))
+
+    def event_at(self, at: datetime) -> CalendarEvent | None:
+        """Get the event active at `at`.
+
+        An event is active while start <= at < end, so at the end moment it is already over.
+        """
+        index = bisect_right(self._starts, at) - 1
+        while index >= 0 and self._max_ends[index] > at:
+            if self._spans[index][1] > at:
+                return self.events[index]
+            index -= 1
+        return None
+
+    def events_between(self, start_date: datetime, end_date: datetime) -> list[CalendarEvent]:
+        """Get events that overlap the range, including events that span all of it.
+
+        An event overlaps when start < end_date and end > start_date, so events that only
+        touch the range at its edges are left out.
+        """
+        # Події, що починаються з end_date і пізніше, не перетинають діапазон
+        upper = bisect_left(self._starts, end_date)
+        # До lower усі події закінчуються не пізніше start_date
+        lower = bisect_right(self._max_ends, start_date, hi=upper)
+        return [self.events[index] for index in range(lower, upper) if self._spans[index][1] > start_date]
@@ -0,0 +1,329 @@
+"""Provides HTTP transports used by the EnergyUaScrapper."""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+import logging
+import threading
+import time
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+if TYPE_CHECKING:
+    from .energyua_scrapper import EnergyUaStreamParser
+
+LOGGER = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = 30  # секунд на весь запит, разом з розв'язанням виклику Cloudflare
+CONNECT_TIMEOUT = 10  # секунд на з'єднання
+READ_TIMEOUT = 20  # секунд очікування наступних байтів відповіді
+STREAM_CHUNK_SIZE = 8192
+
+CHALLENGE_STATUSES = (403, 429, 503)
+CHALLENGE_MARKERS = ("challenge-platform", "cf_chl_opt", "cf-chl", "Just a moment")
+
+
+def is_challenge(status: int, headers: Mapping[str, str], text: str) -> bool:
+    """Check whether the response is a Cloudflare challenge page."""
+    if headers.get("cf-mitigated") == "challenge":
+        return True
+    return status in CHALLENGE_STATUSES and any(marker in text for marker in CHALLENGE_MARKERS)
+
+
+def valid_cookies(state: dict[str, Any]) -> list[dict[str, Any]]:
+    """Get the cookies of a saved session state that have not expired."""
+    now = time.time()
+    return [cookie for cookie in state.get("cookies", []) if cookie["expires"] > now]
+
+
+class ChallengeError(Exception):
+    """Error to indicate a Cloudflare challenge the transport cannot solve."""
+
+
+@dataclass
+class FetchTrace:
+    """Where the time of one request went, in seconds, and what came back.
+
+    `dns` and `connect` stay None when the connection was reused or the transport
+    cannot see them.
+    """
+
+    dns: float | None = None
+    connect: float | None = None  # без DNS, разом з TLS
+    wait: float | None = None  # від запиту до заголовків відповіді
+    transfer: float | None = None  # читання тіла
+    size: int | None = None  # байт тіла після розпакування
+    content_encoding: str | None = None
+    charset: str | None = None
+    challenge: bool = False  # cloudscraper розв'язував виклик Cloudflare
+    # Позначки часу trace callbacks aiohttp
+    _marks: dict[str, float] = field(default_factory=dict, repr=False)
+
+
+@dataclass(frozen=True)
+class FetchResponse:
+    """Response of a transport fetch."""
+
+    status: int
+    text: str
+    headers: Mapping[str, str]
+    transport: str
+    trace: FetchTrace | None = None
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """Create a trace config filling the FetchTrace passed as `trace_request_ctx`."""
+
+    def mark(name: str):
+        async def on_event(_session: aiohttp.ClientSession, context: SimpleNamespace, _params: object) -> None:
+            if isinstance(trace := context.trace_request_ctx, FetchTrace):
+                trace._marks[name] = time.perf_counter()  # noqa: SLF001
+
+        return on_event
+
+    async def on_dns_end(_session: aiohttp.ClientSession, context: SimpleNamespace, _params: object) -> None:
+        if isinstance(trace := context.trace_request_ctx, FetchTrace) and "dns" in trace._marks:  # noqa: SLF001
+            trace.dns = time.perf_counter() - trace._marks["dns"]  # noqa: SLF001
+
+    async def on_connect_end(_session: aiohttp.ClientSession, context: SimpleNamespace, _params: object) -> None:
+        if isinstance(trace := context.trace_request_ctx, FetchTrace) and "connect" in trace._marks:  # noqa: SLF001
+            # Створення з'єднання включає розв'язання імені
+            trace.connect = time.perf_counter() - trace._marks["connect"] - (trace.dns or 0)  # noqa: SLF001
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(mark("dns"))
+    trace_config.on_dns_resolvehost_end.append(on_dns_end)
+    trace_config.on_connection_create_start.append(mark("connect"))
+    trace_config.on_connection_create_end.append(on_connect_end)
+    return trace_config
+
+
+class AiohttpTransport:
+    """Fetches pages with the Home Assistant shared aiohttp session.
+
+    The session pools connections and decodes gzip/deflate (and brotli when it is
+    installed, which the manifest requires). It cannot solve Cloudflare challenges.
+    """
+
+    name = "aiohttp"
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        timeout: float = REQUEST_TIMEOUT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+    ) -> None:
+        """Initialize the transport."""
+        self.session = session
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=connect_timeout, sock_read=read_timeout)
+
+    async def fetch(self, url: str, headers: Mapping[str, str]) -> FetchResponse:
+        """Fetch the whole page.
+
+        DNS and connect times are traced when the session was created with `create_trace_config`.
+        """
+        trace = FetchTrace()
+        started = time.perf_counter()
+        async with self.session.get(url, headers=headers, timeout=self.timeout, trace_request_ctx=trace) as response:
+            headers_received = time.perf_counter()
+            body = await response.read()
+            trace.charset = response.get_encoding()
+            # Як і response.text(), один битий байт не повинен зламати розбір усієї сторінки
+            text = body.decode(trace.charset, errors="replace")
+            trace.wait = headers_received - started - (trace.dns or 0) - (trace.connect or 0)
+            trace.transfer = time.perf_counter() - headers_received
+            trace.size = len(body)
+            trace.content_encoding = response.headers.get("Content-Encoding")
+            if is_challenge(response.status, response.headers, text):
+                raise ChallengeError(f"Cloudflare challenge for {url}")
+            return FetchResponse(response.status, text, response.headers, self.name, trace)
+
+    async def stream(self, url: str, headers: Mapping[str, str], parser: EnergyUaStreamParser) -> None:
+        """Feed the page to `parser` chunk by chunk until it is done.
+
+        Chunks are read in the event loop and parsed in an executor thread, one at a time.
+        """
+        async with self.session.get(url, headers=headers, timeout=self.timeout) as response:
+            if response.status in CHALLENGE_STATUSES or response.headers.get("cf-mitigated") == "challenge":
+                text = await response.text()
+                if is_challenge(response.status, response.headers, text):
+                    raise ChallengeError(f"Cloudflare challenge for {url}")
+                await asyncio.to_thread(parser.feed, text)
+                return
+            decoder = codecs.getincrementaldecoder(response.get_encoding())(errors="replace")
+
+            def feed(chunk: bytes, final: bool = False) -> None:
+                parser.feed(decoder.decode(chunk, final))
+                if final:
+                    parser.close()
+
+            # Розбір завантажує CPU, тому, як і в cloudscraper, виконується поза event loop
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                await asyncio.to_thread(feed, chunk)
+                if parser.done:
+                    return
+            await asyncio.to_thread(feed, b"", True)
+
+
+class CloudscraperTransport:
+    """Fetches pages with cloudscraper, which can solve Cloudflare challenges.
+
+    cloudscraper is synchronous, so every request holds an executor thread. A cancelled
+    or timed out fetch returns at once, its thread finishes within the read timeout.
+
+    The session headers and persistent cookies (the Cloudflare clearance among them) can be
+    saved with `session_state` and restored by `async_start`, so a restart does not have to
+    solve the challenge again. `on_session_change` is called when they change after a request.
+    """
+
+    name = "cloudscraper"
+
+    def __init__(
+        self,
+        timeout: float = REQUEST_TIMEOUT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        on_session_change: Callable[[dict[str, Any]], None] | None = None,
+    ) -> None:
+        """Initialize the transport."""
+        self.timeout = timeout
+        # requests обмежує кожну операцію з сокетом, а не весь запит
+        self.socket_timeout = (connect_timeout, read_timeout)
+        self.on_session_change = on_session_change
+        self.scraper = None
+        # Кожен запит виконується в одному потоці, тож позначка виклику - на потік
+        self._local = threading.local()
+        # Сесію створює або перший запит, або відновлення збереженої, але не обидва
+        self._start_lock = asyncio.Lock()
+        self._session_state: dict[str, Any] | None = None
+
+    async def async_start(self, state: dict[str, Any] | None = None) -> None:
+        """Create the cloudscraper session, restoring a state saved by `session_state`.
+
+        Cookies that have expired are dropped. Headers are only restored together with
+        a valid cookie, a fresh session gets its own browser fingerprint.
+        """
+        async with self._start_lock:
+            if self.scraper is None:
+                self.scraper = await asyncio.to_thread(self._create_scraper, state)
+                if self.on_session_change is not None:
+                    self._session_state = self.session_state()
+
+    def _create_scraper(self, state: dict[str, Any] | None):
+        # cloudscraper тягне requests, urllib3 та інтерпретатор JS, тож імпортується лише в потоці,
+        # де створюється сесія, а не під час завантаження інтеграції
+        import cloudscraper  # type: ignore[import-untyped]  # noqa: PLC0415
+
+        scraper = cloudscraper.create_scraper(
+            browser={"browser": "chrome", "platform": "windows", "desktop": True},
+            requestPostHook=self._post_hook,
+        )
+        if state and (cookies := valid_cookies(state)):
+            # cf_clearance видається під user agent, з яким розв'язано виклик
+            scraper.headers.update(state["headers"])
+            for cookie in cookies:
+                scraper.cookies.set(**cookie)
+            LOGGER.debug("Restored cloudscraper session with %d cookies", len(cookies))
+        return scraper
+
+    async def _get_scraper(self):
+        """Get or create cloudscraper instance."""
+        if self.scraper is None:
+            await self.async_start()
+        return self.scraper
+
+    def session_state(self) -> dict[str, Any] | None:
+        """Get the headers and persistent cookies of the session, None before it is created."""
+        if (scraper := self.scraper) is None:
+            return None
+        # Інші потоки можуть змінювати cookies під час запиту
+        with scraper.cookies._cookies_lock:  # noqa: SLF001
+            cookies = [
+                {
+                    "name": cookie.name,
+                    "value": cookie.value,
+                    "domain": cookie.domain,
+                    "path": cookie.path,
+                    "secure": cookie.secure,
+                    "expires": cookie.expires,
+                }
+                for cookie in scraper.cookies
+                if cookie.expires is not None
+            ]
+        return {"headers": dict(scraper.headers), "cookies": cookies}
+
+    def _check_session(self) -> None:
+        """Report changed headers or cookies after a request."""
+        if self.on_session_change is None:
+            return
+        state = self.session_state()
+        if state is not None and state != self._session_state:
+            self._session_state = state
+            self.on_session_change(state)
+
+    async def async_close(self) -> None:
+        """Close the pooled connections of the cloudscraper session."""
+        if (scraper := self.scraper) is not None:
+            self.scraper = None
+            await asyncio.to_thread(scraper.close)
+
+    def _post_hook(self, _scraper, response):
+        """Note a challenge page before cloudscraper solves it."""
+        if is_challenge(response.status_code, response.headers, response.text):
+            self._local.challenge = True
+        return response
+
+    async def fetch(self, url: str, headers: Mapping[str, str]) -> FetchResponse:
+        """Fetch the whole page."""
+        scraper = await self._get_scraper()
+        # Розв'язання виклику робить кілька запитів, тому загальний ліміт лише тут
+        try:
+            async with asyncio.timeout(self.timeout):
+                return await asyncio.to_thread(self._fetch, scraper, url, headers)
+        finally:
+            self._check_session()
+
+    def _fetch(self, scraper, url: str, headers: Mapping[str, str]) -> FetchResponse:
+        self._local.challenge = False
+        started = time.perf_counter()
+        response = scraper.get(url, headers=headers, timeout=self.socket_timeout)
+        # requests читає тіло разом із запитом, elapsed - час до заголовків відповіді
+        wait = response.elapsed.total_seconds()
+        trace = FetchTrace(
+            wait=wait,
+            transfer=max(0.0, time.perf_counter() - started - wait),
+            size=len(response.content),
+            content_encoding=response.headers.get("Content-Encoding"),
+            charset=response.encoding,
+            challenge=self._local.challenge,
+        )
+        return FetchResponse(response.status_code, response.text, response.headers, self.name, trace)
+
+    async def stream(self, url: str, headers: Mapping[str, str], parser: EnergyUaStreamParser) -> None:
+        """Feed the page to `parser` chunk by chunk until it is done."""
+        scraper = await self._get_scraper()
+        try:
+            async with asyncio.timeout(self.timeout):
+                await asyncio.to_thread(self._stream, scraper, url, headers, parser)
+        finally:
+            self._check_session()
+
+    def _stream(self, scraper, url: str, headers: Mapping[str, str], parser: EnergyUaStreamParser) -> None:
+        response = scraper.get(url, headers=headers, timeout=self.socket_timeout, stream=True)
+        try:
+            decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                parser.feed(decoder.decode(chunk))
+                if parser.done:
+                    LOGGER.debug("Parser is done, stop reading %s", url)
+                    return
+            parser.feed(decoder.decode(b"", final=True))
+            parser.close()
+        finally:
+            response.close()
@@ -0,0 +1,145 @@
+"""WebSocket API pushing group schedules to the frontend."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import timedelta
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DOMAIN, SCHEDULE_PAYLOAD_VERSION, SIGNAL_ENTRY_UNLOADED
+from .coordinator import PoltavaPowerOffCoordinator
+from .schedule import GroupSchedule
+
+LOGGER = logging.getLogger(__name__)
+
+# Періоди дня як пари [початок, кінець] у секундах Unix
+Days = dict[str, list[list[int]]]
+
+
+@callback
+def async_setup(hass: HomeAssistant) -> None:
+    """Register the WebSocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe_schedule)
+
+
+def schedule_days(schedule: GroupSchedule) -> Days:
+    """Get the periods of the known days with absolute timestamps, by ISO date."""
+    anchor = schedule.timeline.anchor
+    days: Days = {}
+    for offset, periods in enumerate((schedule.today_periods, schedule.tomorrow_periods)):
+        spans = (period.to_datetime_period(anchor) for period in periods)
+        days[(anchor.date() + timedelta(days=offset)).isoformat()] = [
+            [int(start.timestamp()), int(end.timestamp())] for start, end in spans
+        ]
+    return days
+
+
+class ScheduleSubscription:
+    """Schedule of one group as a subscriber last received it.
+
+    The first message is a full snapshot, after that only the days that changed
+    are sent, and nothing at all while the schedule generation stays the same.
+    """
+
+    def __init__(self, schedule: GroupSchedule, send: Callable[[dict[str, Any]], None]) -> None:
+        """Initialize the subscription."""
+        self.schedule = schedule
+        self._send = send
+        self._generation: int | None = None
+        self._days: Days = {}
+
+    @callback
+    def async_send_snapshot(self) -> None:
+        """Send the whole schedule."""
+        self._generation = self.schedule.generation
+        self._days = schedule_days(self.schedule)
+        self._send(
+            {
+                "type": "snapshot",
+                "version": SCHEDULE_PAYLOAD_VERSION,
+                "group": str(self.schedule.group),
+                "generation": self._generation,
+                "days": self._days,
+            }
+        )
+
+    @callback
+    def async_send_delta(self) -> None:
+        """Send the days that changed since the last message, if any."""
+        if self.schedule.generation == self._generation:
+            return
+        self._generation = self.schedule.generation
+        days = schedule_days(self.schedule)
+        changed = {day: periods for day, periods in days.items() if self._days.get(day) != periods}
+        removed = [day for day in self._days if day not in days]
+        self._days = days
+        if not changed and not removed:
+            return
+        self._send({"type": "delta", "generation": self._generation, "days": changed, "removed": removed})
+
+
+def _find_schedule(hass: HomeAssistant, entity_id: str) -> tuple[PoltavaPowerOffCoordinator, GroupSchedule] | None:
+    """Find the coordinator and the group schedule shown by an entity of the integration."""
+    entity = er.async_get(hass).async_get(entity_id)
+    if entity is None or entity.platform != DOMAIN or entity.config_entry_id is None:
+        return None
+    entry = hass.config_entries.async_get_entry(entity.config_entry_id)
+    if entry is None or entry.state is not ConfigEntryState.LOADED:
+        return None
+    coordinator: PoltavaPowerOffCoordinator = entry.runtime_data
+    for group, schedule in coordinator.groups.items():
+        # unique_id сутностей: {entry_id}-{група}-{ключ}
+        if entity.unique_id.startswith(f"{entry.entry_id}-{group}-"):
+            return coordinator, schedule
+    return None
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe_schedule",
+        vol.Required("entity_id"): cv.entity_id,
+    }
+)
+@callback
+def websocket_subscribe_schedule(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Subscribe to the schedule of the group shown by an entity."""
+    found = _find_schedule(hass, msg["entity_id"])
+    if found is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, f"No power off schedule for {msg['entity_id']}")
+        return
+    coordinator, schedule = found
+    entry_id = coordinator.config_entry.entry_id
+
+    subscription = ScheduleSubscription(
+        schedule, lambda payload: connection.send_message(websocket_api.event_message(msg["id"], payload))
+    )
+
+    @callback
+    def async_unsubscribe() -> None:
+        unsub_coordinator()
+        unsub_unloaded()
+
+    @callback
+    def async_entry_unloaded() -> None:
+        # Після перезавантаження запису розклад вже інший об'єкт - картка підпишеться знову
+        async_unsubscribe()
+        connection.subscriptions.pop(msg["id"], None)
+        connection.send_message(websocket_api.event_message(msg["id"], {"type": "closed"}))
+
+    unsub_coordinator = coordinator.async_add_listener(subscription.async_send_delta)
+    unsub_unloaded = async_dispatcher_connect(hass, f"{SIGNAL_ENTRY_UNLOADED}_{entry_id}", async_entry_unloaded)
+    connection.subscriptions[msg["id"]] = async_unsubscribe
+    connection.send_result(msg["id"])
+    subscription.async_send_snapshot()
+    LOGGER.debug("Schedule of group %s subscribed by %s", schedule.group, msg["entity_id"])
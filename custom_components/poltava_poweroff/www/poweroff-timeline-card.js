@@ -1,10 +1,154 @@
+// Як часто пересувати позначку "зараз", мс
+const NOW_MARKER_INTERVAL = 60 * 1000;
+// Через скільки підписатись знову, якщо запис інтеграції перезавантажується, мс
+const RESUBSCRIBE_DELAY = 10 * 1000;
+const HALF_HOUR = 30 * 60 * 1000;
+
+const CARD_STYLE = `
+  .day-switcher {
+    display: flex;
+    align-items: center;
+    gap: 4px;
+    background: var(--card-background-color, #1e1e1e);
+    border-radius: 12px;
+    padding: 2px;
+  }
+
+  .day-switcher-button {
+    display: grid;
+    place-items: center;
+    width: 32px;
+    height: 32px;
+    border-radius: 10px;
+    cursor: pointer;
+    transition: all 0.2s ease;
+    color: var(--secondary-text-color, #b5b5b5);
+    background: transparent;
+    border: none;
+    padding: 0;
+    margin: 0;
+  }
+
+  .day-switcher-button ha-icon {
+    width: 20px;
+    height: 20px;
+    margin: 0;
+    padding: 0;
+    display: block;
+  }
+
+  .day-switcher-button ha-icon svg {
+    display: block;
+    width: 100%;
+    height: 100%;
+    margin: 0;
+  }
+
+  .day-switcher-button:hover:not(.active) {
+    background: var(--divider-color, rgba(255, 255, 255, 0.1));
+    color: var(--primary-text-color);
+  }
+
+  .spiral-wrapper {
+    display: flex;
+    flex-direction: column;
+    gap: 12px;
+    align-items: center;
+    text-align: center;
+  }
+
+  .spiral-wrapper[hidden] {
+    display: none;
+  }
+
+  .spiral-container {
+    display: contents;
+  }
+
+  .spiral-chart {
+    width: 100%;
+    max-width: 520px;
+  }
+
+  .spiral-segment {
+    transition: opacity 0.3s ease;
+  }
+
+  .spiral-hour-label {
+    font-size: 24px;
+    font-weight: 900;
+    fill: #0f3547;
+    text-anchor: middle;
+    dominant-baseline: middle;
+  }
+
+  .spiral-center-text {
+    font-family: "TT Firs Neue", "Segoe UI", sans-serif;
+    fill: #b1b1b1;
+    text-anchor: middle;
+  }
+
+  .center-queue {
+    font-size: 36px;
+    font-weight: 700;
+    fill: #aab1b6;
+  }
+
+  .center-date {
+    font-size: 18px;
+    font-weight: 600;
+  }
+
+  .center-stats {
+    font-size: 22px;
+    font-weight: 700;
+  }
+
+  .center-stats tspan:first-child {
+    fill: #cf6f6f;
+  }
+
+  .center-stats tspan:last-child {
+    fill: #65a46f;
+  }
+
+  .legend {
+    display: flex;
+    gap: 18px;
+    font-size: 14px;
+    color: var(--secondary-text-color, #b5b5b5);
+  }
+
+  .legend-item {
+    display: flex;
+    align-items: center;
+    gap: 6px;
+  }
+
+  .legend-dot {
+    width: 18px;
+    height: 18px;
+    border-radius: 4px;
+  }
+
+  .info-line {
+    font-size: 14px;
+    color: var(--secondary-text-color, #b5b5b5);
+  }
+`;
+
 class PowerOffTimelineCard extends HTMLElement {
   setConfig(config) {
     if (!config.entity) {
       throw new Error('Please define an entity');
     }
+    if (this.config && this.config.entity !== config.entity) {
+      this.unsubscribe();
+      this._schedule = null;
+    }
     this.config = config;
     this.selectedTab = 'today'; // 'today' або 'tomorrow'
+    this.subscribe();
   }
 
   set hass(hass) {
@@ -86,49 +230,143 @@ class PowerOffTimelineCard extends HTMLElement {
       this.content = document.createElement('div');
       this.content.style.padding = '16px';
       this.card.appendChild(this.content);
+      this.buildContent();
+    }
+
+    // Розклад приходить підпискою, тож зміни інших сутностей картку не стосуються
+    this.subscribe();
+  }
+
+  connectedCallback() {
+    // Єдина періодична робота - пересунути позначку "зараз"
+    if (!this._nowTimer) {
+      this._nowTimer = setInterval(() => this.updateNowMarker(), NOW_MARKER_INTERVAL);
+    }
+    this.subscribe();
+  }
+
+  disconnectedCallback() {
+    clearInterval(this._nowTimer);
+    this._nowTimer = null;
+    this.unsubscribe();
+  }
+
+  subscribe() {
+    if (this._subscription || this._resubscribeTimer || !this._hass || !this.config || !this.isConnected) {
+      return;
+    }
+    this._subscription = this._hass.connection.subscribeMessage(
+      message => this.handleScheduleMessage(message),
+      {type: 'poltava_poweroff/subscribe_schedule', entity_id: this.config.entity},
+    );
+    this._subscription.catch(() => {
+      // Сутності немає або запис ще не завантажений
+      this._subscription = null;
+      this._schedule = null;
+      this._failed = true;
+      this.updateTimeline();
+      this.resubscribeLater();
+    });
+  }
+
+  unsubscribe() {
+    clearTimeout(this._resubscribeTimer);
+    this._resubscribeTimer = null;
+    if (this._subscription) {
+      this._subscription.then(unsub => unsub()).catch(() => {});
+      this._subscription = null;
     }
+  }
+
+  resubscribeLater() {
+    this._resubscribeTimer = setTimeout(() => {
+      this._resubscribeTimer = null;
+      this.subscribe();
+    }, RESUBSCRIBE_DELAY);
+  }
 
+  handleScheduleMessage(message) {
+    if (message.type === 'snapshot') {
+      // Після перепідключення сервер знову надсилає повний знімок
+      this._schedule = {group: message.group, generation: message.generation, days: message.days};
+    } else if (message.type === 'delta' && this._schedule) {
+      const days = {...this._schedule.days, ...message.days};
+      message.removed.forEach(day => delete days[day]);
+      this._schedule = {...this._schedule, generation: message.generation, days};
+    } else if (message.type === 'closed') {
+      // Запис інтеграції перезавантажується - показуємо останній розклад і підписуємось знову
+      this.unsubscribe();
+      this.resubscribeLater();
+      return;
+    } else {
+      return;
+    }
+    this._failed = false;
     this.updateTimeline();
   }
 
+  // Періоди всіх відомих днів як [початок, кінець] у мс, за зростанням
+  schedulePeriods() {
+    return Object.values(this._schedule.days)
+      .flat()
+      .map(([start, end]) => [start * 1000, end * 1000])
+      .sort((a, b) => a[0] - b[0]);
+  }
+
+  buildContent() {
+    this.content.innerHTML = `
+      <style>${CARD_STYLE}</style>
+      <div class="not-found" hidden>Entity not found</div>
+      <div class="spiral-wrapper">
+        <div class="spiral-container"></div>
+        <div class="legend">
+          <div class="legend-item">
+            <span class="legend-dot" style="background:rgb(255 182 193);"></span>
+            <span>Відключення</span>
+          </div>
+          <div class="legend-item">
+            <span class="legend-dot" style="background:rgb(144 238 144);"></span>
+            <span>Світло є</span>
+          </div>
+        </div>
+        <div class="legend">
+          <div>Наступне вимкнення: <span class="next-off">—</span></div>
+          <div>Наступне увімкнення: <span class="next-on">—</span></div>
+        </div>
+      </div>
+    `;
+    this.notFound = this.content.querySelector('.not-found');
+    this.wrapper = this.content.querySelector('.spiral-wrapper');
+    this.spiralContainer = this.content.querySelector('.spiral-container');
+    this.nextOffText = this.content.querySelector('.next-off');
+    this.nextOnText = this.content.querySelector('.next-on');
+  }
+
   updateTimeline() {
-    const entity = this._hass.states[this.config.entity];
-    if (!entity) {
-      this.content.innerHTML = '<div>Entity not found</div>';
+    if (!this.content) {
+      return;
+    }
+    const schedule = this._schedule;
+    this.notFound.hidden = !this._failed;
+    this.wrapper.hidden = !schedule;
+    if (!schedule) {
+      this._spiralKey = null;
+      this.segments = null;
       return;
     }
 
-    const todayPeriods = entity.attributes.poweroff_periods_today || [];
-    const tomorrowPeriods = entity.attributes.poweroff_periods_tomorrow || [];
-    const nextOff = entity.attributes.next_off;
-    const nextOn = entity.attributes.next_on;
+    const periods = this.schedulePeriods();
     const now = new Date();
+    const todayPattern = this.buildPattern(periods, now);
+    const tomorrowPattern = this.buildPattern(periods, this.nextDay(now));
 
-    // Автоматично вибираємо таб: якщо сьогодні немає більше періодів, показуємо завтра
-    if (this.selectedTab === 'today' && todayPeriods.length === 0 && tomorrowPeriods.length > 0) {
-      // Перевіряємо, чи є ще сьогоднішні події в майбутньому
-      const hasFutureToday = todayPeriods.some(period => {
-        const endHour = Number(period.end);
-        const endTime = new Date(now);
-        endTime.setHours(Math.floor(endHour), (endHour % 1) * 60, 0, 0);
-        return endTime > now;
-      });
-      if (!hasFutureToday) {
-        this.selectedTab = 'tomorrow';
-      }
-    }
-
-    // Визначаємо періоди та дату в залежності від вибраного таба
-    const periods = this.selectedTab === 'today' ? todayPeriods : tomorrowPeriods;
-    const displayDate = new Date(now);
-    if (this.selectedTab === 'tomorrow') {
-      displayDate.setDate(displayDate.getDate() + 1);
+    // Автоматично вибираємо таб: якщо сьогодні відключень немає, а завтра є, показуємо завтра
+    if (this.selectedTab === 'today' && !todayPattern.includes('0') && tomorrowPattern.includes('0')) {
+      this.selectedTab = 'tomorrow';
     }
 
-    const pattern = this.buildPattern(periods);
-    const currentIndex = this.selectedTab === 'today'
-      ? (now.getHours() * 2 + (now.getMinutes() >= 30 ? 1 : 0))
-      : -1; // Для завтра не показуємо поточний час
+    const pattern = this.selectedTab === 'today' ? todayPattern : tomorrowPattern;
+    const displayDate = this.dayOfTab(now);
 
     // Оновлюємо тільки текст заголовка та класи активності (без перестворення HTML)
     const titleText = this.selectedTab === 'today' ? 'Відключення сьогодні' : 'Відключення завтра';
@@ -151,185 +389,85 @@ class PowerOffTimelineCard extends HTMLElement {
       this.tomorrowButton.style.color = 'white';
     }
 
-    this.content.innerHTML = `
-      <style>
-        .day-switcher {
-          display: flex;
-          align-items: center;
-          gap: 4px;
-          background: var(--card-background-color, #1e1e1e);
-          border-radius: 12px;
-          padding: 2px;
-        }
-
-        .day-switcher-button {
-          display: grid;
-          place-items: center;
-          width: 32px;
-          height: 32px;
-          border-radius: 10px;
-          cursor: pointer;
-          transition: all 0.2s ease;
-          color: var(--secondary-text-color, #b5b5b5);
-          background: transparent;
-          border: none;
-          padding: 0;
-          margin: 0;
-        }
-
-        .day-switcher-button ha-icon {
-          width: 20px;
-          height: 20px;
-          margin: 0;
-          padding: 0;
-          display: block;
-        }
-
-        .day-switcher-button ha-icon svg {
-          display: block;
-          width: 100%;
-          height: 100%;
-          margin: 0;
-        }
-
-        .day-switcher-button:hover:not(.active) {
-          background: var(--divider-color, rgba(255, 255, 255, 0.1));
-          color: var(--primary-text-color);
-        }
-
-        .spiral-wrapper {
-          display: flex;
-          flex-direction: column;
-          gap: 12px;
-          align-items: center;
-          text-align: center;
-        }
-
-        .spiral-chart {
-          width: 100%;
-          max-width: 520px;
-        }
-
-        .spiral-segment {
-          transition: opacity 0.3s ease;
-        }
-
-        .spiral-hour-label {
-          font-size: 24px;
-          font-weight: 900;
-          fill: #0f3547;
-          text-anchor: middle;
-          dominant-baseline: middle;
-        }
-
-        .spiral-center-text {
-          font-family: "TT Firs Neue", "Segoe UI", sans-serif;
-          fill: #b1b1b1;
-          text-anchor: middle;
-        }
-
-        .center-queue {
-          font-size: 36px;
-          font-weight: 700;
-          fill: #aab1b6;
-        }
-
-        .center-date {
-          font-size: 18px;
-          font-weight: 600;
-        }
-
-        .center-stats {
-          font-size: 22px;
-          font-weight: 700;
-        }
-
-        .center-stats tspan:first-child {
-          fill: #cf6f6f;
-        }
+    // Спіраль будуємо один раз на розклад: перемальовуємо лише коли змінились періоди, таб чи дата
+    const queue = schedule.group.replace('-', '.');
+    const spiralKey = [this.selectedTab, pattern, displayDate.toDateString(), queue].join('|');
+    if (spiralKey !== this._spiralKey) {
+      this._spiralKey = spiralKey;
+      this.spiralContainer.innerHTML = this.renderSpiral(pattern, displayDate, queue);
+      this.segments = Array.from(this.spiralContainer.querySelectorAll('.spiral-segment'));
+      this._markerIndex = null;
+      this.updateNowMarker();
+    }
 
-        .center-stats tspan:last-child {
-          fill: #65a46f;
-        }
+    this.updateNextTimes(periods, now);
+  }
 
-        .legend {
-          display: flex;
-          gap: 18px;
-          font-size: 14px;
-          color: var(--secondary-text-color, #b5b5b5);
-        }
+  updateNextTimes(periods, now) {
+    const next = periods.find(([start]) => start > now.getTime());
+    const current = periods.find(([start, end]) => start <= now.getTime() && end > now.getTime());
+    this.nextOffText.textContent = this.formatTime(next ? next[0] : null);
+    this.nextOnText.textContent = this.formatTime(current ? current[1] : next ? next[1] : null);
+  }
 
-        .legend-item {
-          display: flex;
-          align-items: center;
-          gap: 6px;
-        }
+  updateNowMarker() {
+    if (!this.segments) {
+      return;
+    }
+    const now = new Date();
+    // Після півночі "сьогодні" вже інший день - будуємо спіраль заново
+    if (!this._spiralKey.includes(this.dayOfTab(now).toDateString())) {
+      this.updateTimeline();
+      return;
+    }
+    this.updateNextTimes(this.schedulePeriods(), now);
+    const currentIndex = now.getHours() * 2 + (now.getMinutes() >= 30 ? 1 : 0);
+    if (currentIndex === this._markerIndex) {
+      return;
+    }
+    this._markerIndex = currentIndex;
 
-        .legend-dot {
-          width: 18px;
-          height: 18px;
-          border-radius: 4px;
-        }
+    this.segments.forEach((segment, i) => {
+      // Для обох табів: минулі години мають opacity 0.65, майбутні - 1
+      // Використовуємо однакову логіку opacity для обох табів, щоб кольори виглядали однаково
+      segment.style.opacity = Math.floor(i / 2) < now.getHours() ? 0.65 : 1;
+      // Для завтра не показуємо поточний час
+      if (this.selectedTab === 'today' && i === currentIndex) {
+        segment.setAttribute('stroke', segment.style.fill);
+        segment.setAttribute('stroke-width', '5');
+      } else {
+        segment.removeAttribute('stroke');
+        segment.removeAttribute('stroke-width');
+      }
+    });
+  }
 
-        .info-line {
-          font-size: 14px;
-          color: var(--secondary-text-color, #b5b5b5);
-        }
-      </style>
+  dayOfTab(now) {
+    return this.selectedTab === 'tomorrow' ? this.nextDay(now) : new Date(now);
+  }
 
-      <div class="spiral-wrapper">
-        ${this.renderSpiral(pattern, currentIndex, displayDate, entity, this.selectedTab)}
-        <div class="legend">
-          <div class="legend-item">
-            <span class="legend-dot" style="background:rgb(255 182 193);"></span>
-            <span>Відключення</span>
-          </div>
-          <div class="legend-item">
-            <span class="legend-dot" style="background:rgb(144 238 144);"></span>
-            <span>Світло є</span>
-          </div>
-        </div>
-        <div class="legend">
-          <div>Наступне вимкнення: ${this.formatTime(nextOff)}</div>
-          <div>Наступне увімкнення: ${this.formatTime(nextOn)}</div>
-        </div>
-      </div>
-    `;
+  nextDay(now) {
+    const day = new Date(now);
+    day.setDate(day.getDate() + 1);
+    return day;
   }
 
-  buildPattern(periods) {
+  buildPattern(periods, day) {
     const slots = Array(48).fill('1');
-    periods.forEach(period => {
-      // Використовуємо Math.floor для початку та Math.ceil для кінця,
-      // щоб правильно покрити періоди з хвилинами (наприклад, 14:30)
-      const startHour = Number(period.start);
-      let endHour = Number(period.end);
-
-      // Якщо endHour дорівнює 0 (опівночі), це означає кінець доби (24:00)
-      // Але якщо endHour == 12.0, це означає 12:00 (опівдень), а не опівночі
-      // Тому перевіряємо: якщо endHour == 0, то це опівночі (24:00)
-      // Якщо endHour >= 24, нормалізуємо до 24
-      if (endHour === 0) {
-        endHour = 24; // Опівночі = 24:00
-      } else if (endHour >= 24) {
-        endHour = 24; // Нормалізуємо до 24 годин
-      }
-
-      const start = Math.max(0, Math.min(48, Math.floor(startHour * 2)));
-      // Для endHour == 24, Math.ceil(24 * 2) = 48, що правильно покриває всю добу
-      // Для endHour == 12.0, Math.ceil(12.0 * 2) = 24, що правильно покриває до 12:00
-      const end = Math.max(start, Math.min(48, Math.ceil(endHour * 2)));
-
-      // Якщо end == 48, це означає кінець доби, тому покриваємо всі слоти до кінця
-      // Якщо end < 48, покриваємо слоти від start до end (не включно)
-      for (let i = start; i < end; i += 1) {
+    const midnight = new Date(day.getFullYear(), day.getMonth(), day.getDate()).getTime();
+    periods.forEach(([start, end]) => {
+      // Math.floor для початку та Math.ceil для кінця, щоб покрити періоди з хвилинами (14:15),
+      // а періоди інших днів обрізаємо до цієї доби
+      const first = Math.max(0, Math.floor((start - midnight) / HALF_HOUR));
+      const last = Math.min(48, Math.ceil((end - midnight) / HALF_HOUR));
+      for (let i = first; i < last; i += 1) {
         slots[i] = '0';
       }
     });
     return slots.join('');
   }
 
-  renderSpiral(pattern, currentIndex, displayDate, entity, selectedTab) {
+  renderSpiral(pattern, displayDate, queue) {
     const SEGMENT_COLORS = {
       0: 'rgb(255 182 193)', // рожевий для відключення
       1: 'rgb(144 238 144)', // світло-зелений для світла
@@ -339,7 +477,6 @@ class PowerOffTimelineCard extends HTMLElement {
     const INITIAL_RADIUS = 35;
     const RADIUS_STEP = 2.3;
     const ANGLE_STEP = (Math.PI * 2) / 24;
-    const now = new Date();
 
     const segments = Array.from({length: 48}, (_, i) => {
       const startAngle = ANGLE_STEP * i;
@@ -349,14 +486,8 @@ class PowerOffTimelineCard extends HTMLElement {
       const path = this.createSpiralPath(startRadius, endRadius, ARC_WIDTH, startAngle, endAngle);
       const slot = parseInt(pattern[i], 10);
       const color = SEGMENT_COLORS[slot] || SEGMENT_COLORS[1];
-      const isCurrent = selectedTab === 'today' && i === currentIndex;
-      // Для обох табів: минулі години мають opacity 0.65, майбутні - 1
-      // Для завтрашнього дня всі години в майбутньому, тому opacity = 1 для всіх
-      // Для сьогоднішнього: перевіряємо відносно поточного часу
-      // Використовуємо однакову логіку opacity для обох табів, щоб кольори виглядали однаково
-      const opacity = Math.floor(i / 2) < now.getHours() ? 0.65 : 1;
-      const stroke = isCurrent ? `stroke="${SEGMENT_COLORS[slot] || 'rgb(144 238 144)'}" stroke-width="5"` : '';
-      return `<path d="${path}" class="spiral-segment" style="fill:${color};opacity:${opacity};" ${stroke}></path>`;
+      // Прозорість минулих годин і позначку "зараз" виставляє updateNowMarker
+      return `<path d="${path}" class="spiral-segment" style="fill:${color};"></path>`;
     }).join('');
 
     const hourLabels = Array.from({length: 24}, (_, hour) => {
@@ -369,7 +500,6 @@ class PowerOffTimelineCard extends HTMLElement {
     }).join('');
 
     const centerCircle = '<circle r="120" fill="rgba(22,22,22,0.8)"></circle>';
-    const queue = entity.attributes.queue || entity.attributes.group || '1.1';
     const dateStr = displayDate.toLocaleDateString('uk', {weekday: 'short', day: '2-digit', month: '2-digit'});
 
     const offCount = (pattern.match(/0/g) || []).length / 2;
@@ -439,7 +569,7 @@ window.customCards.push({
 });
 
 console.info(
-  '%c POWEROFF-TIMELINE-CARD %c Version 1.0.0 ',
+  '%c POWEROFF-TIMELINE-CARD %c Version 1.2.0 ',
   'color: white; background: #3a3a38; font-weight: 700;',
   'color: #3a3a38; background: white; font-weight: 700;'
 );
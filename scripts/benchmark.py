@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Benchmark the scraper and coordinator hot paths over the HTML fixtures.
+
+Usage:
+    python scripts/benchmark.py                                   # print results
+    python scripts/benchmark.py -o benchmark.json                 # save results
+    python scripts/benchmark.py -b benchmark.json [-t 0.25]       # compare with a baseline
+
+Exits with 1 when a benchmark is slower than the baseline by more than the tolerance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable, Mapping
+from concurrent.futures import Executor
+from datetime import datetime, timedelta
+import json
+from pathlib import Path
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any
+
+REPO_ROOT = Path(__file__).parent.parent
+FIXTURES_DIR = REPO_ROOT / "tests"
+sys.path.insert(0, str(REPO_ROOT / "custom_components"))
+
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from poltava_poweroff.const import PARSE_WORKERS, PowerOffGroup  # noqa: E402
+from poltava_poweroff.energyua_scrapper import PARSER_FEATURES, EnergyUaScrapper, create_parse_pool  # noqa: E402
+from poltava_poweroff.entities import PowerOffPeriod  # noqa: E402
+from poltava_poweroff.schedule import GroupSchedule  # noqa: E402
+from poltava_poweroff.transport import FetchResponse  # noqa: E402
+
+MERGE_SIZES = (100, 10_000)
+BATCH_SIZE = len(PowerOffGroup)
+
+
+def measure(func: Callable[[], Any], rounds: int) -> dict[str, float]:
+    """Time `func` over `rounds` calls, then record its peak memory in one extra call."""
+    func()  # прогрів: імпорти, кеші регулярних виразів
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "rounds": rounds,
+        "min_us": min(timings) * 1e6,
+        "mean_us": statistics.fmean(timings) * 1e6,
+        "stdev_us": statistics.stdev(timings) * 1e6 if rounds > 1 else 0.0,
+        "peak_kib": peak / 1024,
+    }
+
+
+def bench_get_power_off_periods(page: Path) -> Callable[[], Any]:
+    """Fetch and parse a fixture page with the network replaced by the page content."""
+    response = FetchResponse(200, page.read_text(encoding="utf-8"), {}, "benchmark")
+
+    async def fetch(_url: str, _headers: Mapping[str, str]) -> FetchResponse:
+        return response
+
+    # Підміняється транспорт, а не методи scrapper, тож вимірюється весь шлях запиту
+    transport = SimpleNamespace(name="benchmark", fetch=fetch)
+    loop = asyncio.new_event_loop()
+
+    def run() -> Any:
+        # Новий scrapper щоразу, щоб не спрацьовував кеш відбитків
+        return loop.run_until_complete(
+            EnergyUaScrapper(PowerOffGroup.OneOne, transports=[transport]).get_power_off_periods()
+        )
+
+    return run
+
+
+def synthetic_periods(count: int, seed: int = 0) -> list[tuple[float, float]]:
+    """Random overlapping half-hour aligned periods over one day."""
+    rng = random.Random(seed)
+    periods = []
+    for _ in range(count):
+        start = rng.randrange(0, 48) / 2
+        periods.append((start, min(24.0, start + rng.randrange(1, 9) / 2)))
+    return periods
+
+
+def bench_merge_periods(count: int) -> Callable[[], Any]:
+    """Merge `count` synthetic periods, the same list every run since merging leaves it untouched."""
+    periods = [PowerOffPeriod(start, end, today=True) for start, end in synthetic_periods(count)]
+
+    def run() -> Any:
+        return EnergyUaScrapper.merge_periods(periods)
+
+    return run
+
+
+def group_schedule(now: datetime) -> GroupSchedule:
+    """Group schedule with the busiest fixture page, without Home Assistant running."""
+    page = (FIXTURES_DIR / "energyua_2_days.html").read_text(encoding="utf-8")
+    today, tomorrow = EnergyUaScrapper.parse_power_off_periods(page)
+    # Без hass розклад не має сховища, тож Home Assistant для вимірювань не потрібен
+    schedule = GroupSchedule(None, PowerOffGroup.OneOne, "benchmark", now)
+    schedule.set_periods(today, tomorrow)
+    return schedule
+
+
+def batch_pages() -> list[bytes]:
+    """Fixture pages repeated to the size of a batch of all groups."""
+    pages = [page.read_bytes() for page in sorted(FIXTURES_DIR.glob("*.html"))]
+    return [pages[index % len(pages)] for index in range(BATCH_SIZE)]
+
+
+def benchmarks(pool: Executor) -> dict[str, Callable[[], Any]]:
+    """All benchmarks by name."""
+    cases: dict[str, Callable[[], Any]] = {}
+    for page in sorted(FIXTURES_DIR.glob("*.html")):
+        cases[f"get_power_off_periods[{page.stem}]"] = bench_get_power_off_periods(page)
+
+    pages = batch_pages()
+    cases["parse_batch[serial]"] = lambda: [EnergyUaScrapper.parse_power_off_periods(page) for page in pages]
+    # Пул створено заздалегідь: прогрівальний виклик measure запускає процеси поза вимірюванням
+    cases["parse_batch[pool]"] = lambda: EnergyUaScrapper.parse_power_off_periods_batch(pages, executor=pool)
+    for count in MERGE_SIZES:
+        cases[f"merge_periods[{count}]"] = bench_merge_periods(count)
+
+    now = dt_util.start_of_local_day(datetime(2025, 1, 15)) + timedelta(hours=9)
+    schedule = group_schedule(now)
+    cases["coordinator.next_poweroff"] = lambda: schedule.next_poweroff
+    two_days = (now - timedelta(hours=9), now + timedelta(days=1, hours=15))
+    hour = (now, now + timedelta(hours=1))
+    cases["coordinator.get_events_between[2d]"] = lambda: schedule.get_events_between(*two_days)
+    cases["coordinator.get_events_between[1h]"] = lambda: schedule.get_events_between(*hour)
+    # Без кешу діапазонів: пошук по індексу інтервалів
+    cases["timeline.events_between[2d]"] = lambda: schedule.timeline.events_between(*two_days)
+    return cases
+
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], tolerance: float) -> bool:
+    """Print the change against the baseline and return False on a regression."""
+    ok = True
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"  {name}: new")
+            continue
+        ratio = result["min_us"] / baseline[name]["min_us"]
+        regressed = ratio > 1 + tolerance
+        ok = ok and not regressed
+        marker = "❌" if regressed else "✅"
+        print(f"  {marker} {name}: {ratio:.2f}x time, {result['peak_kib'] - baseline[name]['peak_kib']:+.1f} KiB peak")
+    return ok
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-r", "--rounds", type=int, default=50, help="timed calls per benchmark")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks containing this text")
+    parser.add_argument("-o", "--output", type=Path, help="save results as JSON")
+    parser.add_argument("-b", "--baseline", type=Path, help="compare with results saved earlier")
+    parser.add_argument("-t", "--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("-w", "--workers", type=int, default=PARSE_WORKERS, help="processes for parse_batch[pool]")
+    args = parser.parse_args()
+
+    results = {}
+    with create_parse_pool(args.workers) as pool:
+        for name, func in benchmarks(pool).items():
+            if args.filter in name:
+                results[name] = measure(func, args.rounds)
+                print(f"{name}: {results[name]['min_us']:.1f} µs min, {results[name]['peak_kib']:.1f} KiB peak")
+
+    if "parse_batch[serial]" in results and "parse_batch[pool]" in results:
+        serial, pooled = (1e6 * BATCH_SIZE / results[f"parse_batch[{kind}]"]["min_us"] for kind in ("serial", "pool"))
+        print(
+            f"\n⚡ Batch of {BATCH_SIZE} pages: {serial:.0f} pages/s serial, {pooled:.0f} pages/s with {args.workers} workers"
+        )
+
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "parser": PARSER_FEATURES,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\n💾 Saved to {args.output}")
+
+    if args.baseline:
+        print(f"\n📊 Compared with {args.baseline} (tolerance {args.tolerance:.0%}):")
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+BENCHMARK = Path(__file__).parents[1] / "scripts" / "benchmark.py"
+
+
+def test_benchmark_runner_completes(tmp_path: Path) -> None:
+    # Один виклик кожного випадку: ловить зміни сигнатур scrapper, яких не бачать інші тести
+    output = tmp_path / "benchmark.json"
+    result = subprocess.run(
+        [sys.executable, str(BENCHMARK), "-r", "1", "-w", "1", "-o", str(output)],
+        capture_output=True,
+        check=False,
+        text=True,
+        timeout=300,
+    )
+
+    assert result.returncode == 0, result.stderr
+    results = json.loads(output.read_text(encoding="utf-8"))["results"]
+    fixtures = sorted(path.stem for path in Path(__file__).parent.glob("*.html"))
+    assert [name for name in results if name.startswith("get_power_off_periods")] == [
+        f"get_power_off_periods[{stem}]" for stem in fixtures
+    ]
+    assert {"parse_batch[serial]", "parse_batch[pool]", "coordinator.next_poweroff"} <= set(results)
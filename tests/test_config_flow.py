@@ -0,0 +1,49 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from poltava_poweroff.const import (
+    CONF_GROUPS,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    POWEROFF_GROUP_CONF,
+    PowerOffGroup,
+)
+
+# ConfigFlowResult з'явився в HA 2024.4
+config_flow = pytest.importorskip("poltava_poweroff.config_flow", exc_type=ImportError)
+
+
+async def test_options_flow_reads_the_entry_it_was_created_for() -> None:
+    # Given an entry without options, on a Home Assistant that does not inject config_entry
+    entry = MagicMock(data={POWEROFF_GROUP_CONF: "2-1"}, options={})
+    flow = config_flow.PoltavaPowerOffConfigFlow.async_get_options_flow(entry)
+    flow.hass = MagicMock()
+
+    # When the form is shown
+    result = await flow.async_step_init()
+
+    # Then it defaults to the group of the entry
+    defaults = {str(key): key.default() for key in result["data_schema"].schema}
+    assert defaults[CONF_GROUPS] == ["2-1"]
+    assert defaults[CONF_MIN_UPDATE_INTERVAL] <= defaults[CONF_MAX_UPDATE_INTERVAL]
+
+
+@pytest.mark.parametrize("reachable", [True, False])
+async def test_flow_releases_the_hub_when_it_ends(reachable: bool) -> None:
+    # Given a flow that validated a group, successfully or not
+    hub = MagicMock()
+    hub.async_fetch_schedule = AsyncMock(return_value=MagicMock()) if reachable else AsyncMock(side_effect=OSError)
+    flow = config_flow.PoltavaPowerOffConfigFlow()
+    flow.hass = MagicMock()
+    with patch.object(config_flow, "async_get_hub", return_value=hub):
+        await flow.async_step_user({POWEROFF_GROUP_CONF: PowerOffGroup.TwoOne})
+        await flow.async_step_user({POWEROFF_GROUP_CONF: PowerOffGroup.TwoOne})
+
+    # Then the hub is kept for the entry while the flow lasts
+    hub.async_subscribe.assert_called_once_with(PowerOffGroup.TwoOne)
+    hub.async_subscribe.return_value.assert_not_called()
+
+    # And released once the flow is finished or aborted
+    flow.async_remove()
+    hub.async_subscribe.return_value.assert_called_once_with()
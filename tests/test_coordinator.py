@@ -0,0 +1,141 @@
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+from poltava_poweroff.const import POWEROFF_GROUP_CONF, STATE_OFF, STATE_ON, PowerOffGroup
+from poltava_poweroff.coordinator import PoltavaPowerOffCoordinator
+from poltava_poweroff.entities import PowerOffPeriod, PowerOffSchedule
+
+MIDNIGHT = dt_util.start_of_local_day(datetime(2025, 1, 15))
+GROUP = PowerOffGroup.TwoOne
+
+
+def at(hours: float, days: int = 0) -> datetime:
+    return MIDNIGHT + timedelta(days=days, hours=hours)
+
+
+class Timers:
+    """Stand-in for async_track_point_in_time that keeps the armed timers."""
+
+    def __init__(self) -> None:
+        self.armed: dict[datetime, Callable[[datetime], None]] = {}
+        self.cancelled: list[datetime] = []
+        self.calls = 0
+
+    def track(self, _hass: object, action: Callable[[datetime], None], moment: datetime) -> Callable[[], None]:
+        self.calls += 1
+        self.armed[moment] = action
+
+        def unsub() -> None:
+            self.cancelled.append(moment)
+            del self.armed[moment]
+
+        return unsub
+
+    def fire(self, moment: datetime) -> None:
+        # Таймер спрацьовує один раз і більше не скасовується
+        self.armed.pop(moment)(moment)
+
+
+@pytest.fixture
+def clock():
+    now = [at(5)]
+    with patch.object(dt_util, "now", side_effect=lambda *_args: now[0]):
+        yield now
+
+
+@pytest.fixture
+def timers():
+    timers = Timers()
+    with patch("poltava_poweroff.coordinator.async_track_point_in_time", timers.track):
+        yield timers
+
+
+@pytest.fixture
+def coordinator(clock, timers):
+    entry = MagicMock(entry_id="entry", data={POWEROFF_GROUP_CONF: GROUP}, options={})
+    hub = MagicMock()
+    hub.scraper.return_value.last_fetch = None
+    with patch("poltava_poweroff.coordinator.async_get_hub", return_value=hub):
+        coordinator = PoltavaPowerOffCoordinator(MagicMock(), entry)
+    with patch("poltava_poweroff.schedule.Store.async_delay_save"):
+        yield coordinator
+
+
+async def refresh(coordinator: PoltavaPowerOffCoordinator, today: list, tomorrow: list, digest: str) -> None:
+    coordinator.hub.async_fetch_schedules = AsyncMock(
+        return_value={GROUP: PowerOffSchedule(today, tomorrow, digest=digest)}
+    )
+    await coordinator._async_update_data()
+
+
+async def test_timers_are_armed_at_every_boundary_and_midnight(coordinator, timers) -> None:
+    # When a schedule with periods today and tomorrow is fetched at 5:00
+    await refresh(coordinator, [PowerOffPeriod(6, 8.5, today=True)], [PowerOffPeriod(22, 24, today=False)], "first")
+
+    # Then a timer is armed at every change of the power state and at the next midnight
+    assert set(timers.armed) == {at(6), at(8.5), at(0, days=1), at(22, days=1), at(0, days=2)}
+
+
+async def test_schedule_change_cancels_stale_timers_only(coordinator, timers) -> None:
+    # Given timers armed for the first schedule
+    await refresh(coordinator, [PowerOffPeriod(6, 8.5, today=True)], [], "first")
+    calls = timers.calls
+
+    # When the schedule changes and one of the periods moves
+    await refresh(coordinator, [PowerOffPeriod(6, 10, today=True)], [], "second")
+
+    # Then only the timer of the moment that is gone is cancelled, the others are kept
+    assert timers.cancelled == [at(8.5)]
+    assert set(timers.armed) == {at(6), at(10), at(0, days=1)}
+    assert timers.calls == calls + 1
+
+    # And an unchanged schedule does not touch the timers
+    await refresh(coordinator, [PowerOffPeriod(6, 10, today=True)], [], "second")
+    assert timers.calls == calls + 1
+    assert timers.cancelled == [at(8.5)]
+
+
+async def test_transition_notifies_listeners_without_fetching(coordinator, timers, clock) -> None:
+    # Given an entity listening to the coordinator before a power off
+    await refresh(coordinator, [PowerOffPeriod(6, 8.5, today=True)], [], "first")
+    fetches = coordinator.hub.async_fetch_schedules.await_count
+    assert coordinator.groups[GROUP].current_state == STATE_ON
+    states: list[str] = []
+    coordinator.async_add_listener(lambda: states.append(coordinator.groups[GROUP].current_state))
+
+    # When the power off starts
+    clock[0] = at(6)
+    timers.fire(at(6))
+
+    # Then the listener sees the new state and nothing is fetched
+    assert states == [STATE_OFF]
+    assert coordinator.now == at(6)
+    assert coordinator.groups[GROUP].now == at(6)
+    assert coordinator.hub.async_fetch_schedules.await_count == fetches
+    assert at(6) not in timers.armed
+
+
+async def test_midnight_arms_the_next_midnight(coordinator, timers, clock) -> None:
+    # Given the timers of a day without power offs
+    await refresh(coordinator, [], [], "empty")
+    assert set(timers.armed) == {at(0, days=1)}
+
+    # When midnight comes
+    clock[0] = at(0, days=1)
+    timers.fire(at(0, days=1))
+
+    # Then the timer for the following midnight is armed
+    assert set(timers.armed) == {at(0, days=2)}
+
+
+async def test_shutdown_cancels_timers(coordinator, timers) -> None:
+    await refresh(coordinator, [PowerOffPeriod(6, 8.5, today=True)], [], "first")
+
+    await coordinator.async_shutdown()
+
+    assert timers.armed == {}
+    assert sorted(timers.cancelled) == [at(6), at(8.5), at(0, days=1)]
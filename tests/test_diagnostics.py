@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from homeassistant.util import dt as dt_util
+
+from poltava_poweroff.const import PowerOffGroup
+from poltava_poweroff.coordinator import GroupRefresh, RefreshRecord
+from poltava_poweroff.diagnostics import _aggregates, _refresh_diagnostics
+from poltava_poweroff.energyua_scrapper import FetchRecord
+from poltava_poweroff.transport import FetchTrace
+
+AT = dt_util.as_local(datetime(2025, 1, 15, 9))
+
+
+def fetched(wait: float, parse_time: float | None = None, challenge: bool = False) -> GroupRefresh:
+    trace = FetchTrace(wait=wait, transfer=wait / 10, size=120_000, content_encoding="br", charset="utf-8")
+    fetch = FetchRecord(
+        started=0,
+        transport="aiohttp",
+        status=200,
+        trace=trace,
+        challenge=challenge,
+        outcome="unchanged" if parse_time is None else "parsed",
+        parse_time=parse_time,
+    )
+    return GroupRefresh(fetch=fetch, changed=parse_time is not None)
+
+
+def test_refresh_record_is_flattened() -> None:
+    record = RefreshRecord(AT, duration=0.5, groups={PowerOffGroup.OneOne: fetched(0.4, 0.05, challenge=True)})
+
+    assert _refresh_diagnostics(record) == {
+        "at": AT.isoformat(),
+        "duration": 0.5,
+        "error": None,
+        "groups": {
+            PowerOffGroup.OneOne: {
+                "shared": False,
+                "changed": True,
+                "error": None,
+                "transport": "aiohttp",
+                "status": 200,
+                "challenge": True,
+                "queue_wait": 0.0,
+                "outcome": "parsed",
+                "parser": None,
+                "parse_time": 0.05,
+                "today_periods": None,
+                "tomorrow_periods": None,
+                "dns": None,
+                "connect": None,
+                "wait": 0.4,
+                "transfer": 0.04,
+                "size": 120_000,
+                "content_encoding": "br",
+                "charset": "utf-8",
+            }
+        },
+    }
+
+
+def test_aggregates_skip_shared_fetches_and_failures() -> None:
+    history = [
+        RefreshRecord(AT, duration=float(index), groups={PowerOffGroup.OneOne: fetched(index / 10, index / 100)})
+        for index in range(1, 21)
+    ]
+    # Результат, отриманий від іншого запису, не враховується у часах завантаження
+    history.append(
+        RefreshRecord(AT, duration=0.0, groups={PowerOffGroup.OneOne: GroupRefresh(fetched(99).fetch, shared=True)})
+    )
+    history.append(RefreshRecord(AT, error="ConnectionError()"))
+
+    aggregates = _aggregates(history)
+
+    assert aggregates["refresh"] == {"count": 21, "min": 0.0, "p50": 10.0, "p95": 19.0, "max": 20.0}
+    assert aggregates["wait"] == {"count": 20, "min": 0.1, "p50": 1.0, "p95": 1.9, "max": 2.0}
+    assert aggregates["parse"]["max"] == 0.2
+    assert aggregates["dns"] is None
+    assert aggregates["failed"] == 1
+    assert aggregates["challenges"] == 0
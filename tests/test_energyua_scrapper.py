@@ -1,12 +1,18 @@
+from datetime import timedelta
 from pathlib import Path
+import tracemalloc
 from unittest.mock import patch
 
 import pytest
+from bs4 import BeautifulSoup
 
 from poltava_poweroff.energyua_scrapper import EnergyUaScrapper
 from poltava_poweroff.entities import PowerOffPeriod
 
 
+ALL_PAGES = sorted(path.name for path in Path(__file__).parent.glob("*.html"))
+
+
 def load_energyua_page(test_page: str) -> str:
     test_file = Path(__file__).parent / test_page
 
@@ -76,7 +82,10 @@ async def test_energyua_scrapper(group, test_page, expected_today, expected_tomo
         {
             "text": html_content,
             "status_code": 200,
+            "headers": {},
             "content": html_content.encode("utf-8"),
+            "encoding": "utf-8",
+            "elapsed": timedelta(milliseconds=120),
         },
     )()
 
@@ -84,7 +93,7 @@ async def test_energyua_scrapper(group, test_page, expected_today, expected_tomo
     def mock_get(*args, **kwargs):
         return mock_response
 
-    with patch("poltava_poweroff.energyua_scrapper.cloudscraper.create_scraper") as mock_create_scraper:
+    with patch("cloudscraper.create_scraper") as mock_create_scraper:
         mock_scraper = type(
             "MockScraper",
             (),
@@ -105,3 +114,77 @@ async def test_energyua_scrapper(group, test_page, expected_today, expected_tomo
     assert len(tomorrow_periods) == len(expected_tomorrow)
     assert today_periods == expected_today
     assert tomorrow_periods == expected_tomorrow
+
+
+@pytest.mark.parametrize("test_page", ALL_PAGES)
+def test_strained_parse_matches_full_tree(test_page) -> None:
+    # Given any saved EnergyUa page
+    html_content = load_energyua_page(test_page)
+
+    # When it is parsed with the schedule strainer and as a full tree
+    strained = EnergyUaScrapper.parse_power_off_periods(html_content)
+    full_tree = EnergyUaScrapper._extract_periods(BeautifulSoup(html_content, "html.parser"))
+
+    # Then both produce the same periods
+    assert strained == full_tree
+
+
+def iter_chunks(content: str, size: int):
+    for offset in range(0, len(content), size):
+        yield content[offset : offset + size]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 97, 8192])
+@pytest.mark.parametrize("test_page", ALL_PAGES)
+def test_stream_parse_matches_tree_parse(test_page, chunk_size) -> None:
+    # Given any saved EnergyUa page split into chunks
+    html_content = load_energyua_page(test_page)
+
+    # When the chunks are fed to the streaming parser
+    streamed = EnergyUaScrapper.parse_power_off_periods_stream(iter_chunks(html_content, chunk_size))
+
+    # Then it finds the same periods as the tree parser
+    assert streamed == EnergyUaScrapper.parse_power_off_periods(html_content)
+
+
+def test_stream_parse_memory_is_flat() -> None:
+    # Given the same page padded with 100 KB and with 2 MB of irrelevant markup
+    html_content = load_energyua_page("energyua_12_page.html")
+    padding = "<p>" + "x" * 1000 + "</p>"
+    small = html_content.replace("</body>", padding * 100 + "</body>")
+    large = html_content.replace("</body>", padding * 2_000 + "</body>")
+
+    def peak_memory(content: str) -> int:
+        chunks = iter_chunks(content, 8192)
+        tracemalloc.start()
+        try:
+            EnergyUaScrapper.parse_power_off_periods_stream(chunks)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    # Then the streaming parser peak memory does not grow with the page
+    assert peak_memory(large) < peak_memory(small) * 1.5
+
+
+def test_batch_parse_in_processes_matches_serial_parse() -> None:
+    # Given all saved pages, some of them as bytes
+    pages = [load_energyua_page(test_page) for test_page in ALL_PAGES]
+    pages[0] = pages[0].encode()
+
+    # When they are parsed as a batch in worker processes
+    batch = EnergyUaScrapper.parse_power_off_periods_batch(pages, workers=2)
+
+    # Then every page gives the same periods, in order, as the serial parse
+    assert batch == [EnergyUaScrapper.parse_power_off_periods(page) for page in pages]
+
+
+@pytest.mark.parametrize("test_page", ALL_PAGES)
+def test_schedule_blocks_are_recognized(test_page) -> None:
+    # Сторінка без відключень теж містить блоки графіка
+    assert EnergyUaScrapper.has_schedule_blocks(load_energyua_page(test_page))
+
+
+def test_pages_without_schedule_are_not_recognized() -> None:
+    assert not EnergyUaScrapper.has_schedule_blocks("<html><title>Just a moment...</title></html>")
+    assert not EnergyUaScrapper.has_schedule_blocks('<div class="scale_hours_legend">502 Bad Gateway</div>')
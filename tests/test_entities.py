@@ -0,0 +1,83 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from poltava_poweroff.energyua_scrapper import EnergyUaScrapper
+from poltava_poweroff.entities import MINUTES_PER_DAY, DaySchedule, PowerOffPeriod
+
+ALL_PAGES = sorted(Path(__file__).parent.glob("*.html"))
+
+
+@pytest.mark.parametrize("test_page", ALL_PAGES, ids=lambda path: path.name)
+def test_day_schedule_round_trips_parsed_periods(test_page) -> None:
+    # Given the merged periods parsed from a saved page
+    today, tomorrow = EnergyUaScrapper.parse_power_off_periods(test_page.read_text(encoding="utf-8"))
+
+    # Then converting them to a bitmap and back gives the same periods
+    assert DaySchedule.from_periods(today).to_periods(today=True) == today
+    assert DaySchedule.from_periods(tomorrow).to_periods(today=False) == tomorrow
+
+
+def test_period_stores_whole_minutes_and_midnight_end() -> None:
+    period = PowerOffPeriod(22.5, 0.0, today=True)
+    assert (period.start_minute, period.end_minute) == (22 * 60 + 30, MINUTES_PER_DAY)
+    assert (period.start, period.end) == (22.5, 0.0)
+    assert PowerOffPeriod.from_minutes(1350, MINUTES_PER_DAY, today=True) == period
+
+
+def test_merge_periods_merges_overlapping_and_adjacent_without_mutation() -> None:
+    periods = [
+        PowerOffPeriod(12, 14, today=True),
+        PowerOffPeriod(6, 8, today=True),
+        PowerOffPeriod(7.5, 9, today=True),
+        PowerOffPeriod(14, 15.5, today=True),
+        PowerOffPeriod(22, 0.0, today=True),
+        PowerOffPeriod(23, 0.0, today=True),
+    ]
+    # Копія списку містила б ті самі об'єкти, тому запам'ятовуємо значення
+    original = [(period.start_minute, period.end_minute, period.today) for period in periods]
+
+    assert EnergyUaScrapper.merge_periods(periods) == [
+        PowerOffPeriod(6, 9, today=True),
+        PowerOffPeriod(12, 15.5, today=True),
+        PowerOffPeriod(22, 0.0, today=True),
+    ]
+    assert [(period.start_minute, period.end_minute, period.today) for period in periods] == original
+    assert [period.start for period in periods] == [12, 6, 7.5, 14, 22, 23]
+
+
+def test_period_crossing_midnight_keeps_its_next_day_end() -> None:
+    # Given a period from 22:00 till 02:00 of the next day
+    period = PowerOffPeriod(22, 2, today=True)
+    assert (period.start_minute, period.end_minute) == (22 * 60, MINUTES_PER_DAY + 2 * 60)
+    assert (period.start, period.end) == (22, 2)
+
+    # Then merging keeps the minutes after midnight and joins the periods it overlaps
+    assert EnergyUaScrapper.merge_periods([period]) == [period]
+    assert EnergyUaScrapper.merge_periods([PowerOffPeriod(20, 22.5, today=True), period]) == [
+        PowerOffPeriod(20, 2, today=True)
+    ]
+    assert DaySchedule.from_periods([period]).off_minutes == 4 * 60
+
+    # And the datetime period ends on the next day
+    now = datetime(2025, 1, 15, 12)
+    assert period.to_datetime_period(now) == (datetime(2025, 1, 15, 22), datetime(2025, 1, 16, 2))
+    assert PowerOffPeriod(22, 2, today=False).to_datetime_period(now) == (
+        datetime(2025, 1, 16, 22),
+        datetime(2025, 1, 17, 2),
+    )
+
+
+def test_day_schedule_queries() -> None:
+    day = DaySchedule.from_periods([PowerOffPeriod(6, 8.5, today=True), PowerOffPeriod(23, 0.0, today=True)])
+
+    assert day.off_minutes == 150 + 60
+    assert day.is_off(6 * 60)
+    assert not day.is_off(8 * 60 + 30)
+    assert day.is_off_at(datetime(2025, 1, 15, 23, 59))
+    assert day.has_off_from(22 * 60)
+    assert not day.has_off_from(MINUTES_PER_DAY)
+    assert day.overlaps(PowerOffPeriod(8, 9, today=True))
+    assert not day.overlaps(DaySchedule.from_periods([PowerOffPeriod(9, 23, today=True)]))
+    assert not DaySchedule()
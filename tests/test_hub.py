@@ -0,0 +1,264 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from aiohttp import ClientSession, TCPConnector, web
+from aiohttp.test_utils import TestServer
+import pytest
+
+from poltava_poweroff.const import DOMAIN, HANDOFF_TTL, RATE_LIMITER_KEY, PowerOffGroup
+from poltava_poweroff.energyua_scrapper import EnergyUaScrapper, UnparsedPage
+from poltava_poweroff.entities import PowerOffSchedule
+from poltava_poweroff.hub import PoltavaPowerOffHub
+from poltava_poweroff.ratelimit import FetchPriority, TokenBucket
+
+
+def make_hub(ttl: float = 30, parse_workers: int = 1) -> PoltavaPowerOffHub:
+    loop = asyncio.get_running_loop()
+    hass = SimpleNamespace(
+        data={},
+        async_create_task=lambda coro, name=None: loop.create_task(coro, name=name),
+        async_add_executor_job=lambda target, *args: loop.run_in_executor(None, target, *args),
+    )
+    with patch("poltava_poweroff.hub.async_create_clientsession", return_value=MagicMock()):
+        return PoltavaPowerOffHub(hass, ttl=ttl, parse_workers=parse_workers)
+
+
+@pytest.fixture
+def fetches():
+    calls: list[PowerOffGroup] = []
+
+    async def fetch_page(self: EnergyUaScrapper, _priority: FetchPriority) -> PowerOffSchedule:
+        calls.append(self.group)
+        await asyncio.sleep(0.01)
+        return PowerOffSchedule([], [], digest=f"{self.group}-{len(calls)}")
+
+    with patch.object(EnergyUaScrapper, "fetch_page", fetch_page):
+        yield calls
+
+
+async def test_concurrent_requests_share_one_fetch(fetches) -> None:
+    hub = make_hub()
+    results = await asyncio.gather(*(hub.async_fetch_schedule(PowerOffGroup.OneOne) for _ in range(5)))
+    assert fetches == [PowerOffGroup.OneOne]
+    assert len({result.digest for result in results}) == 1
+    assert hub.stats.merged == 4
+
+
+async def test_fresh_result_is_served_from_memory(fetches) -> None:
+    hub = make_hub()
+    first = await hub.async_fetch_schedule(PowerOffGroup.OneOne)
+    assert await hub.async_fetch_schedule(PowerOffGroup.OneOne) is first
+    assert hub.stats.memory_hits == 1
+    # max_age=0 змушує завантажити заново
+    assert (await hub.async_fetch_schedule(PowerOffGroup.OneOne, max_age=0)).digest != first.digest
+    assert len(fetches) == 2
+
+
+async def test_groups_are_fetched_separately(fetches) -> None:
+    hub = make_hub()
+    await asyncio.gather(hub.async_fetch_schedule(PowerOffGroup.OneOne), hub.async_fetch_schedule(PowerOffGroup.OneTwo))
+    assert sorted(fetches) == [PowerOffGroup.OneOne, PowerOffGroup.OneTwo]
+    assert hub.scraper(PowerOffGroup.OneOne).transports == hub.scraper(PowerOffGroup.OneTwo).transports
+
+
+async def test_last_unsubscribe_drops_group_state(fetches) -> None:
+    hub = make_hub()
+    hub.hass.data[DOMAIN] = hub
+    other = hub.async_subscribe(PowerOffGroup.TwoOne)
+    unsubscribes = [hub.async_subscribe(PowerOffGroup.OneOne) for _ in range(2)]
+    await hub.async_fetch_schedule(PowerOffGroup.OneOne)
+    unsubscribes[0]()
+    await hub.async_fetch_schedule(PowerOffGroup.OneOne)
+    assert len(fetches) == 1
+    unsubscribes[1]()
+    await hub.async_fetch_schedule(PowerOffGroup.OneOne)
+    assert len(fetches) == 2
+
+    # Останній підписник будь-якої групи зупиняє hub
+    other()
+    assert DOMAIN not in hub.hass.data
+    await asyncio.sleep(0)
+    hub._session.detach.assert_called_once()
+
+
+async def test_batch_is_fetched_with_bounded_concurrency_and_parsed_together() -> None:
+    hub = make_hub()
+    page = (Path(__file__).parent / "energyua_2_days.html").read_text(encoding="utf-8")
+    expected = EnergyUaScrapper.parse_power_off_periods(page)
+    running = peak = 0
+
+    async def fetch_page(self: EnergyUaScrapper, _priority: FetchPriority) -> UnparsedPage | PowerOffSchedule:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if self.group == PowerOffGroup.OneOne:
+            raise ConnectionError("offline")
+        return UnparsedPage(page, digest=str(self.group), date="2025-01-15")
+
+    with (
+        patch.object(EnergyUaScrapper, "fetch_page", fetch_page),
+        patch("poltava_poweroff.hub.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread,
+    ):
+        results = await hub.async_fetch_schedules(list(PowerOffGroup), concurrency=3)
+
+    assert peak == 3
+    assert to_thread.call_count == 1
+    assert isinstance(results.pop(PowerOffGroup.OneOne), ConnectionError)
+    assert len(results) == len(PowerOffGroup) - 1
+    assert all((result.today, result.tomorrow) == expected for result in results.values())
+    assert hub.scraper(PowerOffGroup.TwoOne).stats.parsed == 1
+
+
+async def test_batch_is_parsed_in_worker_processes() -> None:
+    hub = make_hub(parse_workers=2)
+    page = (Path(__file__).parent / "energyua_2_days.html").read_text(encoding="utf-8")
+
+    async def fetch_page(self: EnergyUaScrapper, _priority: FetchPriority) -> UnparsedPage:
+        return UnparsedPage(page, digest=str(self.group), date="2025-01-15")
+
+    try:
+        with patch.object(EnergyUaScrapper, "fetch_page", fetch_page):
+            results = await hub.async_fetch_schedules([PowerOffGroup.OneOne, PowerOffGroup.OneTwo])
+    finally:
+        await hub.async_shutdown()
+
+    expected = EnergyUaScrapper.parse_power_off_periods(page)
+    assert all((result.today, result.tomorrow) == expected for result in results.values())
+
+
+async def test_handed_off_schedule_serves_first_request_once(fetches) -> None:
+    hub = make_hub()
+    validated = PowerOffSchedule([], [], digest="validated")
+    hub.async_hand_off(PowerOffGroup.OneOne, validated)
+
+    # Перший запит отримує розклад навіть із max_age=0, наступний завантажує
+    assert await hub.async_fetch_schedule(PowerOffGroup.OneOne, max_age=0) is validated
+    assert fetches == []
+    assert (await hub.async_fetch_schedule(PowerOffGroup.OneOne, max_age=0)).digest != "validated"
+
+    # А застарілий розклад ігнорується
+    hub._handoffs[PowerOffGroup.TwoOne] = (time.monotonic() - HANDOFF_TTL - 1, validated)
+    assert (await hub.async_fetch_schedule(PowerOffGroup.TwoOne)).digest != "validated"
+
+
+async def test_warm_up_restores_session_before_first_batch(fetches) -> None:
+    hub = make_hub()
+    state = {"headers": {"User-Agent": "Chrome"}, "cookies": [{"name": "cf_clearance", "expires": time.time() + 60}]}
+    store = MagicMock(async_load=AsyncMock(return_value=state))
+    started = asyncio.Event()
+
+    async def async_start(state: dict) -> None:
+        # Довше за завантаження, тож без очікування прогріву пакет завершився б раніше
+        await asyncio.sleep(0.05)
+        started.set()
+
+    with (
+        patch("poltava_poweroff.hub.Store", return_value=store),
+        patch.object(hub._cloudscraper, "async_start", side_effect=async_start) as start,
+    ):
+        hub.async_start_warm_up()
+        hub.async_start_warm_up()
+        await hub.async_fetch_schedule(PowerOffGroup.OneOne)
+
+    # Перше завантаження чекає на відновлену сесію, прогрів виконується один раз
+    assert started.is_set()
+    start.assert_awaited_once_with(state)
+    # А змінені cookies зберігаються у те саме сховище
+    hub._cloudscraper.on_session_change(state)
+    store.async_delay_save.assert_called_once()
+    assert store.async_delay_save.call_args.args[0]() is state
+
+
+def open_sockets() -> int:
+    count = 0
+    for fd in Path("/proc/self/fd").iterdir():
+        try:
+            count += os.readlink(fd).startswith("socket:")
+        except OSError:
+            # Дескриптор закрито під час обходу
+            continue
+    return count
+
+
+@pytest.mark.skipif(not Path("/proc/self/fd").is_dir(), reason="needs /proc")
+async def test_reload_cycles_release_threads_and_sockets() -> None:
+    # Given a website that challenges plain clients and never answers group 1-2
+    page = (Path(__file__).parent / "energyua_2_days.html").read_text(encoding="utf-8")
+
+    async def handle(request: web.Request) -> web.Response:
+        if "Chrome" not in request.headers.get("User-Agent", ""):
+            return web.Response(status=403, text="<script src='/cdn-cgi/challenge-platform/'></script>")
+        if request.match_info["group"] == "1-2":
+            await asyncio.sleep(5)
+        return web.Response(text=page, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/cherga/{group}", handle)
+    server = TestServer(app)
+    await server.start_server()
+    loop = asyncio.get_running_loop()
+    # Потоки executor створюються за потребою, тому заповнюємо його одразу
+    workers = 8
+    loop.set_default_executor(ThreadPoolExecutor(workers))
+
+    async def occupy_all_workers() -> None:
+        # Бар'єр пройде лише тоді, коли жоден потік не зайнятий завислим запитом
+        barrier = threading.Barrier(workers)
+        await asyncio.wait_for(asyncio.gather(*(asyncio.to_thread(barrier.wait) for _ in range(workers))), 2)
+
+    hass = SimpleNamespace(
+        # Сервер щоразу відповідає викликом, тож звичайне обмеження сповільнило б цикли до хвилин
+        data={RATE_LIMITER_KEY: TokenBucket(rate=1000, burst=1000, min_rate=1000)},
+        async_create_task=lambda coro, name=None: loop.create_task(coro, name=name),
+        async_add_executor_job=lambda target, *args: loop.run_in_executor(None, target, *args),
+    )
+
+    # Hub тримаються, щоб незакриті сесії не прибрав збирач сміття
+    hubs: list[PoltavaPowerOffHub] = []
+    # Як у Home Assistant, сесії hub користуються спільним connector
+    connector = TCPConnector()
+
+    async def reload_cycle() -> None:
+        # Запис підписується, завантажує групи та вивантажується посеред завантаження
+        with patch(
+            "poltava_poweroff.hub.async_create_clientsession",
+            side_effect=lambda _hass, **kwargs: ClientSession(
+                connector=connector, connector_owner=False, trace_configs=kwargs["trace_configs"]
+            ),
+        ):
+            hub = PoltavaPowerOffHub(hass, parse_workers=1, read_timeout=0.3)
+        hubs.append(hub)
+        unsubscribes = [hub.async_subscribe(group) for group in (PowerOffGroup.OneOne, PowerOffGroup.OneTwo)]
+        await hub.async_fetch_schedule(PowerOffGroup.OneOne)
+        hanging = loop.create_task(hub.async_fetch_schedule(PowerOffGroup.OneTwo))
+        await asyncio.sleep(0.1)
+        for unsubscribe in unsubscribes:
+            unsubscribe()
+        await hub.async_shutdown()
+        with pytest.raises(asyncio.CancelledError):
+            await hanging
+        # Потік скасованого запиту cloudscraper завершується за read timeout
+        await asyncio.sleep(0.5)
+
+    try:
+        with patch("poltava_poweroff.energyua_scrapper.URL", f"{server.make_url('/cherga/')}{{}}"):
+            await occupy_all_workers()
+            await reload_cycle()
+            threads, sockets = threading.active_count(), open_sockets()
+            for _ in range(3):
+                await reload_cycle()
+            # Then repeated reloads do not leave threads, busy workers or connections behind
+            await occupy_all_workers()
+            assert threading.active_count() <= threads
+            assert open_sockets() <= sockets
+    finally:
+        await connector.close()
+        await server.close()
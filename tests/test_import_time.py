@@ -0,0 +1,55 @@
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+# Модулі, які Home Assistant уже імпортував, коли завантажує інтеграцію
+HOME_ASSISTANT_MODULES = (
+    "homeassistant.components.calendar",
+    "homeassistant.components.sensor",
+    "homeassistant.components.websocket_api",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.dispatcher",
+    "homeassistant.helpers.entity_registry",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+)
+# Імпортуються лише при першому завантаженні чи розборі сторінки
+LAZY_MODULES = ("bs4", "cloudscraper", "lxml", "requests_toolbelt", "cProfile")
+IMPORT_TIME_BUDGET = 0.1  # секунд, власні модулі інтеграції без Home Assistant
+RUNS = 3
+
+
+def import_integration() -> tuple[float, list[str]]:
+    """Import the integration in a fresh interpreter, returning its import time and the lazy modules loaded."""
+    script = (
+        f"import sys, {', '.join(HOME_ASSISTANT_MODULES)}\n"
+        "import poltava_poweroff\n"
+        f"print(','.join(name for name in {LAZY_MODULES!r} if name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": str(Path(__file__).parents[1] / "custom_components")},
+        text=True,
+    )
+    # Рядок "import time: self | cumulative | poltava_poweroff", час у мікросекундах
+    cumulative = next(
+        int(line.split("|")[1]) for line in result.stderr.splitlines() if line.endswith("| poltava_poweroff")
+    )
+    return cumulative / 1e6, [name for name in result.stdout.strip().split(",") if name]
+
+
+def test_heavy_dependencies_are_imported_lazily() -> None:
+    _, loaded = import_integration()
+    assert loaded == []
+
+
+def test_import_time_budget() -> None:
+    # Найкращий з кількох запусків, щоб навантаження машини не давало хибних падінь
+    best = min(import_integration()[0] for _ in range(RUNS))
+    assert best < IMPORT_TIME_BUDGET, f"poltava_poweroff imports in {best * 1000:.0f} ms"
@@ -0,0 +1,39 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from poltava_poweroff import async_setup_entry
+
+
+def make_coordinator(restored: bool) -> MagicMock:
+    coordinator = MagicMock(groups={"2-1": MagicMock()})
+    coordinator.async_restore_schedule = AsyncMock(return_value=restored)
+    coordinator.async_config_entry_first_refresh = AsyncMock()
+    coordinator.async_refresh = AsyncMock()
+    return coordinator
+
+
+@pytest.mark.parametrize("restored", [True, False])
+async def test_restored_schedule_skips_the_blocking_first_refresh(restored: bool) -> None:
+    # Given an entry whose schedule was saved before the restart, or not
+    hass = MagicMock()
+    hass.config_entries.async_forward_entry_setups = AsyncMock()
+    entry = MagicMock(entry_id="entry")
+    coordinator = make_coordinator(restored)
+
+    # When it is set up
+    with patch("poltava_poweroff.PoltavaPowerOffCoordinator", return_value=coordinator):
+        assert await async_setup_entry(hass, entry)
+
+    # Then a restored entry refreshes in the background, otherwise setup waits for the first refresh
+    background = entry.async_create_background_task.call_args_list
+    if restored:
+        coordinator.async_config_entry_first_refresh.assert_not_awaited()
+        assert len(background) == 1
+        await background[0].args[1]
+        coordinator.async_refresh.assert_awaited_once()
+    else:
+        coordinator.async_config_entry_first_refresh.assert_awaited_once()
+        assert background == []
+    assert entry.runtime_data is coordinator
+    hass.config_entries.async_forward_entry_setups.assert_awaited_once()
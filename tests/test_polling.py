@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from poltava_poweroff.polling import AdaptivePollingPolicy
+
+MORNING = datetime(2026, 1, 19, 9, 0)
+EVENING = datetime(2026, 1, 19, 19, 0)
+
+
+@pytest.fixture
+def policy() -> AdaptivePollingPolicy:
+    policy = AdaptivePollingPolicy(min_interval=60, max_interval=1800, interval=300)
+    policy.JITTER = 0
+    return policy
+
+
+def test_polls_fast_after_change(policy) -> None:
+    assert policy.on_success(changed=True, has_tomorrow=True, now=MORNING) == timedelta(seconds=60)
+
+
+def test_slows_down_while_unchanged(policy) -> None:
+    intervals = [policy.on_success(changed=False, has_tomorrow=True, now=MORNING).total_seconds() for _ in range(8)]
+
+    assert intervals[:3] == [300, 450, 675]
+    assert intervals[-1] == 1800
+
+
+def test_polls_fast_while_tomorrow_is_missing_in_the_evening(policy) -> None:
+    assert policy.on_success(changed=False, has_tomorrow=False, now=EVENING) == timedelta(seconds=60)
+    assert policy.on_success(changed=False, has_tomorrow=False, now=MORNING) > timedelta(seconds=60)
+
+
+def test_backs_off_on_failures(policy) -> None:
+    intervals = [policy.on_failure(MORNING).total_seconds() for _ in range(4)]
+
+    assert intervals == [600, 1200, 1800, 1800]
+    policy.on_success(changed=False, has_tomorrow=True, now=MORNING)
+    assert policy.failures == 0
+
+
+def test_jitter_stays_within_bounds() -> None:
+    policy = AdaptivePollingPolicy(min_interval=60, max_interval=600, interval=300)
+
+    for _ in range(100):
+        interval = policy.on_success(changed=True, has_tomorrow=True, now=MORNING).total_seconds()
+        assert 60 <= interval <= 66
@@ -0,0 +1,63 @@
+import asyncio
+from pathlib import Path
+import pstats
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from poltava_poweroff.const import PROFILE_DIRECTORY, PowerOffGroup
+from poltava_poweroff.energyua_scrapper import EnergyUaScrapper
+from poltava_poweroff.profiler import async_profile_refreshes
+
+PAGE = (Path(__file__).parent / "energyua_2_days.html").read_text(encoding="utf-8")
+
+
+def make_hass(config_dir: Path) -> SimpleNamespace:
+    loop = asyncio.get_running_loop()
+    return SimpleNamespace(
+        loop=loop,
+        config=SimpleNamespace(path=lambda *parts: str(config_dir.joinpath(*parts))),
+        async_add_executor_job=lambda target, *args: loop.run_in_executor(None, target, *args),
+    )
+
+
+@patch("poltava_poweroff.profiler.SAMPLING_PROFILER", False)
+async def test_offline_profile_fetches_once_and_saves_pstats(tmp_path: Path) -> None:
+    # Given a group without a saved page
+    hass = make_hass(tmp_path)
+    scraper = EnergyUaScrapper(PowerOffGroup.OneOne, transports=[])
+    scraper.fetch_text = AsyncMock(return_value=PAGE)
+
+    # When it is profiled offline twice
+    first = await async_profile_refreshes(hass, scraper, cycles=3, offline=True, top=5)
+    second = await async_profile_refreshes(hass, scraper, cycles=2, offline=True, top=5)
+
+    # Then the page is fetched once, outside the profile, and reused from the config directory
+    assert scraper.fetch_text.await_count == 1
+    assert (tmp_path / PROFILE_DIRECTORY / "page-1-1.html").read_text(encoding="utf-8") == PAGE
+    assert first["profiler"] == "cProfile"
+    assert (first["cycles"], second["cycles"]) == (3, 2)
+    assert len(first["hot_functions"]) == 5
+    assert first["hot_functions"][0]["self"] >= first["hot_functions"][-1]["self"]
+
+    # А збережений профіль містить розбір сторінки кожного циклу
+    stats = pstats.Stats(first["file"])
+    parse_calls = [
+        calls
+        for (_, _, function), (_, calls, *_) in stats.stats.items()  # type: ignore[attr-defined]
+        if function == "parse_page"
+    ]
+    assert parse_calls == [3]
+
+
+@patch("poltava_poweroff.profiler.SAMPLING_PROFILER", False)
+async def test_network_profile_fetches_every_cycle(tmp_path: Path) -> None:
+    hass = make_hass(tmp_path)
+    scraper = EnergyUaScrapper(PowerOffGroup.TwoOne, transports=[])
+    scraper.fetch_text = AsyncMock(return_value=PAGE)
+
+    result = await async_profile_refreshes(hass, scraper, cycles=4, offline=False, top=3)
+
+    # Мережеві завантаження виконуються в event loop, профіль чекає на кожне
+    assert scraper.fetch_text.await_count == 4
+    assert Path(result["file"]).suffix == ".pstats"
+    assert result["cycle_mean"] == result["duration"] / 4
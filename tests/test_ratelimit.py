@@ -0,0 +1,152 @@
+import asyncio
+from pathlib import Path
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from poltava_poweroff.const import PowerOffGroup
+from poltava_poweroff.energyua_scrapper import EnergyUaScrapper, UnrecognizedPageError
+from poltava_poweroff.ratelimit import RECOVERY_STEP, FetchPriority, TokenBucket, retry_after
+from poltava_poweroff.transport import ChallengeError, FetchResponse, FetchTrace
+
+
+async def test_burst_then_rate() -> None:
+    # Given a bucket of two tokens refilled 20 times per second
+    bucket = TokenBucket(rate=20, burst=2)
+
+    # When three requests come at once
+    waits = [await bucket.acquire() for _ in range(3)]
+
+    # Then the burst passes at once and the third one waits for a token
+    assert waits[:2] == [0.0, 0.0]
+    assert 0.03 < waits[2] < 0.2
+    assert (bucket.stats.acquired, bucket.stats.queued) == (3, 1)
+
+
+async def test_interactive_requests_go_first() -> None:
+    # Given an empty bucket with background requests already queued
+    bucket = TokenBucket(rate=20, burst=1)
+    await bucket.acquire()
+    order: list[str] = []
+
+    async def request(name: str, priority: FetchPriority) -> None:
+        await bucket.acquire(priority)
+        order.append(name)
+
+    background = [asyncio.create_task(request(f"poll {i}", FetchPriority.BACKGROUND)) for i in range(2)]
+    await asyncio.sleep(0)
+
+    # When an interactive request comes after them
+    await asyncio.gather(*background, request("refresh", FetchPriority.INTERACTIVE))
+
+    # Then it gets the next token, the background ones keep their order
+    assert order == ["refresh", "poll 0", "poll 1"]
+
+
+async def test_cancelled_request_leaves_its_place() -> None:
+    # Given a request queued for a token
+    bucket = TokenBucket(rate=20, burst=1)
+    await bucket.acquire()
+    queued = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+
+    # When it is cancelled
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+
+    # Then the next request gets the token without waiting for it
+    assert await asyncio.wait_for(bucket.acquire(), 0.2) < 0.1
+
+
+async def test_throttling_slows_down_and_recovers() -> None:
+    # Given a bucket at its normal rate
+    bucket = TokenBucket(rate=10, burst=4, min_rate=1)
+
+    # When the website answers 429 with Retry-After and then throttles twice more
+    bucket.on_response(429, {"Retry-After": "0"})
+    bucket.on_response(503, {})
+    bucket.on_response(200, {}, challenge=True)
+
+    # Then the rate halves every time, down to the minimum, and the burst is spent
+    assert bucket.rate == 1.25
+    assert bucket.stats.slowdowns == 3
+    started = time.monotonic()
+    await bucket.acquire()
+    assert time.monotonic() - started > 0.5
+
+    # And successful responses bring the rate back step by step
+    for _ in range(3):
+        bucket.on_response(200, {})
+    assert bucket.rate == pytest.approx(1.25 + 3 * 10 * RECOVERY_STEP)
+    for _ in range(10):
+        bucket.on_response(304, {})
+    assert bucket.rate == 10
+
+
+async def test_retry_after_pauses_requests() -> None:
+    bucket = TokenBucket(rate=100, burst=4)
+    bucket.slow_down(0.2)
+
+    assert await bucket.acquire(FetchPriority.INTERACTIVE) >= 0.2
+    assert retry_after({"Retry-After": "120"}) == 120
+    assert retry_after({"Retry-After": "86400"}) == 600
+    assert retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) is None
+    assert retry_after({}) is None
+
+
+async def test_scraper_reports_queue_wait_and_throttling() -> None:
+    # Given a website that challenges the first transport and throttles the second one
+    async def challenge(_url: str, _headers: dict[str, str]) -> FetchResponse:
+        raise ChallengeError("challenge")
+
+    async def throttle(_url: str, _headers: dict[str, str]) -> FetchResponse:
+        return FetchResponse(429, "Too Many Requests", {"Retry-After": "0"}, "throttled")
+
+    bucket = TokenBucket(rate=20, burst=1)
+    transports = [
+        SimpleNamespace(name="challenged", fetch=challenge),
+        SimpleNamespace(name="throttled", fetch=throttle),
+    ]
+    scrapper = EnergyUaScrapper(PowerOffGroup.OneOne, transports=transports, rate_limiter=bucket)
+
+    # When the page is fetched
+    with pytest.raises(UnrecognizedPageError):
+        await scrapper.fetch_page(FetchPriority.INTERACTIVE)
+
+    # Then both attempts took a token, the retry waited for it and both responses slowed the bucket down
+    assert bucket.stats.acquired == 2
+    assert bucket.stats.slowdowns == 2
+    assert scrapper.last_fetch.queue_wait > 0.03
+    assert scrapper.last_fetch.status == 429
+
+
+async def test_challenge_slows_down_once() -> None:
+    # Given a website that challenges aiohttp and makes cloudscraper solve the same challenge
+    page = (Path(__file__).parent / "energyua_2_days.html").read_text(encoding="utf-8")
+
+    async def challenge(_url: str, _headers: dict[str, str]) -> FetchResponse:
+        raise ChallengeError("challenge")
+
+    async def solve(_url: str, _headers: dict[str, str]) -> FetchResponse:
+        return FetchResponse(200, page, {}, "cloudscraper", FetchTrace(challenge=True))
+
+    bucket = TokenBucket(rate=20, burst=4)
+    transports = [
+        SimpleNamespace(name="aiohttp", fetch=challenge),
+        SimpleNamespace(name="cloudscraper", fetch=solve),
+    ]
+    scrapper = EnergyUaScrapper(PowerOffGroup.OneOne, transports=transports, rate_limiter=bucket)
+
+    # When the page is fetched and the request falls back to cloudscraper
+    await scrapper.fetch_schedule()
+
+    # Then the challenge halves the rate once
+    assert bucket.stats.slowdowns == 1
+    assert bucket.rate == 10
+
+    # And a challenge cloudscraper meets on its own later still slows the bucket down
+    await scrapper.fetch_schedule()
+    assert bucket.stats.slowdowns == 2
+    assert bucket.rate == 5
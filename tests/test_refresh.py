@@ -0,0 +1,131 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from poltava_poweroff.const import CONF_GROUPS, POWEROFF_GROUP_CONF, PowerOffGroup
+from poltava_poweroff.coordinator import PoltavaPowerOffCoordinator
+from poltava_poweroff.energyua_scrapper import EnergyUaScrapper, PowerOffSchedule
+from poltava_poweroff.hub import PoltavaPowerOffHub
+from poltava_poweroff.ratelimit import FetchPriority
+from poltava_poweroff.refresh import RefreshCoalescer
+
+FETCH_TIME = 0.2
+
+
+def make_coordinator(hass: MagicMock, entry_id: str, groups: list[PowerOffGroup], hub: PoltavaPowerOffHub):
+    entry = MagicMock(entry_id=entry_id, title=f"Entry {entry_id}", data={POWEROFF_GROUP_CONF: groups[0]})
+    entry.options = {CONF_GROUPS: groups}
+    with patch("poltava_poweroff.coordinator.async_get_hub", return_value=hub):
+        return PoltavaPowerOffCoordinator(hass, entry)
+
+
+def make_hass() -> MagicMock:
+    loop = asyncio.get_running_loop()
+    hass = MagicMock(data={}, loop=loop)
+    hass.async_create_task = lambda coro, name=None: loop.create_task(coro, name=name)
+    hass.async_create_background_task = lambda coro, name: loop.create_task(coro, name=name)
+    hass.async_add_executor_job = lambda target, *args: loop.run_in_executor(None, target, *args)
+    return hass
+
+
+@pytest.fixture(autouse=True)
+def no_storage():
+    with patch("poltava_poweroff.schedule.Store.async_delay_save"):
+        yield
+
+
+@pytest.fixture
+def fetches():
+    calls: list[PowerOffGroup] = []
+
+    async def fetch_page(self: EnergyUaScrapper, _priority: FetchPriority) -> PowerOffSchedule:
+        calls.append(self.group)
+        await asyncio.sleep(FETCH_TIME)
+        if self.group == PowerOffGroup.SixTwo:
+            raise ConnectionError("site is down")
+        return PowerOffSchedule([], [], digest=f"{self.group}-{len(calls)}")
+
+    with patch.object(EnergyUaScrapper, "fetch_page", fetch_page):
+        yield calls
+
+
+def make_hub(hass: MagicMock) -> PoltavaPowerOffHub:
+    with patch("poltava_poweroff.hub.async_create_clientsession", return_value=MagicMock()):
+        return PoltavaPowerOffHub(hass, ttl=30, parse_workers=1)
+
+
+async def test_entries_refresh_concurrently_and_share_groups(fetches) -> None:
+    # Given two entries watching the same group
+    hass = make_hass()
+    hub = make_hub(hass)
+    first = make_coordinator(hass, "first", [PowerOffGroup.OneOne, PowerOffGroup.TwoOne], hub)
+    second = make_coordinator(hass, "second", [PowerOffGroup.OneOne], hub)
+    coalescer = RefreshCoalescer(hass, window=0.01)
+
+    # When both are refreshed
+    started = asyncio.get_running_loop().time()
+    response = await coalescer.async_refresh([first, second])
+    elapsed = asyncio.get_running_loop().time() - started
+
+    # Then they are refreshed at the same time and the shared group is fetched once
+    assert elapsed < 2 * FETCH_TIME
+    assert sorted(fetches) == [PowerOffGroup.OneOne, PowerOffGroup.TwoOne]
+    assert response["coalesced_calls"] == 1
+    assert set(response["entries"]) == {"first", "second"}
+    for entry in response["entries"].values():
+        assert entry["success"] is True
+        assert entry["error"] is None
+        assert FETCH_TIME <= entry["duration"] < 2 * FETCH_TIME
+    assert set(response["entries"]["first"]["groups"]) == {PowerOffGroup.OneOne, PowerOffGroup.TwoOne}
+    await hub.async_shutdown()
+
+
+async def test_burst_of_calls_is_coalesced(fetches) -> None:
+    # Given entries that are targeted by several calls in a burst
+    hass = make_hass()
+    hub = make_hub(hass)
+    first = make_coordinator(hass, "first", [PowerOffGroup.OneOne], hub)
+    broken = make_coordinator(hass, "broken", [PowerOffGroup.SixTwo], hub)
+    coalescer = RefreshCoalescer(hass, window=0.05)
+
+    # When the calls come within the window
+    responses = await asyncio.gather(
+        coalescer.async_refresh([first]),
+        coalescer.async_refresh([first, broken]),
+        coalescer.async_refresh([broken]),
+    )
+
+    # Then every entry is refreshed once and each call gets the entries it targeted
+    assert (len(first.refresh_history), len(broken.refresh_history)) == (1, 1)
+    assert sorted(fetches) == [PowerOffGroup.OneOne, PowerOffGroup.SixTwo]
+    assert [response["coalesced_calls"] for response in responses] == [3, 3, 3]
+    assert [list(response["entries"]) for response in responses] == [["first"], ["first", "broken"], ["broken"]]
+    assert responses[2]["entries"]["broken"]["success"] is False
+    assert responses[2]["entries"]["broken"]["error"] == "Power offs not polled: site is down"
+
+    # And a call after the refresh started gets a refresh of its own
+    await coalescer.async_refresh([first])
+    assert len(first.refresh_history) == 2
+    await hub.async_shutdown()
+
+
+async def test_refresh_fetches_within_the_cache_ttl(fetches) -> None:
+    # Given an entry polled in the background a moment ago
+    hass = make_hass()
+    hub = make_hub(hass)
+    coordinator = make_coordinator(hass, "first", [PowerOffGroup.OneOne], hub)
+    await coordinator.async_refresh()
+    assert fetches == [PowerOffGroup.OneOne]
+
+    # When it is refreshed by the service, well within the hub TTL
+    response = await RefreshCoalescer(hass, window=0.01).async_refresh([coordinator])
+
+    # Then the page is fetched again instead of being served from the hub memory
+    assert fetches == [PowerOffGroup.OneOne, PowerOffGroup.OneOne]
+    assert response["entries"]["first"]["duration"] >= FETCH_TIME
+
+    # And the next background poll is served from memory again
+    await coordinator.async_refresh()
+    assert len(fetches) == 2
+    await hub.async_shutdown()
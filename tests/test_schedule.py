@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.util import dt as dt_util
+
+from poltava_poweroff.const import STATE_ON, PowerOffGroup
+from poltava_poweroff.entity import PoltavaPowerOffEntity
+from poltava_poweroff.entities import PowerOffPeriod, PowerOffSchedule
+from poltava_poweroff.schedule import GroupSchedule
+from poltava_poweroff.sensor import SENSOR_TYPES, PoltavaPowerOffSensor
+
+NOW = dt_util.start_of_local_day(datetime(2025, 1, 15)) + timedelta(hours=9)
+SCHEDULE = PowerOffSchedule(
+    [PowerOffPeriod(6, 8.5, today=True), PowerOffPeriod(12, 14, today=True)],
+    [PowerOffPeriod(0, 1.5, today=False)],
+    digest="first",
+)
+
+
+def make_schedule() -> GroupSchedule:
+    schedule = GroupSchedule(MagicMock(), PowerOffGroup.OneOne, "test", NOW)
+    with patch("poltava_poweroff.schedule.Store.async_delay_save"):
+        schedule.apply(SCHEDULE)
+    return schedule
+
+
+def test_state_attributes_are_built_once_per_moment() -> None:
+    schedule = make_schedule()
+    attributes = schedule.state_attributes
+
+    # Then all sensors get the same payload until the moment changes
+    assert schedule.state_attributes is attributes
+    assert attributes["poweroff_periods_today"] == [{"start": 6.0, "end": 8.5}, {"start": 12.0, "end": 14.0}]
+    assert attributes["next_off"] == (NOW + timedelta(hours=3)).isoformat()
+
+    schedule.now = NOW + timedelta(hours=4)
+    moved = schedule.state_attributes
+    assert moved is not attributes
+    assert moved["next_off"] == (NOW + timedelta(hours=15)).isoformat()
+    # Списки періодів не перебудовуються, доки розклад той самий
+    assert moved["poweroff_periods_today"] is attributes["poweroff_periods_today"]
+
+
+def test_events_between_is_cached_until_schedule_changes() -> None:
+    schedule = make_schedule()
+    events = schedule.get_events_between(NOW - timedelta(hours=9), NOW + timedelta(days=1))
+
+    assert [event.start for event in events] == [
+        NOW - timedelta(hours=3),
+        NOW + timedelta(hours=3),
+        NOW + timedelta(hours=15),
+    ]
+    assert schedule.get_events_between(NOW - timedelta(hours=9), NOW + timedelta(days=1)) is events
+
+    generation = schedule.generation
+    with patch("poltava_poweroff.schedule.Store.async_delay_save"):
+        schedule.apply(PowerOffSchedule([], [], digest="second"))
+    assert schedule.generation == generation + 1
+    assert schedule.get_events_between(NOW - timedelta(hours=9), NOW + timedelta(days=1)) == []
+
+
+def test_sensor_writes_state_only_when_it_changes() -> None:
+    schedule = make_schedule()
+    coordinator = MagicMock(groups={schedule.group: schedule})
+    sensor = PoltavaPowerOffSensor(coordinator, schedule, SENSOR_TYPES[0])
+
+    with patch.object(PoltavaPowerOffSensor, "async_write_ha_state") as write:
+        sensor._handle_coordinator_update()
+        sensor._handle_coordinator_update()
+        assert write.call_count == 1
+
+        # Відключення почалось - змінився стан
+        schedule.now = NOW - timedelta(hours=2, minutes=30)
+        sensor._handle_coordinator_update()
+        assert write.call_count == 2
+
+
+def test_entity_without_state_snapshot_cannot_be_built() -> None:
+    class IncompleteSensor(PoltavaPowerOffEntity, SensorEntity):
+        pass
+
+    schedule = make_schedule()
+    with pytest.raises(TypeError, match="_state_snapshot"):
+        IncompleteSensor(MagicMock(groups={schedule.group: schedule}), schedule, SENSOR_TYPES[0])
+
+
+async def restore(stored: dict | None, now: datetime) -> tuple[GroupSchedule, bool]:
+    schedule = GroupSchedule(MagicMock(), PowerOffGroup.OneOne, "test", now)
+    with patch("poltava_poweroff.schedule.Store.async_load", return_value=stored):
+        return schedule, await schedule.async_restore()
+
+
+async def test_restore_on_the_same_day_keeps_the_digest() -> None:
+    stored = make_schedule()._to_store()
+
+    schedule, restored = await restore(stored, NOW + timedelta(hours=2))
+
+    assert restored
+    assert schedule.today_periods == SCHEDULE.today
+    assert schedule.tomorrow_periods == SCHEDULE.tomorrow
+    assert schedule.fetched_at == NOW
+    # Той самий відбиток: перше оновлення не розбиратиме незмінну сторінку
+    assert schedule.digest == "first"
+
+
+async def test_restore_next_day_turns_tomorrow_into_today() -> None:
+    stored = make_schedule()._to_store()
+
+    schedule, restored = await restore(stored, NOW + timedelta(days=1))
+
+    # Вчорашній день відкинуто, вчорашнє "завтра" стало сьогоднішнім
+    assert restored
+    assert schedule.today_periods == [PowerOffPeriod(0, 1.5, today=True)]
+    assert schedule.tomorrow_periods == []
+    assert schedule.fetched_at == NOW
+    # Відбиток містить дату збереження, тож сторінку треба розібрати знову
+    assert schedule.digest is None
+    assert schedule.current_state == STATE_ON
+    assert schedule.next_poweroff is None
+
+
+async def test_outdated_or_missing_store_is_not_restored() -> None:
+    stored = make_schedule()._to_store()
+
+    outdated, restored_outdated = await restore(stored, NOW + timedelta(days=2))
+    _, restored_missing = await restore(None, NOW)
+    _, restored_never_fetched = await restore({**stored, "fetched_at": None}, NOW)
+
+    assert not restored_outdated
+    assert not restored_missing
+    assert not restored_never_fetched
+    assert not outdated.has_schedule
+    assert outdated.today_periods == []
+
+
+async def test_schedule_without_hass_has_no_store() -> None:
+    schedule = GroupSchedule(None, PowerOffGroup.OneOne, "profile", NOW)
+
+    assert schedule.apply(SCHEDULE)
+    assert schedule.today_periods == SCHEDULE.today
+    assert not await schedule.async_restore()
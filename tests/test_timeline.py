@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from poltava_poweroff.entities import PowerOffPeriod
+from poltava_poweroff.timeline import PowerOffTimeline
+
+TZ = ZoneInfo("Europe/Kyiv")
+NOW = datetime(2026, 1, 19, 11, 15, tzinfo=TZ)
+
+
+def at(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2026, 1, day, hour, minute, tzinfo=TZ)
+
+
+@pytest.fixture
+def timeline() -> PowerOffTimeline:
+    return PowerOffTimeline.build(
+        [
+            PowerOffPeriod(4, 7.5, today=True),
+            PowerOffPeriod(10, 14.5, today=True),
+            PowerOffPeriod(22, 0.0, today=True),
+        ],
+        [
+            PowerOffPeriod(0.0, 1.5, today=False),
+            PowerOffPeriod(17.0, 21.5, today=False),
+        ],
+        NOW,
+    )
+
+
+def test_periods_are_anchored_to_build_date(timeline) -> None:
+    assert [(event.start, event.end) for event in timeline.events] == [
+        (at(19, 4), at(19, 7, 30)),
+        (at(19, 10), at(19, 14, 30)),
+        (at(19, 22), at(20, 0)),
+        (at(20, 0), at(20, 1, 30)),
+        (at(20, 17), at(20, 21, 30)),
+    ]
+
+
+@pytest.mark.parametrize(
+    "moment,next_off,next_on",
+    [
+        (at(19, 3), at(19, 4), at(19, 7, 30)),
+        (at(19, 11, 15), at(19, 22), at(19, 14, 30)),
+        (at(19, 22), at(20, 0), at(20, 0)),
+        (at(20, 18), None, at(20, 21, 30)),
+        (at(20, 23), None, None),
+    ],
+)
+def test_next_changes(timeline, moment, next_off, next_on) -> None:
+    assert timeline.next_start_after(moment) == next_off
+    assert timeline.next_end_after(moment) == next_on
+
+
+@pytest.mark.parametrize(
+    "moment,expected_start",
+    [
+        (at(19, 3, 59), None),
+        (at(19, 4), at(19, 4)),
+        (at(19, 7, 29), at(19, 4)),
+        (at(19, 7, 30), None),
+        (at(19, 23, 59), at(19, 22)),
+        (at(20, 0), at(20, 0)),
+        (at(20, 21, 30), None),
+    ],
+)
+def test_event_at(timeline, moment, expected_start) -> None:
+    event = timeline.event_at(moment)
+    assert (event.start if event else None) == expected_start
+
+
+def test_event_at_overlapping_spans() -> None:
+    timeline = PowerOffTimeline([(at(19, 1), at(19, 10)), (at(19, 2), at(19, 3))], NOW)
+
+    assert timeline.event_at(at(19, 5)).start == at(19, 1)
+
+
+def test_events_between(timeline) -> None:
+    events = timeline.events_between(at(19, 12), at(20, 0, 30))
+
+    assert [event.start for event in events] == [at(19, 10), at(19, 22), at(20, 0)]
+
+
+@pytest.mark.parametrize(
+    "start,end,expected_starts",
+    [
+        # Діапазон усередині події
+        (at(19, 11), at(19, 12), [at(19, 10)]),
+        # Події, що лише торкаються меж, не входять
+        (at(19, 7, 30), at(19, 10), []),
+        (at(19, 14, 30), at(19, 22), []),
+        (at(19, 0), at(21, 0), [at(19, 4), at(19, 10), at(19, 22), at(20, 0), at(20, 17)]),
+    ],
+)
+def test_events_between_overlap(timeline, start, end, expected_starts) -> None:
+    assert [event.start for event in timeline.events_between(start, end)] == expected_starts
+
+
+def test_events_between_overlapping_spans() -> None:
+    timeline = PowerOffTimeline([(at(19, 1), at(19, 10)), (at(19, 2), at(19, 3))], NOW)
+
+    assert [event.start for event in timeline.events_between(at(19, 5), at(19, 6))] == [at(19, 1)]
+
+
+def test_events_between_is_empty_without_events() -> None:
+    timeline = PowerOffTimeline.build([], [], NOW)
+
+    assert timeline.events_between(NOW, NOW + timedelta(days=7)) == []
+    assert timeline.next_start_after(NOW) is None
+    assert timeline.event_at(NOW) is None
+
+
+def test_boundaries_after(timeline) -> None:
+    assert timeline.boundaries_after(at(20, 0)) == [at(20, 1, 30), at(20, 17), at(20, 21, 30)]
+    assert timeline.boundaries_after(at(20, 22)) == []
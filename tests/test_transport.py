@@ -0,0 +1,320 @@
+from pathlib import Path
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+import pytest
+
+from poltava_poweroff.energyua_scrapper import EnergyUaScrapper, EnergyUaStreamParser, UnrecognizedPageError
+from poltava_poweroff.transport import CloudscraperTransport, FetchResponse, create_trace_config, is_challenge
+
+CHALLENGE_PAGE = "<html><title>Just a moment...</title><script src='/cdn-cgi/challenge-platform/h/b'></script></html>"
+
+
+class StubEnergyUa:
+    """Local stand-in for energy-ua.info that challenges clients without a browser user agent."""
+
+    def __init__(self, page: str, challenge: bool) -> None:
+        self.page = page
+        self.challenge = challenge
+        self.etag: str | None = None
+        self.hits: list[str] = []
+        self.validators: list[str | None] = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        user_agent = request.headers.get("User-Agent", "")
+        browser = "Chrome" in user_agent
+        self.hits.append("browser" if browser else "plain")
+        if not browser and self.challenge:
+            return web.Response(
+                status=403, text=CHALLENGE_PAGE, content_type="text/html", headers={"Server": "cloudflare"}
+            )
+        self.validators.append(request.headers.get("If-None-Match"))
+        if self.etag and self.validators[-1] == self.etag:
+            return web.Response(status=304)
+        headers = {"ETag": self.etag} if self.etag else {}
+        response = web.Response(text=self.page, content_type="text/html", headers=headers)
+        response.enable_compression()
+        return response
+
+
+async def start_server(challenge: bool) -> tuple[TestServer, StubEnergyUa]:
+    stub = StubEnergyUa((Path(__file__).parent / "energyua_2_days.html").read_text(encoding="utf-8"), challenge)
+    app = web.Application()
+    app.router.add_get("/cherga/{group}", stub.handle)
+    server = TestServer(app)
+    await server.start_server()
+    return server, stub
+
+
+@pytest.fixture
+def expected():
+    page = (Path(__file__).parent / "energyua_2_days.html").read_text(encoding="utf-8")
+    return EnergyUaScrapper.parse_power_off_periods(page)
+
+
+@pytest.mark.parametrize("method", ["get_power_off_periods", "stream_power_off_periods"])
+async def test_aiohttp_transport(method, expected) -> None:
+    # Given a website that serves the page to any client, compressed
+    server, stub = await start_server(challenge=False)
+    try:
+        async with ClientSession() as session:
+            scrapper = EnergyUaScrapper("1-1", session=session)
+            with patch("poltava_poweroff.energyua_scrapper.URL", str(server.make_url("/cherga/{}"))):
+                # When periods are requested twice
+                first = await getattr(scrapper, method)()
+                second = await getattr(scrapper, method)()
+    finally:
+        await server.close()
+
+    # Then the pooled aiohttp session is used and cloudscraper is never created
+    assert first == second == expected
+    assert stub.hits == ["plain", "plain"]
+    assert scrapper.transport.name == "aiohttp"
+    assert scrapper.transports[-1].scraper is None
+
+
+@pytest.mark.parametrize("method", ["get_power_off_periods", "stream_power_off_periods"])
+async def test_cloudscraper_fallback_on_challenge(method, expected) -> None:
+    # Given a website that challenges non-browser clients
+    server, stub = await start_server(challenge=True)
+    try:
+        async with ClientSession() as session:
+            scrapper = EnergyUaScrapper("1-1", session=session)
+            with patch("poltava_poweroff.energyua_scrapper.URL", str(server.make_url("/cherga/{}"))):
+                # When periods are requested twice
+                first = await getattr(scrapper, method)()
+                second = await getattr(scrapper, method)()
+    finally:
+        await server.close()
+
+    # Then the first request falls back to cloudscraper and the second one starts there
+    assert first == second == expected
+    assert stub.hits == ["plain", "browser", "browser"]
+    assert scrapper.transport.name == "cloudscraper"
+
+
+async def test_aiohttp_stream_parses_off_the_event_loop(expected) -> None:
+    # Given a website that serves the page to any client
+    server, _ = await start_server(challenge=False)
+    threads: set[int] = set()
+    feed = EnergyUaStreamParser.feed
+
+    def traced_feed(parser: EnergyUaStreamParser, data: str) -> None:
+        threads.add(threading.get_ident())
+        feed(parser, data)
+
+    try:
+        async with ClientSession() as session:
+            scrapper = EnergyUaScrapper("1-1", session=session)
+            with (
+                patch("poltava_poweroff.energyua_scrapper.URL", str(server.make_url("/cherga/{}"))),
+                patch.object(EnergyUaStreamParser, "feed", traced_feed),
+            ):
+                # When the page is streamed
+                periods = await scrapper.stream_power_off_periods()
+    finally:
+        await server.close()
+
+    # Then every chunk is parsed in an executor thread
+    assert periods == expected
+    assert threads
+    assert threading.get_ident() not in threads
+
+
+async def test_page_with_invalid_bytes_is_still_parsed(expected) -> None:
+    # Given a page that has a byte its charset cannot decode
+    page = (Path(__file__).parent / "energyua_2_days.html").read_bytes()
+
+    async def handle(_request: web.Request) -> web.Response:
+        return web.Response(body=b"\xff" + page, content_type="text/html", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/cherga/{group}", handle)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        async with ClientSession() as session:
+            scrapper = EnergyUaScrapper("1-1", session=session)
+            with patch("poltava_poweroff.energyua_scrapper.URL", str(server.make_url("/cherga/{}"))):
+                # When the periods are requested
+                periods = await scrapper.get_power_off_periods()
+    finally:
+        await server.close()
+
+    # Then the byte is replaced and the rest of the page is parsed
+    assert periods == expected
+
+
+def test_is_challenge() -> None:
+    assert is_challenge(403, {}, CHALLENGE_PAGE)
+    assert is_challenge(200, {"cf-mitigated": "challenge"}, "")
+    assert not is_challenge(200, {}, CHALLENGE_PAGE)
+    assert not is_challenge(503, {}, "Service unavailable")
+
+
+async def test_conditional_fetch_and_fingerprint() -> None:
+    # Given a website that supports ETag
+    server, stub = await start_server(challenge=False)
+    stub.etag = '"v1"'
+    try:
+        async with ClientSession() as session:
+            scrapper = EnergyUaScrapper("1-1", session=session)
+            with patch("poltava_poweroff.energyua_scrapper.URL", str(server.make_url("/cherga/{}"))):
+                # When the schedule is fetched twice, then once more after the server dropped ETag
+                schedules = [await scrapper.fetch_schedule(), await scrapper.fetch_schedule()]
+                stub.etag = None
+                schedules.append(await scrapper.fetch_schedule())
+    finally:
+        await server.close()
+
+    # Then the page is parsed once, then reused after 304 and after an unchanged fingerprint
+    assert stub.validators == [None, '"v1"', '"v1"']
+    assert [schedule.not_modified for schedule in schedules] == [False, True, True]
+    assert len({schedule.digest for schedule in schedules}) == 1
+    assert (scrapper.stats.parsed, scrapper.stats.not_modified, scrapper.stats.unchanged) == (1, 1, 1)
+
+
+async def test_page_without_schedule_keeps_last_schedule() -> None:
+    # Given a website that served the schedule once and then an error page with status 200
+    server, stub = await start_server(challenge=False)
+    try:
+        async with ClientSession() as session:
+            scrapper = EnergyUaScrapper("1-1", session=session)
+            with patch("poltava_poweroff.energyua_scrapper.URL", str(server.make_url("/cherga/{}"))):
+                schedule = await scrapper.fetch_schedule()
+                stub.page = "<html><body>Технічні роботи</body></html>"
+                # When the schedule is fetched again
+                with pytest.raises(UnrecognizedPageError):
+                    await scrapper.fetch_schedule()
+    finally:
+        await server.close()
+
+    # Then the fetch fails instead of returning an empty schedule
+    assert scrapper.last_fetch.outcome == "unrecognized"
+    assert scrapper._schedule == schedule
+
+
+async def test_fetch_record_with_traced_session() -> None:
+    # Given a website that serves a compressed page and a session with the trace config
+    server, stub = await start_server(challenge=False)
+    try:
+        async with ClientSession(trace_configs=[create_trace_config()]) as session:
+            scrapper = EnergyUaScrapper("1-1", session=session)
+            with patch("poltava_poweroff.energyua_scrapper.URL", str(server.make_url("/cherga/{}"))):
+                # When the schedule is fetched twice
+                await scrapper.fetch_schedule()
+                first = scrapper.last_fetch
+                await scrapper.fetch_schedule()
+                second = scrapper.last_fetch
+    finally:
+        await server.close()
+
+    # Then the first record has the timings of a new connection and of the parse
+    assert first.transport == "aiohttp"
+    assert first.outcome == "parsed"
+    assert first.parser == "scale_info_periods"
+    assert first.parse_time > 0
+    assert (first.today_periods, first.tomorrow_periods) == (4, 5)
+    assert first.trace.connect is not None
+    assert first.trace.wait > 0
+    assert first.trace.size == len(stub.page.encode())
+    assert first.trace.content_encoding in ("gzip", "deflate", "br")
+    assert first.trace.charset == "utf-8"
+    assert not first.challenge
+    # А друге завантаження перевикористало з'єднання і не парсилось
+    assert second.outcome == "unchanged"
+    assert second.trace.connect is None
+    assert second.parse_time is None
+
+
+async def test_cloudscraper_session_is_saved_and_restored() -> None:
+    # Given a website that hands out a clearance cookie and remembers who sent it back
+    seen: list[tuple[str | None, str]] = []
+
+    async def handle(request: web.Request) -> web.Response:
+        seen.append((request.cookies.get("cf_clearance"), request.headers["User-Agent"]))
+        response = web.Response(text="ok")
+        response.set_cookie("cf_clearance", f"token-{len(seen)}", max_age=3600)
+        return response
+
+    app = web.Application()
+    app.router.add_get("/", handle)
+    server = TestServer(app)
+    await server.start_server()
+    states: list[dict] = []
+    first = CloudscraperTransport(on_session_change=states.append)
+    restored, expired = CloudscraperTransport(), CloudscraperTransport()
+    try:
+        await first.fetch(str(server.make_url("/")), {})
+        await first.fetch(str(server.make_url("/")), {})
+
+        # When a new transport starts from the saved state, and another one from an expired state
+        await restored.async_start(states[-1])
+        await restored.fetch(str(server.make_url("/")), {})
+        await expired.async_start({**states[-1], "cookies": [{**states[-1]["cookies"][0], "expires": 1}]})
+        await expired.fetch(str(server.make_url("/")), {})
+    finally:
+        for transport in (first, restored, expired):
+            await transport.async_close()
+        await server.close()
+
+    # Then every new cookie is reported, and only the valid one is sent with its user agent
+    assert [state["cookies"][0]["value"] for state in states] == ["token-1", "token-2"]
+    assert seen[2] == ("token-2", seen[1][1])
+    assert seen[3][0] is None
+
+
+def test_fingerprint_ignores_non_schedule_markup() -> None:
+    page = (Path(__file__).parent / "energyua_2_days.html").read_text(encoding="utf-8")
+    noisy = page.replace('style="opacity:0.5;"', 'style="opacity:1;"').replace("</body>", "<p>ad</p></body>")
+    changed = page.replace("<b>04:00</b>", "<b>05:00</b>", 1)
+
+    assert EnergyUaScrapper.schedule_fingerprint(page, "2026-01-19") == EnergyUaScrapper.schedule_fingerprint(
+        noisy, "2026-01-19"
+    )
+    assert EnergyUaScrapper.schedule_fingerprint(page, "2026-01-19") != EnergyUaScrapper.schedule_fingerprint(
+        changed, "2026-01-19"
+    )
+    assert EnergyUaScrapper.schedule_fingerprint(page, "2026-01-19") != EnergyUaScrapper.schedule_fingerprint(
+        page, "2026-01-20"
+    )
+
+
+async def test_failed_parse_does_not_advance_validators() -> None:
+    # Given a website serving page 1 with ETag e1, then page 2 with ETag e2
+    fixtures = Path(__file__).parent
+    pages = {
+        '"e1"': (fixtures / "energyua_2_days.html").read_text(encoding="utf-8"),
+        '"e2"': (fixtures / "energyua_11_page.html").read_text(encoding="utf-8"),
+    }
+    current = '"e1"'
+    sent: list[str | None] = []
+
+    async def fetch(_url: str, headers: dict[str, str]) -> FetchResponse:
+        sent.append(headers.get("If-None-Match"))
+        if headers.get("If-None-Match") == current:
+            return FetchResponse(304, "", {"ETag": current}, "stub")
+        return FetchResponse(200, pages[current], {"ETag": current}, "stub")
+
+    scrapper = EnergyUaScrapper("1-1", transports=[SimpleNamespace(name="stub", fetch=fetch)])
+    first = await scrapper.fetch_schedule()
+
+    # When page 2 cannot be parsed
+    current = '"e2"'
+    with (
+        patch.object(EnergyUaScrapper, "parse_page", side_effect=ValueError("broken page")),
+        pytest.raises(ValueError, match="broken page"),
+    ):
+        await scrapper.fetch_schedule()
+    # Then the next request still sends the validators of the parsed page and gets page 2 again
+    second = await scrapper.fetch_schedule()
+    third = await scrapper.fetch_schedule()
+
+    assert sent == [None, '"e1"', '"e1"', '"e2"']
+    assert second.digest != first.digest
+    assert not second.not_modified
+    assert third.not_modified
+    assert third.digest == second.digest
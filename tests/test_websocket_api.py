@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from homeassistant.util import dt as dt_util
+
+from poltava_poweroff.const import SCHEDULE_PAYLOAD_VERSION, PowerOffGroup
+from poltava_poweroff.entities import PowerOffPeriod, PowerOffSchedule
+from poltava_poweroff.schedule import GroupSchedule
+from poltava_poweroff.websocket_api import ScheduleSubscription, schedule_days
+
+MIDNIGHT = dt_util.start_of_local_day(datetime(2025, 1, 15))
+NOW = MIDNIGHT + timedelta(hours=9)
+
+
+def timestamp(hours: float) -> int:
+    return int((MIDNIGHT + timedelta(hours=hours)).timestamp())
+
+
+def apply(schedule: GroupSchedule, today: list, tomorrow: list, digest: str) -> None:
+    with patch("poltava_poweroff.schedule.Store.async_delay_save"):
+        schedule.apply(PowerOffSchedule(today, tomorrow, digest=digest))
+
+
+def make_schedule() -> GroupSchedule:
+    schedule = GroupSchedule(MagicMock(), PowerOffGroup.TwoOne, "test", NOW)
+    apply(schedule, [PowerOffPeriod(6, 8.5, today=True)], [PowerOffPeriod(22, 0, today=False)], "first")
+    return schedule
+
+
+def test_schedule_days_have_absolute_timestamps() -> None:
+    assert schedule_days(make_schedule()) == {
+        "2025-01-15": [[timestamp(6), timestamp(8.5)]],
+        "2025-01-16": [[timestamp(46), timestamp(48)]],
+    }
+
+
+def test_snapshot_then_only_changed_days() -> None:
+    schedule = make_schedule()
+    sent: list[dict] = []
+    subscription = ScheduleSubscription(schedule, sent.append)
+
+    subscription.async_send_snapshot()
+    assert sent == [
+        {
+            "type": "snapshot",
+            "version": SCHEDULE_PAYLOAD_VERSION,
+            "group": "2-1",
+            "generation": schedule.generation,
+            "days": schedule_days(schedule),
+        }
+    ]
+
+    # Оновлення координатора без зміни розкладу нічого не надсилає
+    subscription.async_send_delta()
+    assert len(sent) == 1
+
+    apply(schedule, [PowerOffPeriod(6, 8.5, today=True)], [PowerOffPeriod(12, 14, today=False)], "second")
+    subscription.async_send_delta()
+    assert sent[1] == {
+        "type": "delta",
+        "generation": schedule.generation,
+        "days": {"2025-01-16": [[timestamp(36), timestamp(38)]]},
+        "removed": [],
+    }
+
+
+def test_delta_drops_past_days() -> None:
+    schedule = make_schedule()
+    sent: list[dict] = []
+    subscription = ScheduleSubscription(schedule, sent.append)
+    subscription.async_send_snapshot()
+
+    # Наступного дня завтрашній розклад стає сьогоднішнім
+    schedule.now = NOW + timedelta(days=1)
+    apply(schedule, [PowerOffPeriod(22, 0, today=True)], [], "next day")
+    subscription.async_send_delta()
+
+    assert sent[1]["days"] == {"2025-01-17": []}
+    assert sent[1]["removed"] == ["2025-01-15"]